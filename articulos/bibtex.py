@@ -0,0 +1,388 @@
+import codecs
+import logging
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from pymetanalis.models import Proyecto
+
+from .busqueda import indexar_articulos
+from .claves import reservar_claves
+from .duplicados import DetectorDuplicados
+from .models import Articulo, HistorialArticulo
+
+logger = logging.getLogger(__name__)
+
+
+# Tipos de entrada que no representan artículos
+TIPOS_IGNORADOS = {'comment', 'preamble', 'string'}
+
+# Tamaño del bloque leído del archivo en cada iteración
+TAMANO_BLOQUE = 64 * 1024
+
+# Límite de una entrada individual; evita cargar en memoria un archivo corrupto
+TAMANO_MAXIMO_ENTRADA = 1024 * 1024
+
+CAMPO_PATTERN = re.compile(r'\s*([A-Za-z][\w\-:.]*)\s*=\s*')
+CABECERA_PATTERN = re.compile(r'[\w\-\s]*')
+LLAVES_PATTERN = re.compile(r'[{}]')
+DELIMITADORES_PATTERN = re.compile(r'[{}()]')
+
+
+class ErrorBibtex(Exception):
+    """Error de formato en una entrada BibTeX."""
+
+
+def iterar_entradas_bibtex(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Lee un archivo .bib por bloques y genera las entradas una a una.
+
+    Solo se mantiene en memoria la entrada que se está leyendo. Cada elemento
+    generado es una tupla (texto_entrada, error); si la entrada no está bien
+    cerrada se devuelve el texto leído junto con el mensaje de error.
+    """
+    archivo.seek(0)
+    decodificador = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    buffer = []
+    dentro = False
+    profundidad = 0
+    delimitadores = None
+    tamano = 0
+
+    while True:
+        bloque = archivo.read(tamano_bloque)
+        if not bloque:
+            break
+        if isinstance(bloque, bytes):
+            bloque = decodificador.decode(bloque)
+
+        inicio = 0
+        i = 0
+        n = len(bloque)
+        while i < n:
+            if not dentro:
+                i = bloque.find('@', i)
+                if i == -1:
+                    break
+                dentro = True
+                profundidad = 0
+                delimitadores = None
+                inicio = i
+                tamano = 0
+                i += 1
+                continue
+
+            if delimitadores is None:
+                # Cabecera: @tipo seguido de '{' o '('
+                i = CABECERA_PATTERN.match(bloque, i).end()
+                if i >= n:
+                    break
+                if bloque[i] == '{':
+                    delimitadores = LLAVES_PATTERN
+                elif bloque[i] == '(':
+                    delimitadores = DELIMITADORES_PATTERN
+                else:
+                    # No es una entrada (por ejemplo, un correo en un comentario)
+                    buffer = []
+                    dentro = False
+                    continue
+                profundidad = 1
+                i += 1
+                continue
+
+            match = delimitadores.search(bloque, i)
+            if not match:
+                break
+            i = match.end()
+            if match.group(0) in '{(':
+                profundidad += 1
+                continue
+            profundidad -= 1
+            if profundidad == 0:
+                buffer.append(bloque[inicio:i])
+                yield ''.join(buffer), None
+                buffer = []
+                dentro = False
+
+        if dentro:
+            fragmento = bloque[inicio:]
+            buffer.append(fragmento)
+            tamano += len(fragmento)
+            if tamano > TAMANO_MAXIMO_ENTRADA:
+                yield ''.join(buffer)[:500], 'Entrada demasiado grande o sin cerrar'
+                buffer = []
+                dentro = False
+
+    if dentro and buffer:
+        yield ''.join(buffer), 'Entrada sin cerrar al final del archivo'
+
+
+def _leer_valor(texto, i):
+    """Lee un valor de campo a partir de la posición i. Devuelve (valor, posición)."""
+    partes = []
+    n = len(texto)
+    while i < n:
+        while i < n and texto[i].isspace():
+            i += 1
+        if i >= n:
+            break
+
+        caracter = texto[i]
+        if caracter == '{':
+            profundidad = 1
+            j = i + 1
+            while j < n and profundidad:
+                if texto[j] == '{':
+                    profundidad += 1
+                elif texto[j] == '}':
+                    profundidad -= 1
+                j += 1
+            if profundidad:
+                raise ErrorBibtex('Llaves sin cerrar en el valor de un campo')
+            partes.append(texto[i + 1:j - 1])
+            i = j
+        elif caracter == '"':
+            profundidad = 0
+            j = i + 1
+            while j < n:
+                if texto[j] == '{':
+                    profundidad += 1
+                elif texto[j] == '}':
+                    profundidad -= 1
+                elif texto[j] == '"' and profundidad == 0 and texto[j - 1] != '\\':
+                    break
+                j += 1
+            if j >= n:
+                raise ErrorBibtex('Comillas sin cerrar en el valor de un campo')
+            partes.append(texto[i + 1:j])
+            i = j + 1
+        else:
+            j = i
+            while j < n and texto[j] not in ',#' and not texto[j].isspace():
+                j += 1
+            partes.append(texto[i:j])
+            i = j
+
+        while i < n and texto[i].isspace():
+            i += 1
+        if i < n and texto[i] == '#':
+            i += 1
+            continue
+        break
+
+    return ''.join(partes), i
+
+
+def parsear_entrada(texto):
+    """
+    Convierte el texto de una entrada BibTeX en un diccionario con
+    'tipo', 'clave' y 'campos'. Devuelve None para @comment, @preamble y @string.
+    """
+    texto = texto.strip()
+    apertura = min((p for p in (texto.find('{'), texto.find('(')) if p != -1), default=-1)
+    if not texto.startswith('@') or apertura == -1:
+        raise ErrorBibtex('La entrada no tiene el formato @tipo{clave, ...}')
+
+    tipo = texto[1:apertura].strip().lower()
+    if tipo in TIPOS_IGNORADOS:
+        return None
+    if not tipo:
+        raise ErrorBibtex('La entrada no indica su tipo')
+
+    cuerpo = texto[apertura + 1:-1]
+    coma = cuerpo.find(',')
+    if coma == -1:
+        raise ErrorBibtex('La entrada no tiene campos')
+
+    clave = cuerpo[:coma].strip()
+    if not clave or '=' in clave:
+        raise ErrorBibtex('La entrada no tiene clave')
+
+    campos = {}
+    i = coma + 1
+    n = len(cuerpo)
+    while i < n:
+        match = CAMPO_PATTERN.match(cuerpo, i)
+        if not match:
+            resto = cuerpo[i:].strip().strip(',').strip()
+            if resto:
+                raise ErrorBibtex(f'Campo mal formado cerca de: {resto[:50]}')
+            break
+        nombre = match.group(1).lower()
+        valor, i = _leer_valor(cuerpo, match.end())
+        campos[nombre] = ' '.join(valor.split())
+        while i < n and (cuerpo[i].isspace() or cuerpo[i] == ','):
+            i += 1
+
+    return {'tipo': tipo, 'clave': clave, 'campos': campos}
+
+
+def reemplazar_clave(texto, clave):
+    """Devuelve el texto de una entrada ya parseada con su clave sustituida por `clave`."""
+    apertura = min(p for p in (texto.find('{'), texto.find('(')) if p != -1)
+    coma = texto.index(',', apertura)
+    actual = texto[apertura + 1:coma]
+    inicio = apertura + 1 + len(actual) - len(actual.lstrip())
+    return texto[:inicio] + clave + texto[inicio + len(actual.strip()):]
+
+
+def _limpiar_llaves(valor):
+    return LLAVES_PATTERN.sub('', valor or '').strip()
+
+
+def datos_articulo_desde_entrada(entrada, nombre_archivo):
+    """Construye titulo, doi y metadata_completos a partir de una entrada parseada."""
+    campos = entrada['campos']
+
+    titulo = _limpiar_llaves(campos.get('title'))
+    if not titulo:
+        raise ErrorBibtex('La entrada no tiene título')
+
+    autores = _limpiar_llaves(campos.get('author'))
+    autores = '; '.join(a.strip() for a in re.split(r'\s+and\s+', autores) if a.strip())
+
+    anio = None
+    anio_match = re.search(r'\d{4}', campos.get('year', ''))
+    if anio_match:
+        anio = int(anio_match.group(0))
+
+    palabras_clave = _limpiar_llaves(campos.get('keywords') or campos.get('author_keywords'))
+
+    metadata_completos = {
+        'autores': autores or 'Autor desconocido',
+        'abstract': _limpiar_llaves(campos.get('abstract')),
+        'anio_publicacion': anio,
+        'palabras_clave': [kw.strip() for kw in re.split(r'[;,]', palabras_clave) if kw.strip()],
+        'archivo_origen': nombre_archivo,
+        'tipo_entrada': entrada['tipo'],
+        'importado_bibtex': True
+    }
+
+    opcionales = {
+        'journal': campos.get('journal') or campos.get('booktitle'),
+        'volumen': campos.get('volume'),
+        'paginas': campos.get('pages'),
+        'editorial': campos.get('publisher'),
+        'url': campos.get('url'),
+    }
+    for nombre, valor in opcionales.items():
+        if valor:
+            metadata_completos[nombre] = _limpiar_llaves(valor)
+
+    doi = _limpiar_llaves(campos.get('doi')) or None
+
+    return {
+        'titulo': titulo[:500],
+        'doi': doi[:200] if doi else None,
+        'metadata_completos': metadata_completos,
+    }
+
+
+class ImportadorBibtex:
+    """Importa todas las entradas de un ArchivoSubida .bib en lotes con bulk_create."""
+
+    def __init__(self, archivo_subida, usuario, tamano_lote=500):
+        self.archivo_subida = archivo_subida
+        self.usuario = usuario
+        self.tamano_lote = tamano_lote
+        self.procesados = 0
+        self.duplicados = 0
+        self.errores = []
+        self.ids_creados = []
+
+    def importar(self):
+        """Recorre el archivo y guarda los artículos. Devuelve el número de artículos creados."""
+        lote = []
+        archivo = self.archivo_subida.ruta_archivo
+        archivo.open('rb')
+        try:
+            for indice, (texto, error) in enumerate(iterar_entradas_bibtex(archivo), start=1):
+                if error:
+                    self._registrar_error(indice, None, error)
+                    continue
+                try:
+                    entrada = parsear_entrada(texto)
+                    if entrada is None:
+                        continue
+                    datos = datos_articulo_desde_entrada(entrada, self.archivo_subida.nombre_archivo)
+                except ErrorBibtex as e:
+                    self._registrar_error(indice, None, str(e))
+                    continue
+
+                lote.append((entrada['clave'], texto.strip(), datos))
+                if len(lote) >= self.tamano_lote:
+                    self._guardar_lote(lote)
+                    lote = []
+
+            if lote:
+                self._guardar_lote(lote)
+        finally:
+            archivo.close()
+
+        self.archivo_subida.articulos_procesados = self.procesados
+        self.archivo_subida.errores_procesamiento = {
+            'errores': self.errores,
+            'total_errores': len(self.errores),
+            'timestamp': timezone.now().isoformat()
+        } if self.errores else None
+        self.archivo_subida.save(update_fields=['articulos_procesados', 'errores_procesamiento'])
+        return self.procesados
+
+    def completar(self):
+        """
+        Pasos posteriores a la importación: indexa los artículos creados y marca los
+        posibles duplicados. Igual que en completar_trabajo, un error aquí se registra
+        y no anula los artículos ya importados.
+        """
+        if not self.ids_creados:
+            return
+        try:
+            indexar_articulos(self.ids_creados)
+        except Exception as e:
+            logger.error(f"Archivo {self.archivo_subida.id}: no se pudieron indexar los artículos importados: {e}")
+        try:
+            self.duplicados = DetectorDuplicados(self.archivo_subida.proyecto).detectar(self.ids_creados)
+        except Exception as e:
+            logger.error(f"Archivo {self.archivo_subida.id}: no se pudieron detectar duplicados: {e}")
+
+    def _registrar_error(self, indice, clave, mensaje):
+        self.errores.append({'entrada': indice, 'clave': clave, 'error': mensaje})
+
+    def _guardar_lote(self, lote):
+        claves = reservar_claves([clave for clave, _, _ in lote])
+        with transaction.atomic():
+            self._crear_articulos(claves, lote)
+
+    def _crear_articulos(self, claves, lote):
+        articulos = [
+            Articulo(
+                proyecto=self.archivo_subida.proyecto,
+                usuario_carga=self.usuario,
+                bibtex_key=clave,
+                titulo=datos['titulo'],
+                doi=datos['doi'],
+                # Si la clave recibió un sufijo, el texto guardado usa la misma clave
+                bibtex_original=texto if clave == original else reemplazar_clave(texto, clave),
+                metadata_completos=datos['metadata_completos'],
+                estado='PENDIENTE'
+            )
+            for clave, (original, texto, datos) in zip(claves, lote)
+        ]
+        articulos = Articulo.objects.bulk_create(articulos, batch_size=self.tamano_lote)
+
+        HistorialArticulo.objects.bulk_create([
+            HistorialArticulo(
+                articulo=articulo,
+                usuario=self.usuario,
+                tipo_cambio='CREACION',
+                valor_nuevo=f'Artículo importado desde archivo: {self.archivo_subida.nombre_archivo}'
+            )
+            for articulo in articulos
+        ], batch_size=self.tamano_lote)
+
+        Proyecto.ajustar_contadores(self.archivo_subida.proyecto_id, {'PENDIENTE': len(articulos)})
+
+        self.ids_creados.extend(articulo.id for articulo in articulos)
+        self.procesados += len(articulos)
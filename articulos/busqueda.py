@@ -0,0 +1,306 @@
+import abc
+import html
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Articulo, TextoCompletoArticulo
+
+
+# Tablas del índice (creadas en la migración 0009 según el motor de base de datos)
+TABLA_FTS5 = 'articulos_busqueda'
+TABLA_POSTGRES = 'articulos_busqueda_pg'
+
+# Marcadores de coincidencia que devuelve el motor; se sustituyen por <mark>
+# después de escapar el HTML del fragmento
+INICIO_MARCA = '\x02'
+FIN_MARCA = '\x03'
+
+# Límite de texto completo indexado por artículo (tsvector admite hasta 1 MB)
+LONGITUD_MAXIMA_TEXTO = 500_000
+
+TAMANO_LOTE = 500
+
+TERMINO_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def resaltar(fragmento):
+    """Escapa el fragmento y convierte los marcadores del motor en <mark>."""
+    if not fragmento:
+        return ''
+    return (
+        html.escape(fragmento)
+        .replace(INICIO_MARCA, '<mark>')
+        .replace(FIN_MARCA, '</mark>')
+    )
+
+
+def documentos_articulos(ids):
+    """
+    Genera (id, proyecto_id, titulo, abstract, palabras_clave, texto) de los
+    artículos indicados, leyendo el texto completo solo para indexarlo.
+    """
+    ids = list(ids)
+    for inicio in range(0, len(ids), TAMANO_LOTE):
+        lote = ids[inicio:inicio + TAMANO_LOTE]
+        textos = {
+            registro.articulo_id: registro.texto
+            for registro in TextoCompletoArticulo.objects.filter(articulo_id__in=lote)
+        }
+        for articulo_id, proyecto_id, titulo, metadata in Articulo.objects.filter(id__in=lote).values_list(
+            'id', 'proyecto_id', 'titulo', 'metadata_completos'
+        ):
+            metadata = metadata or {}
+            palabras_clave = metadata.get('palabras_clave') or []
+            if isinstance(palabras_clave, list):
+                palabras_clave = ', '.join(palabras_clave)
+            yield (
+                articulo_id,
+                proyecto_id,
+                titulo or '',
+                metadata.get('abstract') or '',
+                palabras_clave,
+                textos.get(articulo_id, '')[:LONGITUD_MAXIMA_TEXTO],
+            )
+
+
+class BackendBusqueda(abc.ABC):
+    """
+    Interfaz común de los motores de búsqueda de artículos. Cada motor debe
+    implementar buscar; el mantenimiento del índice no hace nada por defecto.
+    """
+    nombre = None
+
+    def indexar(self, ids):
+        """Crea o actualiza la entrada del índice de cada artículo."""
+
+    def eliminar(self, ids):
+        """Quita los artículos del índice."""
+
+    def vaciar(self, proyecto_id=None):
+        """Borra el índice completo o el de un proyecto."""
+
+    @abc.abstractmethod
+    def buscar(self, proyecto_id, consulta, limite=20, desplazamiento=0):
+        """
+        Devuelve una lista de dicts {'id', 'rango', 'titulo_resaltado', 'fragmento'}
+        ordenada por relevancia.
+        """
+
+
+class BackendBasico(BackendBusqueda):
+    """Búsqueda con icontains sobre título, abstract y palabras clave (sin índice)."""
+    nombre = 'icontains'
+
+    def buscar(self, proyecto_id, consulta, limite=20, desplazamiento=0):
+        terminos = TERMINO_PATTERN.findall(consulta)
+        if not terminos:
+            return []
+
+        filtro = Q()
+        for termino in terminos:
+            filtro &= (
+                Q(titulo__icontains=termino)
+                | Q(metadata_completos__abstract__icontains=termino)
+                | Q(metadata_completos__palabras_clave__icontains=termino)
+            )
+
+        articulos = (
+            Articulo.objects.filter(filtro, proyecto_id=proyecto_id)
+            .order_by('-fecha_carga', '-id')
+            .values_list('id', 'titulo', 'metadata_completos__abstract')
+            [desplazamiento:desplazamiento + limite]
+        )
+        patron = re.compile('|'.join(re.escape(t) for t in terminos), re.IGNORECASE)
+        marcar = lambda texto: patron.sub(lambda m: f'{INICIO_MARCA}{m.group(0)}{FIN_MARCA}', texto or '')
+
+        return [
+            {
+                'id': articulo_id,
+                'rango': None,
+                'titulo_resaltado': resaltar(marcar(titulo)),
+                'fragmento': resaltar(marcar((abstract or '')[:300])),
+            }
+            for articulo_id, titulo, abstract in articulos
+        ]
+
+
+class BackendFTS5(BackendBusqueda):
+    """Tabla virtual FTS5 de SQLite; el rowid de cada fila es el id del artículo."""
+    nombre = 'fts5'
+
+    # Peso de cada columna en bm25: titulo, abstract, palabras_clave, texto
+    PESOS = (10.0, 4.0, 4.0, 1.0)
+
+    def indexar(self, ids):
+        with transaction.atomic(), connection.cursor() as cursor:
+            for documentos in _lotes(documentos_articulos(ids)):
+                cursor.executemany(
+                    f'DELETE FROM {TABLA_FTS5} WHERE rowid = %s',
+                    [(documento[0],) for documento in documentos]
+                )
+                cursor.executemany(
+                    f'INSERT INTO {TABLA_FTS5} (rowid, proyecto_id, titulo, abstract, palabras_clave, texto) '
+                    f'VALUES (%s, %s, %s, %s, %s, %s)',
+                    documentos
+                )
+
+    def eliminar(self, ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {TABLA_FTS5} WHERE rowid = %s', [(i,) for i in ids])
+
+    def vaciar(self, proyecto_id=None):
+        with connection.cursor() as cursor:
+            if proyecto_id is None:
+                cursor.execute(f'DELETE FROM {TABLA_FTS5}')
+            else:
+                cursor.execute(f'DELETE FROM {TABLA_FTS5} WHERE proyecto_id = %s', [proyecto_id])
+
+    @staticmethod
+    def consulta_fts(consulta):
+        """Convierte el texto del usuario en una consulta FTS5 segura (AND de términos, prefijo en el último)."""
+        terminos = TERMINO_PATTERN.findall(consulta)
+        if not terminos:
+            return None
+        partes = [f'"{termino}"' for termino in terminos]
+        partes[-1] += '*'
+        return ' '.join(partes)
+
+    def buscar(self, proyecto_id, consulta, limite=20, desplazamiento=0):
+        consulta_fts = self.consulta_fts(consulta)
+        if not consulta_fts:
+            return []
+
+        pesos = ', '.join(str(peso) for peso in self.PESOS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({TABLA_FTS5}, 0.0, {pesos}) AS rango, "
+                f"highlight({TABLA_FTS5}, 1, %s, %s), "
+                f"snippet({TABLA_FTS5}, -1, %s, %s, '…', 24) "
+                f"FROM {TABLA_FTS5} WHERE {TABLA_FTS5} MATCH %s AND proyecto_id = %s "
+                f"ORDER BY rango LIMIT %s OFFSET %s",
+                [INICIO_MARCA, FIN_MARCA, INICIO_MARCA, FIN_MARCA,
+                 consulta_fts, proyecto_id, limite, desplazamiento]
+            )
+            filas = cursor.fetchall()
+
+        # bm25 devuelve valores negativos: cuanto menor, más relevante
+        return [
+            {
+                'id': articulo_id,
+                'rango': round(-rango, 6),
+                'titulo_resaltado': resaltar(titulo),
+                'fragmento': resaltar(fragmento),
+            }
+            for articulo_id, rango, titulo, fragmento in filas
+        ]
+
+
+class BackendPostgres(BackendBusqueda):
+    """Columna tsvector con índice GIN; título con peso A, abstract y palabras clave B, texto D."""
+    nombre = 'postgres'
+
+    CONFIGURACION = 'simple'
+
+    def indexar(self, ids):
+        configuracion = self.CONFIGURACION
+        with transaction.atomic(), connection.cursor() as cursor:
+            for documentos in _lotes(documentos_articulos(ids)):
+                cursor.executemany(
+                    f"INSERT INTO {TABLA_POSTGRES} (articulo_id, proyecto_id, documento) VALUES (%s, %s, "
+                    f"setweight(to_tsvector('{configuracion}', %s), 'A') || "
+                    f"setweight(to_tsvector('{configuracion}', %s), 'B') || "
+                    f"setweight(to_tsvector('{configuracion}', %s), 'B') || "
+                    f"setweight(to_tsvector('{configuracion}', %s), 'D')) "
+                    f"ON CONFLICT (articulo_id) DO UPDATE SET "
+                    f"proyecto_id = EXCLUDED.proyecto_id, documento = EXCLUDED.documento",
+                    documentos
+                )
+
+    def eliminar(self, ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_POSTGRES} WHERE articulo_id = ANY(%s)', [list(ids)])
+
+    def vaciar(self, proyecto_id=None):
+        with connection.cursor() as cursor:
+            if proyecto_id is None:
+                cursor.execute(f'TRUNCATE {TABLA_POSTGRES}')
+            else:
+                cursor.execute(f'DELETE FROM {TABLA_POSTGRES} WHERE proyecto_id = %s', [proyecto_id])
+
+    def buscar(self, proyecto_id, consulta, limite=20, desplazamiento=0):
+        if not TERMINO_PATTERN.search(consulta):
+            return []
+
+        configuracion = self.CONFIGURACION
+        opciones = f'StartSel={INICIO_MARCA}, StopSel={FIN_MARCA}'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT b.articulo_id, ts_rank_cd(b.documento, q) AS rango, "
+                f"ts_headline('{configuracion}', a.titulo, q, %s), "
+                f"ts_headline('{configuracion}', COALESCE(a.metadata_completos->>'abstract', ''), q, %s) "
+                f"FROM {TABLA_POSTGRES} b "
+                f"JOIN articulos_articulo a ON a.id = b.articulo_id, "
+                f"websearch_to_tsquery('{configuracion}', %s) q "
+                f"WHERE b.proyecto_id = %s AND b.documento @@ q "
+                f"ORDER BY rango DESC, b.articulo_id DESC LIMIT %s OFFSET %s",
+                [f'{opciones}, HighlightAll=true', f'{opciones}, MaxFragments=2, MaxWords=24, MinWords=8',
+                 consulta, proyecto_id, limite, desplazamiento]
+            )
+            filas = cursor.fetchall()
+
+        return [
+            {
+                'id': articulo_id,
+                'rango': round(rango, 6),
+                'titulo_resaltado': resaltar(titulo),
+                'fragmento': resaltar(fragmento),
+            }
+            for articulo_id, rango, titulo, fragmento in filas
+        ]
+
+
+def _lotes(documentos):
+    lote = []
+    for documento in documentos:
+        lote.append(documento)
+        if len(lote) >= TAMANO_LOTE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+_backend = None
+
+
+def obtener_backend():
+    """Elige el motor según la base de datos y las tablas creadas por la migración."""
+    global _backend
+    if _backend is None:
+        tablas = connection.introspection.table_names(include_views=False)
+        if connection.vendor == 'sqlite' and TABLA_FTS5 in tablas:
+            _backend = BackendFTS5()
+        elif connection.vendor == 'postgresql' and TABLA_POSTGRES in tablas:
+            _backend = BackendPostgres()
+        else:
+            _backend = BackendBasico()
+    return _backend
+
+
+def indexar_articulos(ids):
+    """Actualiza el índice de búsqueda de los artículos indicados."""
+    ids = list(ids)
+    if ids:
+        obtener_backend().indexar(ids)
+
+
+def eliminar_articulos(ids):
+    ids = list(ids)
+    if ids:
+        obtener_backend().eliminar(ids)
+
+
+def buscar_articulos(proyecto_id, consulta, limite=20, desplazamiento=0):
+    return obtener_backend().buscar(proyecto_id, consulta, limite, desplazamiento)
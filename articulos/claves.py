@@ -0,0 +1,112 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+
+from .models import Articulo, ContadorBibtexKey
+
+
+# Máximo de rondas para resolver claves que ya existían fuera de los contadores
+# (por ejemplo, una clave 'smith2020_3' importada tal cual desde un .bib)
+MAXIMO_RONDAS = 5
+
+# Bases buscadas por consulta al inicializar contadores
+BASES_POR_CONSULTA = 200
+
+
+def _formatear(base, sufijo):
+    return f"{base}_{sufijo}" if sufijo else base
+
+
+def _crear_contadores(bases):
+    """Crea los contadores que faltan, inicializados a partir de las claves ya guardadas."""
+    existentes = set(ContadorBibtexKey.objects.filter(base__in=bases).values_list('base', flat=True))
+    faltantes = set(bases) - existentes
+    if not faltantes:
+        return
+
+    siguiente = dict.fromkeys(faltantes, 0)
+    ordenadas = sorted(faltantes)
+    # Por tramos: SQLite rechaza expresiones con demasiados OR ("Expression tree is too large")
+    for inicio in range(0, len(ordenadas), BASES_POR_CONSULTA):
+        tramo = ordenadas[inicio:inicio + BASES_POR_CONSULTA]
+        filtro = Q(bibtex_key__in=tramo)
+        for base in tramo:
+            filtro |= Q(bibtex_key__startswith=f'{base}_')
+
+        for clave in Articulo.objects.filter(filtro).values_list('bibtex_key', flat=True).iterator():
+            base, _, sufijo = clave.rpartition('_')
+            if clave in siguiente:
+                siguiente[clave] = max(siguiente[clave], 1)
+            elif base in siguiente and sufijo.isdigit():
+                siguiente[base] = max(siguiente[base], int(sufijo) + 1)
+
+    # Si otra petición creó el mismo contador a la vez, se conserva el suyo
+    ContadorBibtexKey.objects.bulk_create(
+        [ContadorBibtexKey(base=base, siguiente=valor) for base, valor in siguiente.items()],
+        ignore_conflicts=True
+    )
+
+
+def _reservar(conteo):
+    """Avanza los contadores con un único UPDATE y devuelve el primer sufijo reservado por base."""
+    por_cantidad = {}
+    for base, cantidad in conteo.items():
+        por_cantidad.setdefault(cantidad, []).append(base)
+
+    with transaction.atomic():
+        _crear_contadores(list(conteo))
+        ContadorBibtexKey.objects.filter(base__in=conteo).update(
+            siguiente=F('siguiente') + Case(
+                *[When(base__in=bases, then=Value(cantidad)) for cantidad, bases in por_cantidad.items()],
+                default=Value(0)
+            )
+        )
+        finales = dict(
+            ContadorBibtexKey.objects.filter(base__in=conteo).values_list('base', 'siguiente')
+        )
+
+    return {base: finales[base] - cantidad for base, cantidad in conteo.items()}
+
+
+def reservar_claves(bases):
+    """
+    Devuelve una bibtex_key única para cada clave base recibida, en el mismo orden.
+
+    Los sufijos se reservan en ContadorBibtexKey con un UPDATE atómico por lote,
+    así dos cargas simultáneas nunca reciben la misma clave y el coste no depende
+    del número de colisiones previas.
+    """
+    asignadas = [None] * len(bases)
+    usadas = set()
+    pendientes = list(enumerate(bases))
+
+    for _ in range(MAXIMO_RONDAS):
+        siguiente = _reservar(Counter(base for _, base in pendientes))
+        for indice, base in pendientes:
+            asignadas[indice] = _formatear(base, siguiente[base])
+            siguiente[base] += 1
+
+        # Claves que coinciden con artículos guardados sin pasar por el contador
+        # o con otra clave del mismo lote (p. ej. 'smith2020' y 'smith2020_1')
+        ocupadas = set(
+            Articulo.objects.filter(bibtex_key__in=[asignadas[i] for i, _ in pendientes])
+            .values_list('bibtex_key', flat=True)
+        )
+        conflictos = []
+        for indice, base in pendientes:
+            if asignadas[indice] in ocupadas or asignadas[indice] in usadas:
+                conflictos.append((indice, base))
+            else:
+                usadas.add(asignadas[indice])
+
+        pendientes = conflictos
+        if not pendientes:
+            return asignadas
+
+    raise RuntimeError(f"No se pudo reservar una clave libre para: {', '.join(b for _, b in pendientes)}")
+
+
+def reservar_clave(base):
+    """Reserva una única bibtex_key a partir de la clave base."""
+    return reservar_claves([base])[0]
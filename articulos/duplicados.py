@@ -0,0 +1,250 @@
+import hashlib
+import random
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from functools import cached_property
+
+from django.db import transaction
+
+from .models import Articulo, ClaveDeduplicacion
+
+
+# Parámetros de MinHash/LSH: 8 bandas de 4 filas detectan con alta probabilidad
+# títulos con similitud de Jaccard >= 0.8 y descartan casi todos los demás pares
+NUM_PERMUTACIONES = 32
+FILAS_POR_BANDA = 4
+TAMANO_SHINGLE = 3
+UMBRAL_SIMILITUD = 0.8
+
+# Cada permutación es un hash universal (a*h + b) mod p con a y b propios, sobre
+# el primo de Mersenne 2^61 - 1 (mayor que los hashes CRC32 de los shingles)
+PRIMO = (1 << 61) - 1
+_generador = random.Random(20240601)
+COEFICIENTES = [
+    (_generador.randrange(1, PRIMO), _generador.randrange(PRIMO))
+    for _ in range(NUM_PERMUTACIONES)
+]
+
+# Claves consultadas por sentencia (por debajo del límite de variables de SQLite)
+CLAVES_POR_CONSULTA = 500
+
+# Clave de los artículos sin DOI ni título: los marca como ya indexados
+CLAVE_VACIA = '-'
+
+DOI_PREFIJO_PATTERN = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+NO_ALFANUMERICO_PATTERN = re.compile(r'[^a-z0-9]+')
+
+
+def plegar_texto(texto):
+    """Pasa a minúsculas, elimina acentos y deja solo letras, números y espacios."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return NO_ALFANUMERICO_PATTERN.sub(' ', texto).strip()
+
+
+def normalizar_doi(doi):
+    doi = DOI_PREFIJO_PATTERN.sub('', (doi or '').strip()).lower()
+    return doi.rstrip('.;,') or None
+
+
+def normalizar_primer_autor(autores):
+    """Devuelve el apellido del primer autor ('Pérez, Ana; ...' o 'Ana Pérez and ...')."""
+    primer_autor = re.split(r';|\s+and\s+', autores or '')[0]
+    if ',' in primer_autor:
+        apellido = primer_autor.split(',')[0]
+    else:
+        partes = primer_autor.split()
+        apellido = partes[-1] if partes else ''
+    apellido = plegar_texto(apellido).replace(' ', '')
+    return apellido if apellido not in ('', 'autordesconocido', 'desconocido') else None
+
+
+def shingles(titulo):
+    """Conjunto de hashes de los n-gramas de caracteres del título normalizado."""
+    if len(titulo) < TAMANO_SHINGLE:
+        return {zlib.crc32(titulo.encode())} if titulo else set()
+    return {
+        zlib.crc32(titulo[i:i + TAMANO_SHINGLE].encode())
+        for i in range(len(titulo) - TAMANO_SHINGLE + 1)
+    }
+
+
+def firma_minhash(hashes):
+    return tuple(min((a * h + b) % PRIMO for h in hashes) for a, b in COEFICIENTES)
+
+
+def _resumen(texto):
+    return hashlib.blake2b(texto.encode(), digest_size=8).hexdigest()
+
+
+def _lotes(elementos, tamano=CLAVES_POR_CONSULTA):
+    elementos = list(elementos)
+    for inicio in range(0, len(elementos), tamano):
+        yield elementos[inicio:inicio + tamano]
+
+
+class RegistroDeduplicacion:
+    """Datos normalizados de un artículo usados para compararlo."""
+
+    def __init__(self, datos):
+        metadata = datos.get('metadata_completos') or {}
+        self.id = datos['id']
+        self.doi = normalizar_doi(datos.get('doi'))
+        self.titulo_original = datos.get('titulo')
+        self.autores = metadata.get('autores')
+        anio = metadata.get('anio_publicacion')
+        self.anio = int(anio) if str(anio or '').isdigit() else None
+
+    # El título y el autor se normalizan solo si el par llega a compararse
+    @cached_property
+    def autor(self):
+        return normalizar_primer_autor(self.autores)
+
+    @cached_property
+    def shingles(self):
+        return shingles(plegar_texto(self.titulo_original))
+
+    @cached_property
+    def firma(self):
+        return firma_minhash(self.shingles)
+
+    @cached_property
+    def claves(self):
+        """Claves de bloqueo: el DOI y una por banda LSH de la firma del título."""
+        claves = []
+        if self.doi:
+            claves.append(f'doi:{_resumen(self.doi)}')
+        if self.shingles:
+            for banda in range(0, NUM_PERMUTACIONES, FILAS_POR_BANDA):
+                filas = self.firma[banda:banda + FILAS_POR_BANDA]
+                claves.append(f'b{banda}:{_resumen(repr(filas))}')
+        return claves
+
+    def es_duplicado_de(self, otro):
+        """Verifica un par candidato con los datos exactos."""
+        if self.doi and otro.doi:
+            return self.doi == otro.doi
+        if self.anio and otro.anio and abs(self.anio - otro.anio) > 1:
+            return False
+        if self.autor and otro.autor and self.autor != otro.autor:
+            return False
+        if not self.shingles or not otro.shingles:
+            return False
+        interseccion = len(self.shingles & otro.shingles)
+        return interseccion / (len(self.shingles) + len(otro.shingles) - interseccion) >= UMBRAL_SIMILITUD
+
+
+class DetectorDuplicados:
+    """
+    Detecta artículos duplicados dentro de un proyecto y rellena articulo_original.
+
+    Los candidatos se obtienen por claves de bloqueo (DOI normalizado y bandas
+    LSH de la firma MinHash del título), por lo que el coste crece de forma
+    casi lineal con el número de artículos en lugar de comparar todos los pares.
+    Las claves de los artículos originales se guardan en ClaveDeduplicacion: el
+    modo incremental solo carga los artículos que comparten alguna clave.
+    """
+
+    def __init__(self, proyecto):
+        self.proyecto = proyecto
+        self.registros = {}
+        self.por_clave = defaultdict(list)
+
+    def _cargar(self, queryset):
+        datos = queryset.values('id', 'titulo', 'doi', 'metadata_completos').order_by('id')
+        return [RegistroDeduplicacion(d) for d in datos.iterator(chunk_size=2000)]
+
+    def _indexar(self, registro):
+        self.registros[registro.id] = registro
+        for clave in registro.claves:
+            self.por_clave[clave].append(registro.id)
+
+    def _candidatos(self, registro):
+        candidatos = set()
+        for clave in registro.claves:
+            candidatos.update(self.por_clave.get(clave, ()))
+        candidatos.discard(registro.id)
+        return candidatos
+
+    def _guardar_claves(self, registros):
+        ClaveDeduplicacion.objects.bulk_create([
+            ClaveDeduplicacion(proyecto=self.proyecto, articulo_id=registro.id, clave=clave)
+            for registro in registros
+            for clave in registro.claves or [CLAVE_VACIA]
+        ], batch_size=1000)
+
+    def _cargar_candidatos(self, base, nuevos, nuevos_ids):
+        """Artículos del proyecto que comparten alguna clave con los nuevos."""
+        claves = {clave for registro in nuevos for clave in registro.claves}
+        ids = set()
+        for lote in _lotes(claves):
+            ids.update(
+                ClaveDeduplicacion.objects.filter(proyecto=self.proyecto, clave__in=lote)
+                .values_list('articulo_id', flat=True)
+            )
+        ids -= nuevos_ids
+
+        candidatos = []
+        for lote in _lotes(sorted(ids)):
+            candidatos += self._cargar(base.filter(id__in=lote))
+        return candidatos
+
+    def detectar(self, nuevos_ids=None):
+        """
+        Marca los duplicados del proyecto. Con `nuevos_ids` solo se comparan esos
+        artículos contra los que comparten alguna clave (modo incremental tras una
+        importación); sin ellos se recalculan el proyecto completo y sus claves.
+        Devuelve el número de artículos marcados como duplicados.
+        """
+        base = Articulo.objects.filter(proyecto=self.proyecto, articulo_original__isnull=True)
+
+        with transaction.atomic():
+            if nuevos_ids is None:
+                nuevos = self._cargar(base)
+                ClaveDeduplicacion.objects.filter(proyecto=self.proyecto).delete()
+                originales = self._comparar_con_indice([], nuevos)
+            else:
+                nuevos_ids = set(nuevos_ids)
+                # Artículos anteriores a las claves (o creados sin detección): se indexan una vez
+                self._guardar_claves(self._cargar(
+                    base.exclude(id__in=nuevos_ids).filter(claves_deduplicacion__isnull=True)
+                ))
+                nuevos = self._cargar(base.filter(id__in=nuevos_ids))
+                ClaveDeduplicacion.objects.filter(articulo_id__in=nuevos_ids).delete()
+                originales = self._comparar_con_indice(
+                    self._cargar_candidatos(base, nuevos, nuevos_ids), nuevos
+                )
+
+            self._guardar_claves([registro for registro in nuevos if registro.id not in originales])
+            duplicados = [
+                Articulo(id=articulo_id, articulo_original_id=original_id)
+                for articulo_id, original_id in originales.items()
+            ]
+            Articulo.objects.bulk_update(duplicados, ['articulo_original'], batch_size=500)
+        return len(duplicados)
+
+    def _resolver(self, registro, coincidencias, originales):
+        """Devuelve el original (el artículo más antiguo del grupo) o None si el registro lo es."""
+        if not coincidencias:
+            return None
+        original = min(originales.get(c, c) for c in coincidencias)
+        return original if original < registro.id else None
+
+    def _comparar_con_indice(self, existentes, nuevos):
+        for registro in existentes:
+            self._indexar(registro)
+
+        originales = {}
+        for registro in nuevos:
+            coincidencias = [
+                candidato for candidato in self._candidatos(registro)
+                if registro.es_duplicado_de(self.registros[candidato])
+            ]
+            original = self._resolver(registro, coincidencias, originales)
+            if original:
+                originales[registro.id] = original
+            else:
+                self._indexar(registro)
+        return originales
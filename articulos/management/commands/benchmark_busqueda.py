@@ -0,0 +1,121 @@
+import itertools
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from articulos.busqueda import BackendBasico, obtener_backend
+from articulos.models import Articulo, TextoCompletoArticulo
+from pymetanalis.models import Proyecto
+
+
+PALABRAS = (
+    'meta analysis effect size random effects heterogeneity trial cohort outcome intervention '
+    'patients sample variance regression bias estimate confidence interval studies evidence '
+    'treatment control group review systematic mortality depression diabetes exercise vaccine '
+    'adolescents elderly screening prevalence incidence placebo randomized observational'
+).split()
+
+CONSULTAS = ['heterogeneity', 'random effects', 'diabetes exercise', 'vaccine adolescents trial', 'placeb']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la latencia de la búsqueda de texto completo con la búsqueda icontains. '
+        'Usa un proyecto existente o genera un corpus sintético que se descarta al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyecto', type=int, help='Proyecto existente sobre el que medir')
+        parser.add_argument('--generar', type=int, default=20000, help='Artículos sintéticos si no se indica proyecto')
+        parser.add_argument('--consultas', nargs='*', default=CONSULTAS)
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        backend = obtener_backend()
+        if isinstance(backend, BackendBasico):
+            raise CommandError('Esta base de datos no tiene índice de texto completo.')
+
+        if options['proyecto']:
+            self._medir(backend, options['proyecto'], options)
+            return
+
+        # El corpus sintético (y su índice) se crean en una transacción que se revierte
+        try:
+            with transaction.atomic():
+                proyecto = self._generar(options['generar'])
+                self._medir(backend, proyecto.id, options)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _generar(self, cantidad):
+        generador = random.Random(1)
+        usuario = User.objects.order_by('id').first() or User.objects.create(username='benchmark_busqueda')
+        proyecto = Proyecto.objects.create(nombre='Benchmark búsqueda', usuario_creador=usuario)
+
+        # Vocabulario con distribución de Zipf: pocas palabras muy frecuentes y
+        # muchas raras, como en un corpus real; las palabras del dominio quedan
+        # repartidas por todo el rango de frecuencias
+        vocabulario = [
+            ''.join(generador.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(generador.randint(3, 10)))
+            for _ in range(20000)
+        ]
+        for indice, palabra in enumerate(PALABRAS):
+            vocabulario[indice * 37 + 5] = palabra
+        acumulados = list(itertools.accumulate(1 / rango for rango in range(1, len(vocabulario) + 1)))
+        frase = lambda n: ' '.join(generador.choices(vocabulario, cum_weights=acumulados, k=n))
+
+        inicio = time.monotonic()
+        articulos = Articulo.objects.bulk_create([
+            Articulo(
+                proyecto=proyecto,
+                usuario_carga=usuario,
+                bibtex_key=f'benchmark_busqueda_{i}',
+                titulo=frase(10).capitalize(),
+                bibtex_original='',
+                metadata_completos={'abstract': frase(150), 'palabras_clave': frase(4).split()},
+            )
+            for i in range(cantidad)
+        ], batch_size=1000)
+        TextoCompletoArticulo.objects.bulk_create([
+            TextoCompletoArticulo(
+                articulo=articulo,
+                contenido=TextoCompletoArticulo.comprimir(texto),
+                longitud=len(texto)
+            )
+            for articulo, texto in ((a, frase(600)) for a in articulos)
+        ], batch_size=500)
+
+        self.stdout.write(f'{cantidad} artículos sintéticos creados en {time.monotonic() - inicio:.1f}s')
+
+        inicio = time.monotonic()
+        obtener_backend().indexar([articulo.id for articulo in articulos])
+        self.stdout.write(f'Indexados en {time.monotonic() - inicio:.1f}s')
+        return proyecto
+
+    def _medir(self, backend, proyecto_id, options):
+        basico = BackendBasico()
+        self.stdout.write(f"{'consulta':<30}{'icontains ms':>14}{backend.nombre + ' ms':>14}{'resultados':>12}")
+        for consulta in options['consultas']:
+            tiempo_basico = self._tiempo(basico, proyecto_id, consulta, options['repeticiones'])
+            tiempo_indice = self._tiempo(backend, proyecto_id, consulta, options['repeticiones'])
+            resultados = len(backend.buscar(proyecto_id, consulta, limite=1000))
+            self.stdout.write(
+                f'{consulta[:29]:<30}{tiempo_basico * 1000:>14.1f}{tiempo_indice * 1000:>14.1f}{resultados:>12}'
+            )
+
+    def _tiempo(self, backend, proyecto_id, consulta, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            backend.buscar(proyecto_id, consulta)
+            tiempos.append(time.perf_counter() - inicio)
+        return statistics.median(tiempos)
@@ -0,0 +1,211 @@
+import random
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from articulos.utils import ExtractorTexto
+
+
+CAMPOS = ['titulo', 'autores', 'abstract', 'doi', 'anio', 'journal', 'palabras_clave']
+
+PALABRAS = (
+    'meta analysis effect size random effects heterogeneity trial cohort outcome '
+    'intervention patients sample variance regression bias estimate confidence interval '
+    'studies evidence treatment control group review systematic analysis results'
+).split()
+
+
+def extraer_metadata_anterior(texto):
+    """Implementación previa de ExtractorTexto.extraer_metadata, usada como referencia."""
+    metadata = {
+        'titulo': None,
+        'autores': None,
+        'abstract': None,
+        'doi': None,
+        'anio': None,
+        'journal': None,
+        'palabras_clave': None,
+        'url': None
+    }
+
+    # Normalizar texto
+    texto_limpio = ' '.join(texto.split())
+
+    # Extraer DOI
+    doi_pattern = r'(?:DOI|doi)[\s:]+([10]\.\d{4,}[^\s]+)'
+    doi_match = re.search(doi_pattern, texto, re.IGNORECASE)
+    if doi_match:
+        metadata['doi'] = doi_match.group(1).strip()
+
+    # Extraer año (buscar años entre 1900 y 2099)
+    anio_pattern = r'\b(19|20)\d{2}\b'
+    anios = re.findall(anio_pattern, texto)
+    if anios:
+        # Tomar el primer año encontrado
+        metadata['anio'] = int(anios[0])
+
+    # Extraer título (generalmente las primeras líneas del documento)
+    lineas = texto.split('\n')
+    lineas_no_vacias = [l.strip() for l in lineas if l.strip()]
+    if lineas_no_vacias:
+        # El título suele ser la primera línea significativa
+        posibles_titulos = []
+        for linea in lineas_no_vacias[:10]:  # Revisar las primeras 10 líneas
+            if len(linea) > 20 and len(linea) < 300:  # Longitud razonable para un título
+                posibles_titulos.append(linea)
+
+        if posibles_titulos:
+            metadata['titulo'] = posibles_titulos[0]
+
+    # Extraer abstract
+    abstract_patterns = [
+        r'(?:ABSTRACT|Abstract|Resumen|RESUMEN)[\s:]+(.{100,2000}?)(?:\n\n|Keywords|KEYWORDS|Palabras clave|Introduction|INTRODUCTION)',
+        r'(?:ABSTRACT|Abstract)[\s:]+(.{100,2000}?)(?:\n\n|\n[A-Z])',
+    ]
+
+    for pattern in abstract_patterns:
+        abstract_match = re.search(pattern, texto, re.IGNORECASE | re.DOTALL)
+        if abstract_match:
+            abstract_text = abstract_match.group(1).strip()
+            # Limpiar el abstract
+            abstract_text = ' '.join(abstract_text.split())
+            metadata['abstract'] = abstract_text
+            break
+
+    # Extraer palabras clave
+    keywords_patterns = [
+        r'(?:Keywords|KEYWORDS|Palabras clave|PALABRAS CLAVE)[\s:]+(.+?)(?:\n\n|\n[A-Z]|Introduction|INTRODUCTION)',
+    ]
+
+    for pattern in keywords_patterns:
+        keywords_match = re.search(pattern, texto, re.IGNORECASE | re.DOTALL)
+        if keywords_match:
+            keywords_text = keywords_match.group(1).strip()
+            # Limpiar y formatear palabras clave
+            keywords_text = re.sub(r'\n', ' ', keywords_text)
+            keywords_text = re.sub(r'\s+', ' ', keywords_text)
+            metadata['palabras_clave'] = keywords_text
+            break
+
+    # Extraer journal/revista
+    journal_patterns = [
+        r'(?:Published in|Journal|Revista)[\s:]+([A-Z][^\n]{10,100})',
+    ]
+
+    for pattern in journal_patterns:
+        journal_match = re.search(pattern, texto, re.IGNORECASE)
+        if journal_match:
+            metadata['journal'] = journal_match.group(1).strip()
+            break
+
+    # Extraer autores (generalmente después del título)
+    # Este es más complejo y puede necesitar ajustes según el formato
+    if metadata['titulo'] and lineas_no_vacias:
+        try:
+            titulo_idx = next(i for i, l in enumerate(lineas_no_vacias) if metadata['titulo'] in l)
+            if titulo_idx + 1 < len(lineas_no_vacias):
+                posible_autores = lineas_no_vacias[titulo_idx + 1]
+                # Verificar si parece una línea de autores
+                if re.search(r'[A-Z][a-z]+.*[A-Z][a-z]+', posible_autores) and len(posible_autores) < 200:
+                    metadata['autores'] = posible_autores
+        except StopIteration:
+            pass
+
+    return metadata
+
+
+def _parrafo(generador, palabras):
+    return ' '.join(generador.choice(PALABRAS) for _ in range(palabras)).capitalize() + '.'
+
+
+def generar_corpus(semilla=1, tamanos=(5_000, 50_000, 500_000, 2_000_000)):
+    """
+    Documentos sintéticos con la estructura típica de un artículo y casos
+    patológicos: sin abstract, abstract sin terminador y años solo al final.
+    """
+    generador = random.Random(semilla)
+    corpus = []
+    for tamano in tamanos:
+        cabecera = (
+            'Journal of Applied Meta Analysis Research\n\n'
+            f'{_parrafo(generador, 10)}\n'
+            'Ana Pérez, John Smith, Maria Garcia\n'
+            'doi: 10.1234/jama.2021.00042\n\n'
+            f'Abstract: {_parrafo(generador, 120)}\n\n'
+            'Keywords: meta-analysis, heterogeneity, random effects\n\n'
+            'Introduction\n'
+        )
+        cuerpo = []
+        longitud = len(cabecera)
+        while longitud < tamano:
+            parrafo = _parrafo(generador, 80) + f' ({generador.randint(1950, 2023)})\n\n'
+            cuerpo.append(parrafo)
+            longitud += len(parrafo)
+        cuerpo = ''.join(cuerpo)
+
+        corpus.append((f'articulo_{tamano}', cabecera + cuerpo))
+        corpus.append((f'sin_abstract_{tamano}', cabecera.split('Abstract')[0] + cuerpo))
+        # Abstract seguido de un único bloque sin saltos de línea ni terminadores
+        corpus.append((
+            f'abstract_sin_fin_{tamano}',
+            'Abstract: ' + ' '.join(generador.choice(PALABRAS) for _ in range(tamano // 8))
+        ))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la latencia por documento de ExtractorTexto.extraer_metadata con la '
+        'implementación anterior sobre un corpus sintético y, opcionalmente, archivos reales.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivos', nargs='*', help='Archivos PDF/DOCX/TXT adicionales')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--semilla', type=int, default=1)
+
+    def handle(self, *args, **options):
+        corpus = generar_corpus(options['semilla'])
+        for ruta in options['archivos']:
+            try:
+                with open(ruta, 'rb') as archivo:
+                    ext = ruta.lower().split('.')[-1]
+                    if ext == 'pdf':
+                        texto = ExtractorTexto.extraer_de_pdf(archivo)
+                    elif ext in ['docx', 'doc']:
+                        texto = ExtractorTexto.extraer_de_docx(archivo)
+                    else:
+                        texto = ExtractorTexto.extraer_de_txt(archivo)
+            except Exception as e:
+                raise CommandError(f'No se pudo leer {ruta}: {e}')
+            corpus.append((ruta, texto))
+
+        self.stdout.write(f"{'documento':<28}{'caracteres':>12}{'anterior ms':>14}{'nuevo ms':>12}{'mejora':>9}  diferencias")
+        totales_anterior, totales_nuevo = [], []
+        for nombre, texto in corpus:
+            anterior, resultado_anterior = self._medir(extraer_metadata_anterior, texto, options['repeticiones'])
+            nuevo, resultado_nuevo = self._medir(ExtractorTexto.extraer_metadata, texto, options['repeticiones'])
+            totales_anterior.append(anterior)
+            totales_nuevo.append(nuevo)
+
+            diferencias = [c for c in CAMPOS if resultado_anterior[c] != resultado_nuevo[c]]
+            self.stdout.write(
+                f'{nombre[:27]:<28}{len(texto):>12}{anterior * 1000:>14.2f}{nuevo * 1000:>12.2f}'
+                f'{anterior / nuevo if nuevo else 0:>8.1f}x  {", ".join(diferencias) or "-"}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Total: anterior {sum(totales_anterior) * 1000:.1f} ms, '
+            f'nuevo {sum(totales_nuevo) * 1000:.1f} ms por pasada del corpus'
+        ))
+
+    def _medir(self, funcion, texto, repeticiones):
+        """Mediana del tiempo de `repeticiones` ejecuciones y el último resultado."""
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = funcion(texto)
+            tiempos.append(time.perf_counter() - inicio)
+        return statistics.median(tiempos), resultado
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from articulos.duplicados import DetectorDuplicados
+from articulos.models import Articulo
+from pymetanalis.models import Proyecto
+
+
+class Command(BaseCommand):
+    help = 'Detecta artículos duplicados (DOI, título, primer autor y año) y rellena articulo_original.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--proyecto',
+            type=int,
+            help='ID del proyecto a revisar (por defecto, todos los proyectos)'
+        )
+        parser.add_argument(
+            '--reiniciar',
+            action='store_true',
+            help='Borra las marcas de duplicado existentes antes de recalcularlas'
+        )
+
+    def handle(self, *args, **options):
+        proyectos = Proyecto.objects.all().order_by('id')
+        if options['proyecto']:
+            proyectos = proyectos.filter(id=options['proyecto'])
+            if not proyectos.exists():
+                raise CommandError(f"No existe el proyecto {options['proyecto']}")
+
+        total = 0
+        for proyecto in proyectos.iterator():
+            inicio = time.monotonic()
+            if options['reiniciar']:
+                Articulo.objects.filter(proyecto=proyecto).update(articulo_original=None)
+
+            marcados = DetectorDuplicados(proyecto).detectar()
+            total += marcados
+            self.stdout.write(
+                f'Proyecto {proyecto.id}: {marcados} duplicados marcados '
+                f'en {time.monotonic() - inicio:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'{total} duplicados marcados en total'))
@@ -0,0 +1,152 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from articulos.utils import ExtractorTexto
+
+from articulos.tareas import (
+    ExtraccionPaginada,
+    completar_trabajo,
+    ejecutar_extraccion,
+    fallar_trabajo,
+    liberar_trabajos,
+    reclamar_trabajos,
+    recuperar_trabajos_abandonados,
+)
+
+
+# Cada cuánto (segundos) el worker devuelve a la cola los trabajos de otros workers caídos
+INTERVALO_RECUPERACION = 60
+
+
+def _trabajos_en_curso(en_curso):
+    """Ids de los trabajos con algún futuro pendiente (un PDF ocupa un futuro por rango)."""
+    return {trabajo.id for trabajo, _ in en_curso.values()}
+
+
+class Command(BaseCommand):
+    help = (
+        'Procesa la cola de extracción de texto (PDF/DOCX/TXT) con un pool de procesos. '
+        'Solo usa la base de datos; no requiere un broker externo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Número de procesos de extracción (por defecto, los núcleos disponibles).'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2.0,
+            help='Segundos de espera entre consultas a la cola cuando no hay trabajo.'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Procesa los trabajos disponibles y termina.'
+        )
+
+    def handle(self, *args, **options):
+        procesos = max(1, options['procesos'])
+        intervalo = options['intervalo']
+        una_vez = options['una_vez']
+
+        self._recuperar()
+
+        # Los procesos hijos no deben heredar la conexión abierta del padre
+        connections.close_all()
+
+        self.stdout.write(f'Worker de extracción iniciado con {procesos} procesos.')
+        # futuro -> (trabajo, ExtraccionPaginada o None si el archivo se procesa completo)
+        en_curso = {}
+        ultima_recuperacion = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            try:
+                while True:
+                    if time.monotonic() - ultima_recuperacion >= INTERVALO_RECUPERACION:
+                        self._recuperar(excluir=_trabajos_en_curso(en_curso))
+                        ultima_recuperacion = time.monotonic()
+
+                    libres = procesos - len(_trabajos_en_curso(en_curso))
+                    reclamados = reclamar_trabajos(libres) if libres > 0 else []
+                    for trabajo in reclamados:
+                        self._enviar(pool, trabajo, en_curso)
+
+                    if not en_curso:
+                        if reclamados:
+                            continue
+                        if una_vez:
+                            break
+                        time.sleep(intervalo)
+                        continue
+
+                    terminados, _ = wait(en_curso, timeout=intervalo, return_when=FIRST_COMPLETED)
+                    for futuro in terminados:
+                        trabajo, extraccion = en_curso.pop(futuro)
+                        self._finalizar(trabajo, extraccion, futuro)
+            except KeyboardInterrupt:
+                liberar_trabajos(_trabajos_en_curso(en_curso))
+                pool.shutdown(cancel_futures=True)
+                self.stdout.write('Worker detenido; los trabajos en curso volvieron a la cola.')
+
+    def _recuperar(self, excluir=()):
+        recuperados = recuperar_trabajos_abandonados(excluir)
+        if recuperados:
+            self.stdout.write(f'{recuperados} trabajos abandonados devueltos a la cola.')
+
+    def _enviar(self, pool, trabajo, en_curso):
+        """Envía un trabajo al pool; los PDF se reparten en rangos de páginas."""
+        ruta = trabajo.archivo.ruta_archivo.path
+
+        if not trabajo.archivo.nombre_archivo.lower().endswith('.pdf'):
+            futuro = pool.submit(ejecutar_extraccion, ruta, trabajo.archivo.nombre_archivo)
+            en_curso[futuro] = (trabajo, None)
+            return
+
+        try:
+            extraccion = ExtraccionPaginada(trabajo)
+            if extraccion.terminada:
+                # Todas las páginas estaban en la caché
+                self._completar(trabajo, *extraccion.resultado())
+                return
+        except Exception as e:
+            self._fallar(trabajo, e)
+            return
+
+        for rango in extraccion.rangos:
+            futuro = pool.submit(ExtractorTexto.extraer_paginas_pdf, ruta, rango)
+            en_curso[futuro] = (trabajo, extraccion)
+
+    def _finalizar(self, trabajo, extraccion, futuro):
+        if extraccion is not None and extraccion.cancelada:
+            return
+
+        try:
+            resultado = futuro.result()
+            if extraccion is None:
+                metadata, texto = resultado
+            else:
+                extraccion.agregar(resultado)
+                if not extraccion.terminada:
+                    return
+                metadata, texto = extraccion.resultado()
+            self._completar(trabajo, metadata, texto)
+        except Exception as e:
+            if extraccion is not None:
+                extraccion.cancelada = True
+            self._fallar(trabajo, e)
+
+    def _completar(self, trabajo, metadata, texto):
+        articulo = completar_trabajo(trabajo, metadata, texto)
+        self.stdout.write(self.style.SUCCESS(f'Trabajo {trabajo.id}: artículo "{articulo.titulo}" creado.'))
+
+    def _fallar(self, trabajo, error):
+        fallar_trabajo(trabajo, error)
+        self.stdout.write(self.style.ERROR(f'Trabajo {trabajo.id}: {error}'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articulos.busqueda import BackendBasico, obtener_backend
+from articulos.models import Articulo
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de los artículos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyecto', type=int, help='ID del proyecto a reindexar (por defecto, todos)')
+
+    def handle(self, *args, **options):
+        backend = obtener_backend()
+        if isinstance(backend, BackendBasico):
+            self.stdout.write(self.style.WARNING(
+                'No hay índice de texto completo para esta base de datos; se usa búsqueda con icontains.'
+            ))
+            return
+
+        inicio = time.monotonic()
+        articulos = Articulo.objects.all()
+        backend.vaciar(options['proyecto'])
+        if options['proyecto']:
+            articulos = articulos.filter(proyecto_id=options['proyecto'])
+
+        ids = list(articulos.order_by('id').values_list('id', flat=True))
+        backend.indexar(ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(ids)} artículos indexados con {backend.nombre} en {time.monotonic() - inicio:.2f}s'
+        ))
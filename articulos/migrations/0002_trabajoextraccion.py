@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoExtraccion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En Proceso'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20)),
+                ('progreso', models.PositiveSmallIntegerField(default=0)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('max_intentos', models.PositiveSmallIntegerField(default=3)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('archivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos', to='articulos.archivosubida')),
+                ('articulo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos_extraccion', to='articulos.articulo')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos_extraccion', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'disponible_desde'], name='articulos_t_estado_32dcc0_idx')],
+            },
+        ),
+    ]
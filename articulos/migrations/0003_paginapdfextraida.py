@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0002_trabajoextraccion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaginaPdfExtraida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_contenido', models.CharField(max_length=64)),
+                ('numero_pagina', models.PositiveIntegerField()),
+                ('texto', models.TextField(blank=True)),
+                ('fecha_extraccion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Página PDF Extraída',
+                'verbose_name_plural': 'Páginas PDF Extraídas',
+                'unique_together': {('hash_contenido', 'numero_pagina')},
+            },
+        ),
+    ]
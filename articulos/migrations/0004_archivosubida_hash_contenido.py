@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0003_paginapdfextraida'),
+        ('pymetanalis', '0003_invitacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivosubida',
+            name='hash_contenido',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='archivosubida',
+            constraint=models.UniqueConstraint(fields=('proyecto', 'hash_contenido'), name='archivo_unico_por_proyecto'),
+        ),
+    ]
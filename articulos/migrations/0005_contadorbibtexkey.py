@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0004_archivosubida_hash_contenido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorBibtexKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.CharField(max_length=200, unique=True)),
+                ('siguiente', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador de Clave BibTeX',
+                'verbose_name_plural': 'Contadores de Claves BibTeX',
+            },
+        ),
+    ]
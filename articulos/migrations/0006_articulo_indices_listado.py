@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0005_contadorbibtexkey'),
+        ('pymetanalis', '0003_invitacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(fields=['proyecto', 'estado', '-fecha_carga', '-id'], name='articulo_tablero_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(fields=['proyecto', '-fecha_carga', '-id'], name='articulo_listado_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0006_articulo_indices_listado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TextoCompletoArticulo',
+            fields=[
+                ('articulo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='texto_completo', serialize=False, to='articulos.articulo')),
+                ('contenido', models.BinaryField()),
+                ('longitud', models.PositiveIntegerField(default=0)),
+                ('fecha_extraccion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Texto Completo de Artículo',
+                'verbose_name_plural': 'Textos Completos de Artículos',
+            },
+        ),
+    ]
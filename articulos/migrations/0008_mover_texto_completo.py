@@ -0,0 +1,56 @@
+import zlib
+
+from django.db import migrations
+
+
+TAMANO_LOTE = 500
+
+
+def mover_texto_completo(apps, schema_editor):
+    """Traslada metadata_completos['texto_completo'] a TextoCompletoArticulo."""
+    Articulo = apps.get_model('articulos', 'Articulo')
+    TextoCompletoArticulo = apps.get_model('articulos', 'TextoCompletoArticulo')
+
+    articulos = Articulo.objects.filter(metadata_completos__has_key='texto_completo').only('id', 'metadata_completos')
+    lote_textos, lote_articulos = [], []
+    for articulo in articulos.iterator(chunk_size=TAMANO_LOTE):
+        texto = articulo.metadata_completos.pop('texto_completo') or ''
+        lote_textos.append(TextoCompletoArticulo(
+            articulo_id=articulo.id,
+            contenido=zlib.compress(texto.encode('utf-8'), 6),
+            longitud=len(texto)
+        ))
+        lote_articulos.append(articulo)
+
+        if len(lote_articulos) >= TAMANO_LOTE:
+            TextoCompletoArticulo.objects.bulk_create(lote_textos, ignore_conflicts=True)
+            Articulo.objects.bulk_update(lote_articulos, ['metadata_completos'])
+            lote_textos, lote_articulos = [], []
+
+    if lote_articulos:
+        TextoCompletoArticulo.objects.bulk_create(lote_textos, ignore_conflicts=True)
+        Articulo.objects.bulk_update(lote_articulos, ['metadata_completos'])
+
+
+def restaurar_texto_completo(apps, schema_editor):
+    """Devuelve los primeros 5000 caracteres a metadata_completos, como antes."""
+    Articulo = apps.get_model('articulos', 'Articulo')
+    TextoCompletoArticulo = apps.get_model('articulos', 'TextoCompletoArticulo')
+
+    for registro in TextoCompletoArticulo.objects.select_related('articulo').iterator(chunk_size=TAMANO_LOTE):
+        articulo = registro.articulo
+        metadata = articulo.metadata_completos or {}
+        metadata['texto_completo'] = zlib.decompress(registro.contenido).decode('utf-8')[:5000]
+        articulo.metadata_completos = metadata
+        articulo.save(update_fields=['metadata_completos'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0007_textocompletoarticulo'),
+    ]
+
+    operations = [
+        migrations.RunPython(mover_texto_completo, restaurar_texto_completo),
+    ]
@@ -0,0 +1,129 @@
+import zlib
+
+from django.db import migrations
+
+
+# Copia de los valores de articulos.busqueda en el momento de esta migración;
+# la migración no importa el módulo para no cambiar si este se modifica
+TABLA_FTS5 = 'articulos_busqueda'
+TABLA_POSTGRES = 'articulos_busqueda_pg'
+LONGITUD_MAXIMA_TEXTO = 500_000
+TAMANO_LOTE = 500
+
+
+def _documentos(Articulo, TextoCompletoArticulo, ids):
+    textos = {
+        articulo_id: zlib.decompress(contenido).decode('utf-8')
+        for articulo_id, contenido in TextoCompletoArticulo.objects.filter(
+            articulo_id__in=ids
+        ).values_list('articulo_id', 'contenido')
+    }
+    for articulo_id, proyecto_id, titulo, metadata in Articulo.objects.filter(id__in=ids).values_list(
+        'id', 'proyecto_id', 'titulo', 'metadata_completos'
+    ):
+        metadata = metadata or {}
+        palabras_clave = metadata.get('palabras_clave') or []
+        if isinstance(palabras_clave, list):
+            palabras_clave = ', '.join(palabras_clave)
+        yield (
+            articulo_id,
+            proyecto_id,
+            titulo or '',
+            metadata.get('abstract') or '',
+            palabras_clave,
+            textos.get(articulo_id, '')[:LONGITUD_MAXIMA_TEXTO],
+        )
+
+
+def poblar_indice(apps, schema_editor):
+    """Indexa, por lotes, los artículos que ya existían al crear el índice de búsqueda."""
+    conexion = schema_editor.connection
+    tablas = conexion.introspection.table_names(include_views=False)
+    if conexion.vendor == 'sqlite' and TABLA_FTS5 in tablas:
+        sentencias = [
+            f'DELETE FROM {TABLA_FTS5} WHERE rowid = %s',
+            f'INSERT INTO {TABLA_FTS5} (rowid, proyecto_id, titulo, abstract, palabras_clave, texto) '
+            f'VALUES (%s, %s, %s, %s, %s, %s)',
+        ]
+    elif conexion.vendor == 'postgresql' and TABLA_POSTGRES in tablas:
+        sentencias = [
+            None,
+            f"INSERT INTO {TABLA_POSTGRES} (articulo_id, proyecto_id, documento) VALUES (%s, %s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || "
+            f"setweight(to_tsvector('simple', %s), 'B') || "
+            f"setweight(to_tsvector('simple', %s), 'B') || "
+            f"setweight(to_tsvector('simple', %s), 'D')) "
+            f"ON CONFLICT (articulo_id) DO UPDATE SET "
+            f"proyecto_id = EXCLUDED.proyecto_id, documento = EXCLUDED.documento",
+        ]
+    else:
+        # Sin tabla de índice la búsqueda usa el motor básico (icontains)
+        return
+
+    Articulo = apps.get_model('articulos', 'Articulo')
+    TextoCompletoArticulo = apps.get_model('articulos', 'TextoCompletoArticulo')
+    borrar, insertar = sentencias
+
+    ids = list(Articulo.objects.order_by('id').values_list('id', flat=True))
+    with conexion.cursor() as cursor:
+        for inicio in range(0, len(ids), TAMANO_LOTE):
+            documentos = list(_documentos(Articulo, TextoCompletoArticulo, ids[inicio:inicio + TAMANO_LOTE]))
+            if borrar:
+                cursor.executemany(borrar, [(documento[0],) for documento in documentos])
+            cursor.executemany(insertar, documentos)
+
+
+def crear_indice(apps, schema_editor):
+    """Crea la tabla del índice de búsqueda según el motor de base de datos."""
+    conexion = schema_editor.connection
+
+    if conexion.vendor == 'sqlite':
+        with conexion.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                # Sin FTS5 la búsqueda usa el motor básico (icontains)
+                return
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS articulos_busqueda USING fts5("
+                "proyecto_id UNINDEXED, titulo, abstract, palabras_clave, texto, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    elif conexion.vendor == 'postgresql':
+        with conexion.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS articulos_busqueda_pg ("
+                "articulo_id bigint PRIMARY KEY REFERENCES articulos_articulo (id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "proyecto_id bigint NOT NULL, "
+                "documento tsvector NOT NULL)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS articulos_busqueda_pg_documento "
+                "ON articulos_busqueda_pg USING GIN (documento)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS articulos_busqueda_pg_proyecto "
+                "ON articulos_busqueda_pg (proyecto_id)"
+            )
+
+
+def eliminar_indice(apps, schema_editor):
+    conexion = schema_editor.connection
+    if conexion.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS articulos_busqueda')
+    elif conexion.vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS articulos_busqueda_pg')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0008_mover_texto_completo'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+        # Los artículos existentes se indexan en la misma migración: el índice nunca queda vacío
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articulos', '0009_indice_busqueda'),
+        ('pymetanalis', '0009_correopendiente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaveDeduplicacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=40)),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claves_deduplicacion', to='articulos.articulo')),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claves_deduplicacion', to='pymetanalis.proyecto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['proyecto', 'clave'], name='clave_deduplicacion_idx')],
+            },
+        ),
+    ]
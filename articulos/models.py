@@ -1,5 +1,10 @@
-from django.db import models
+import zlib
+
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.utils import timezone
 from pymetanalis.models import Proyecto
 
 class Articulo(models.Model):
@@ -29,9 +34,40 @@ class Articulo(models.Model):
     )
     fecha_carga = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Columnas del tablero: filtro por proyecto y estado, orden por fecha de carga
+            models.Index(fields=['proyecto', 'estado', '-fecha_carga', '-id'], name='articulo_tablero_idx'),
+            models.Index(fields=['proyecto', '-fecha_carga', '-id'], name='articulo_listado_idx'),
+        ]
+
     def __str__(self):
         return self.titulo
 
+    def cambiar_estado(self, nuevo_estado, usuario=None):
+        """
+        Cambia el estado, registra el cambio en el historial y ajusta los contadores
+        del proyecto en la misma transacción. Devuelve False si ya tenía ese estado.
+        """
+        with transaction.atomic():
+            anterior = Articulo.objects.select_for_update().values_list('estado', flat=True).get(pk=self.pk)
+            if anterior == nuevo_estado:
+                self.estado = anterior
+                return False
+
+            Articulo.objects.filter(pk=self.pk).update(estado=nuevo_estado)
+            self.estado = nuevo_estado
+            Proyecto.ajustar_contadores(self.proyecto_id, {anterior: -1, nuevo_estado: 1})
+            HistorialArticulo.objects.create(
+                articulo=self,
+                usuario=usuario,
+                tipo_cambio='CAMBIO_ESTADO',
+                campo_modificado='estado',
+                valor_anterior=anterior,
+                valor_nuevo=nuevo_estado
+            )
+        return True
+
 
 class ArchivoSubida(models.Model):
     proyecto = models.ForeignKey(Proyecto, on_delete=models.CASCADE, related_name='archivos_subidos')
@@ -40,8 +76,17 @@ class ArchivoSubida(models.Model):
     ruta_archivo = models.FileField(upload_to='uploads/articulos/')
     articulos_procesados = models.IntegerField(default=0)
     errores_procesamiento = models.JSONField(null=True, blank=True)
+    hash_contenido = models.CharField(max_length=64, null=True, blank=True)
     fecha_subida = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['proyecto', 'hash_contenido'],
+                name='archivo_unico_por_proyecto'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.nombre_archivo} ({self.proyecto.nombre})"
 
@@ -63,4 +108,170 @@ class HistorialArticulo(models.Model):
     fecha = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.tipo_cambio} - {self.articulo.titulo}"
\ No newline at end of file
+        return f"{self.tipo_cambio} - {self.articulo.titulo}"
+
+class TrabajoExtraccion(models.Model):
+    """Extracción de texto pendiente de un ArchivoSubida, procesada fuera de la petición HTTP."""
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    archivo = models.ForeignKey(ArchivoSubida, on_delete=models.CASCADE, related_name='trabajos')
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='trabajos_extraccion')
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE')
+    progreso = models.PositiveSmallIntegerField(default=0)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=3)
+    error = models.TextField(null=True, blank=True)
+    articulo = models.ForeignKey(
+        Articulo,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='trabajos_extraccion'
+    )
+    disponible_desde = models.DateTimeField(default=timezone.now)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde']),
+        ]
+
+    def __str__(self):
+        return f"Trabajo #{self.id} - {self.archivo.nombre_archivo} ({self.estado})"
+
+
+class PaginaPdfExtraida(models.Model):
+    """Texto extraído de una página de PDF, identificado por el hash del contenido del archivo."""
+    hash_contenido = models.CharField(max_length=64)
+    numero_pagina = models.PositiveIntegerField()
+    texto = models.TextField(blank=True)
+    fecha_extraccion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('hash_contenido', 'numero_pagina')
+        verbose_name = 'Página PDF Extraída'
+        verbose_name_plural = 'Páginas PDF Extraídas'
+
+    def __str__(self):
+        return f"{self.hash_contenido[:12]} - página {self.numero_pagina + 1}"
+
+
+class ContadorBibtexKey(models.Model):
+    """Siguiente sufijo libre de cada clave base de BibTeX (0 = la clave sin sufijo está libre)."""
+    base = models.CharField(max_length=200, unique=True)
+    siguiente = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Contador de Clave BibTeX'
+        verbose_name_plural = 'Contadores de Claves BibTeX'
+
+    def __str__(self):
+        return f"{self.base} ({self.siguiente})"
+
+
+class TextoCompletoArticulo(models.Model):
+    """
+    Texto completo extraído de un artículo, comprimido con zlib.
+
+    Se guarda fuera de Articulo para que los listados no lo lean; se carga
+    solo cuando se consulta un artículo concreto.
+    """
+    articulo = models.OneToOneField(
+        Articulo,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='texto_completo'
+    )
+    contenido = models.BinaryField()
+    longitud = models.PositiveIntegerField(default=0)
+    fecha_extraccion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Texto Completo de Artículo'
+        verbose_name_plural = 'Textos Completos de Artículos'
+
+    @staticmethod
+    def comprimir(texto):
+        return zlib.compress(texto.encode('utf-8'), 6)
+
+    @property
+    def texto(self):
+        return zlib.decompress(self.contenido).decode('utf-8')
+
+    def __str__(self):
+        return f"Texto de {self.articulo_id} ({self.longitud} caracteres)"
+
+
+class ClaveDeduplicacion(models.Model):
+    """
+    Claves de bloqueo de un artículo (DOI normalizado y bandas LSH de su título)
+    para la detección de duplicados. Al importar, los candidatos de cada artículo
+    nuevo se buscan por estas claves en lugar de cargar todo el proyecto.
+    """
+    proyecto = models.ForeignKey(Proyecto, on_delete=models.CASCADE, related_name='claves_deduplicacion')
+    articulo = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='claves_deduplicacion')
+    clave = models.CharField(max_length=40)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['proyecto', 'clave'], name='clave_deduplicacion_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.clave} → {self.articulo_id}"
+
+
+# ========== ÍNDICE DE BÚSQUEDA ==========
+# bulk_create no emite señales: quien crea artículos en bloque llama a
+# busqueda.indexar_articulos explícitamente (ver ImportadorBibtex)
+
+CAMPOS_INDEXADOS = {'titulo', 'metadata_completos', 'proyecto', 'proyecto_id'}
+
+
+@receiver(post_save, sender=Articulo)
+def indexar_articulo(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not CAMPOS_INDEXADOS.intersection(update_fields):
+        return
+    from .busqueda import indexar_articulos
+    articulo_id = instance.id
+    transaction.on_commit(lambda: indexar_articulos([articulo_id]))
+
+
+@receiver(post_save, sender=TextoCompletoArticulo)
+def indexar_texto_completo(sender, instance, **kwargs):
+    from .busqueda import indexar_articulos
+    articulo_id = instance.articulo_id
+    transaction.on_commit(lambda: indexar_articulos([articulo_id]))
+
+
+@receiver(post_delete, sender=Articulo)
+def desindexar_articulo(sender, instance, **kwargs):
+    from .busqueda import eliminar_articulos
+    articulo_id = instance.id
+    transaction.on_commit(lambda: eliminar_articulos([articulo_id]))
+
+
+# ========== CONTADORES DEL PROYECTO ==========
+# Igual que el índice, los artículos creados con bulk_create se cuentan
+# explícitamente (ImportadorBibtex llama a Proyecto.ajustar_contadores)
+
+@receiver(post_save, sender=Articulo)
+def contar_articulo_creado(sender, instance, created, **kwargs):
+    if created:
+        Proyecto.ajustar_contadores(instance.proyecto_id, {instance.estado: 1})
+
+
+@receiver(post_delete, sender=Articulo)
+def descontar_articulo_eliminado(sender, instance, origin=None, **kwargs):
+    # Si se borra el proyecto entero no tiene sentido actualizar sus contadores
+    if isinstance(origin, Proyecto) or getattr(origin, 'model', None) is Proyecto:
+        return
+    Proyecto.ajustar_contadores(instance.proyecto_id, {instance.estado: -1})
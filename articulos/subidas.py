@@ -0,0 +1,27 @@
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashContenidoUploadHandler(FileUploadHandler):
+    """
+    Calcula el SHA-256 de cada archivo mientras se recibe la subida.
+
+    No almacena nada: deja pasar cada bloque al siguiente handler (memoria o
+    archivo temporal) y guarda el hash en request.hashes_subida[campo], de modo
+    que el contenido se lee una sola vez.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'hashes_subida'):
+            self.request.hashes_subida = {}
+        self.request.hashes_subida[self.field_name] = self.sha256.hexdigest()
+        return None
@@ -0,0 +1,262 @@
+import datetime
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from pymetanalis.notificaciones import notificar_articulos_nuevos
+
+from .claves import reservar_clave
+from .duplicados import DetectorDuplicados
+from .models import (
+    Articulo,
+    HistorialArticulo,
+    PaginaPdfExtraida,
+    TextoCompletoArticulo,
+    TrabajoExtraccion,
+)
+from .utils import ExtractorTexto
+
+logger = logging.getLogger(__name__)
+
+# Espera base antes de reintentar un trabajo fallido (se duplica en cada intento)
+ESPERA_REINTENTO = datetime.timedelta(seconds=30)
+
+# Páginas de PDF que procesa cada tarea enviada al pool
+PAGINAS_POR_RANGO = 25
+
+# Tiempo tras el cual un trabajo EN_PROCESO se considera abandonado por su worker
+TIEMPO_MAXIMO_PROCESO = datetime.timedelta(minutes=15)
+
+
+def encolar_extraccion(archivo_subida, usuario):
+    """Crea el trabajo de extracción para un archivo recién subido."""
+    return TrabajoExtraccion.objects.create(archivo=archivo_subida, usuario=usuario)
+
+
+def reclamar_trabajos(limite):
+    """
+    Marca como EN_PROCESO hasta `limite` trabajos disponibles y los devuelve.
+
+    Cada trabajo se reclama con un UPDATE condicionado al estado PENDIENTE,
+    así dos workers nunca procesan el mismo trabajo (también en SQLite).
+    """
+    ahora = timezone.now()
+    candidatos = TrabajoExtraccion.objects.filter(
+        estado='PENDIENTE',
+        disponible_desde__lte=ahora
+    ).values_list('id', flat=True)[:limite]
+
+    reclamados = [
+        trabajo_id for trabajo_id in candidatos
+        if TrabajoExtraccion.objects.filter(id=trabajo_id, estado='PENDIENTE').update(
+            estado='EN_PROCESO',
+            progreso=10,
+            intentos=F('intentos') + 1,
+            fecha_inicio=ahora
+        )
+    ]
+
+    return list(
+        TrabajoExtraccion.objects.filter(id__in=reclamados).select_related('archivo', 'archivo__proyecto', 'usuario')
+    )
+
+
+def recuperar_trabajos_abandonados(excluir=()):
+    """
+    Devuelve a la cola los trabajos cuyo worker terminó sin completarlos.
+    `excluir` son los trabajos que el worker que llama sigue procesando.
+    """
+    limite = timezone.now() - TIEMPO_MAXIMO_PROCESO
+    return TrabajoExtraccion.objects.filter(
+        estado='EN_PROCESO',
+        fecha_inicio__lt=limite
+    ).exclude(id__in=list(excluir)).update(estado='PENDIENTE', progreso=0)
+
+
+def liberar_trabajos(ids):
+    """Devuelve a la cola trabajos reclamados que el worker no llegó a terminar."""
+    return TrabajoExtraccion.objects.filter(id__in=ids, estado='EN_PROCESO').update(
+        estado='PENDIENTE',
+        progreso=0
+    )
+
+
+def crear_articulo_extraido(archivo_subida, usuario, metadata, texto_completo):
+    """Crea el Articulo y su historial a partir de la metadata extraída de un archivo."""
+    nombre_archivo = archivo_subida.nombre_archivo
+
+    # Generar bibtex_key único
+    bibtex_key = reservar_clave(ExtractorTexto.generar_bibtex_key(
+        metadata['autores'],
+        metadata['anio']
+    ))
+
+    # Generar BibTeX
+    bibtex_original = ExtractorTexto.generar_bibtex(metadata, bibtex_key)
+
+    # Preparar metadata_completos
+    metadata_completos = {
+        'autores': metadata['autores'],
+        'abstract': metadata['abstract'],
+        'anio_publicacion': metadata['anio'],
+        'palabras_clave': metadata['palabras_clave'].split(',') if metadata['palabras_clave'] else [],
+        'archivo_origen': nombre_archivo,
+        'extraido_automaticamente': True
+    }
+
+    if metadata.get('journal'):
+        metadata_completos['journal'] = metadata['journal']
+    if metadata.get('url'):
+        metadata_completos['url'] = metadata['url']
+
+    with transaction.atomic():
+        articulo = Articulo.objects.create(
+            proyecto=archivo_subida.proyecto,
+            usuario_carga=usuario,
+            bibtex_key=bibtex_key,
+            titulo=metadata['titulo'],
+            doi=metadata.get('doi'),
+            bibtex_original=bibtex_original,
+            metadata_completos=metadata_completos,
+            estado='PENDIENTE'
+        )
+
+        # El texto completo se guarda aparte y comprimido; los listados no lo cargan
+        TextoCompletoArticulo.objects.create(
+            articulo=articulo,
+            contenido=TextoCompletoArticulo.comprimir(texto_completo),
+            longitud=len(texto_completo)
+        )
+
+        HistorialArticulo.objects.create(
+            articulo=articulo,
+            usuario=usuario,
+            tipo_cambio='CREACION',
+            valor_nuevo=f'Artículo creado desde archivo: {nombre_archivo}'
+        )
+
+        archivo_subida.articulos_procesados = 1
+        archivo_subida.errores_procesamiento = None
+        archivo_subida.save(update_fields=['articulos_procesados', 'errores_procesamiento'])
+
+    return articulo
+
+
+def ejecutar_extraccion(ruta, nombre_archivo):
+    """Función ejecutada en los procesos del pool; no accede a la base de datos."""
+    return ExtractorTexto.procesar_ruta(ruta, nombre_archivo)
+
+
+class ExtraccionPaginada:
+    """
+    Extracción de un PDF dividida en rangos de páginas para repartirlos entre procesos.
+
+    Las páginas ya extraídas de un archivo con el mismo contenido (mismo SHA-256)
+    se toman de PaginaPdfExtraida y no se vuelven a procesar.
+    """
+
+    def __init__(self, trabajo, paginas_por_rango=PAGINAS_POR_RANGO):
+        self.trabajo = trabajo
+        self.ruta = trabajo.archivo.ruta_archivo.path
+
+        self.hash_contenido = trabajo.archivo.hash_contenido
+        if not self.hash_contenido:
+            with open(self.ruta, 'rb') as archivo:
+                self.hash_contenido = ExtractorTexto.calcular_hash(archivo)
+
+        self.textos = dict(
+            PaginaPdfExtraida.objects.filter(hash_contenido=self.hash_contenido)
+            .values_list('numero_pagina', 'texto')
+        )
+        total_paginas = ExtractorTexto.contar_paginas_pdf(self.ruta)
+        faltantes = [n for n in range(total_paginas) if n not in self.textos]
+
+        self.rangos = ExtractorTexto.dividir_en_rangos(faltantes, paginas_por_rango)
+        self.pendientes = len(self.rangos)
+        self.nuevas = {}
+        self.cancelada = False
+
+    @property
+    def terminada(self):
+        return self.pendientes == 0
+
+    def agregar(self, textos):
+        """Incorpora el resultado de un rango de páginas y actualiza el progreso."""
+        self.textos.update(textos)
+        self.nuevas.update(textos)
+        self.pendientes -= 1
+
+        if self.rangos:
+            progreso = 10 + int(50 * (len(self.rangos) - self.pendientes) / len(self.rangos))
+            TrabajoExtraccion.objects.filter(id=self.trabajo.id).update(progreso=progreso)
+
+    def resultado(self):
+        """Guarda las páginas nuevas en la caché y devuelve (metadata, texto)."""
+        PaginaPdfExtraida.objects.bulk_create(
+            [
+                PaginaPdfExtraida(hash_contenido=self.hash_contenido, numero_pagina=numero, texto=texto)
+                for numero, texto in self.nuevas.items()
+            ],
+            batch_size=500,
+            ignore_conflicts=True
+        )
+
+        texto = ExtractorTexto.unir_paginas(self.textos)
+        return ExtractorTexto.construir_metadata(texto, self.trabajo.archivo.nombre_archivo), texto
+
+
+def completar_trabajo(trabajo, metadata, texto_completo):
+    """Guarda el resultado de una extracción exitosa."""
+    TrabajoExtraccion.objects.filter(id=trabajo.id).update(progreso=60)
+
+    # El artículo y el estado COMPLETADO se guardan juntos: un trabajo reintentado
+    # nunca puede crear un segundo artículo a partir del mismo archivo
+    with transaction.atomic():
+        articulo = crear_articulo_extraido(trabajo.archivo, trabajo.usuario, metadata, texto_completo)
+
+        trabajo.articulo = articulo
+        trabajo.estado = 'COMPLETADO'
+        trabajo.progreso = 100
+        trabajo.error = None
+        trabajo.fecha_fin = timezone.now()
+        trabajo.save(update_fields=['articulo', 'estado', 'progreso', 'error', 'fecha_fin'])
+
+    # Pasos complementarios: si fallan, el trabajo sigue completado
+    try:
+        DetectorDuplicados(articulo.proyecto).detectar([articulo.id])
+    except Exception as e:
+        logger.error(f"Trabajo {trabajo.id}: no se pudieron detectar duplicados del artículo {articulo.id}: {e}")
+    try:
+        notificar_articulos_nuevos(articulo.proyecto, 1, trabajo.usuario)
+    except Exception as e:
+        logger.error(f"Trabajo {trabajo.id}: no se pudo notificar el artículo {articulo.id}: {e}")
+    return articulo
+
+
+def fallar_trabajo(trabajo, error):
+    """Registra el error y reprograma el trabajo con espera exponencial o lo marca FALLIDO."""
+    trabajo.refresh_from_db(fields=['intentos'])
+    trabajo.error = str(error)
+    trabajo.progreso = 0
+
+    if trabajo.intentos < trabajo.max_intentos:
+        trabajo.estado = 'PENDIENTE'
+        trabajo.disponible_desde = timezone.now() + ESPERA_REINTENTO * (2 ** (trabajo.intentos - 1))
+        trabajo.save(update_fields=['estado', 'error', 'progreso', 'disponible_desde'])
+        logger.warning(f"Trabajo {trabajo.id} falló (intento {trabajo.intentos}), se reintentará: {error}")
+        return
+
+    trabajo.estado = 'FALLIDO'
+    trabajo.fecha_fin = timezone.now()
+    trabajo.save(update_fields=['estado', 'error', 'progreso', 'fecha_fin'])
+
+    archivo_subida = trabajo.archivo
+    archivo_subida.errores_procesamiento = {
+        'error': str(error),
+        'intentos': trabajo.intentos,
+        'timestamp': timezone.now().isoformat()
+    }
+    archivo_subida.save(update_fields=['errores_procesamiento'])
+    logger.error(f"Trabajo {trabajo.id} marcado como FALLIDO tras {trabajo.intentos} intentos: {error}")
@@ -1,3 +1,564 @@
-from django.test import TestCase
+import importlib
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pymetanalis.models import Proyecto, UsuarioProyecto
+
+from .bibtex import ImportadorBibtex, parsear_entrada, reemplazar_clave
+from .busqueda import BackendBusqueda, buscar_articulos, obtener_backend
+from .claves import BASES_POR_CONSULTA, reservar_clave, reservar_claves
+from .duplicados import DetectorDuplicados, RegistroDeduplicacion
+from .models import ArchivoSubida, Articulo, ClaveDeduplicacion, ContadorBibtexKey, PaginaPdfExtraida, TrabajoExtraccion
+from .management.commands.procesar_extracciones import _trabajos_en_curso
+from .tareas import (
+    ESPERA_REINTENTO, TIEMPO_MAXIMO_PROCESO, ExtraccionPaginada, completar_trabajo, encolar_extraccion,
+    fallar_trabajo, reclamar_trabajos, recuperar_trabajos_abandonados,
+)
+from .utils import ExtractorTexto
+
+
+MEDIA_PRUEBAS = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_PRUEBAS, ignore_errors=True)
+
+
+def generar_bib(cantidad):
+    """Un .bib con `cantidad` entradas de claves distintas."""
+    entradas = []
+    for i in range(cantidad):
+        entradas.append(
+            f'@article{{autor{i}2020,\n'
+            f'  title = {{Artículo de prueba {i}}},\n'
+            f'  author = {{Autor, Prueba}},\n'
+            f'  year = {{2020}}\n'
+            f'}}\n'
+        )
+    return '\n'.join(entradas).encode('utf-8')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class ImportadorBibtexTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('importador', 'importador@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto de prueba', usuario_creador=self.usuario)
+
+    def _archivo(self, cantidad):
+        archivo = ArchivoSubida(proyecto=self.proyecto, usuario=self.usuario, nombre_archivo='prueba.bib')
+        archivo.ruta_archivo.save('prueba.bib', ContentFile(generar_bib(cantidad)), save=False)
+        archivo.save()
+        return archivo
+
+    def test_importa_mas_entradas_que_un_lote(self):
+        """Más de 500 claves nuevas en un lote no deben superar los límites de SQLite."""
+        archivo = self._archivo(1200)
+
+        importador = ImportadorBibtex(archivo, self.usuario)
+        creados = importador.importar()
+
+        self.assertEqual(creados, 1200)
+        self.assertEqual(importador.errores, [])
+        claves = list(Articulo.objects.filter(proyecto=self.proyecto).values_list('bibtex_key', flat=True))
+        self.assertEqual(len(claves), 1200)
+        self.assertEqual(len(set(claves)), 1200)
+
+        archivo.refresh_from_db()
+        self.proyecto.refresh_from_db()
+        self.assertEqual(archivo.articulos_procesados, 1200)
+        self.assertEqual(self.proyecto.articulos_pendientes, 1200)
+
+    def test_reimportar_continua_los_sufijos(self):
+        ImportadorBibtex(self._archivo(20), self.usuario).importar()
+        ImportadorBibtex(self._archivo(20), self.usuario).importar()
+
+        claves = set(Articulo.objects.filter(proyecto=self.proyecto).values_list('bibtex_key', flat=True))
+        self.assertEqual(len(claves), 40)
+        self.assertIn('autor02020_1', claves)
+
+    def test_texto_original_usa_la_clave_con_sufijo(self):
+        ImportadorBibtex(self._archivo(1), self.usuario).importar()
+        ImportadorBibtex(self._archivo(1), self.usuario).importar()
+
+        for clave, texto in Articulo.objects.values_list('bibtex_key', 'bibtex_original'):
+            self.assertEqual(parsear_entrada(texto)['clave'], clave)
+
+    def test_reemplazar_clave_conserva_el_resto_del_texto(self):
+        texto = '@article{ autor2020 ,\n  title = {Título}\n}'
+        self.assertEqual(reemplazar_clave(texto, 'autor2020_1'), '@article{ autor2020_1 ,\n  title = {Título}\n}')
+
+
+class ReservaClavesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('claves', 'claves@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto de claves', usuario_creador=self.usuario)
+
+    def _articulo(self, clave):
+        return Articulo.objects.create(
+            proyecto=self.proyecto, usuario_carga=self.usuario,
+            bibtex_key=clave, titulo=clave, bibtex_original='@article{}'
+        )
+
+    def test_clave_libre_no_lleva_sufijo(self):
+        self.assertEqual(reservar_clave('smith2020'), 'smith2020')
+        self.assertEqual(ContadorBibtexKey.objects.get(base='smith2020').siguiente, 1)
+
+    def test_contador_nuevo_continua_las_claves_guardadas(self):
+        self._articulo('smith2020')
+        self._articulo('smith2020_4')
+        self._articulo('smith2020_extra')
+
+        self.assertEqual(reservar_clave('smith2020'), 'smith2020_5')
+
+    def test_misma_base_en_un_lote_recibe_sufijos_consecutivos(self):
+        claves = reservar_claves(['lee2019', 'smith2020', 'lee2019', 'lee2019'])
+
+        self.assertEqual(claves, ['lee2019', 'smith2020', 'lee2019_1', 'lee2019_2'])
+        self.assertEqual(ContadorBibtexKey.objects.get(base='lee2019').siguiente, 3)
+
+    def test_reservas_sucesivas_no_se_repiten_aunque_no_se_guarden(self):
+        """Dos cargas que reservan antes de guardar sus artículos reciben claves distintas."""
+        primera = reservar_claves(['lee2019', 'lee2019'])
+        segunda = reservar_claves(['lee2019', 'lee2019'])
+
+        self.assertEqual(primera, ['lee2019', 'lee2019_1'])
+        self.assertEqual(segunda, ['lee2019_2', 'lee2019_3'])
+
+    def test_salta_claves_guardadas_fuera_del_contador(self):
+        reservar_clave('smith2020')
+        self._articulo('smith2020_1')
+
+        self.assertEqual(reservar_clave('smith2020'), 'smith2020_2')
+
+    def test_evita_colisiones_dentro_del_lote(self):
+        """'smith2020_1' como base no debe chocar con el sufijo 1 de 'smith2020'."""
+        claves = reservar_claves(['smith2020', 'smith2020', 'smith2020_1'])
+
+        self.assertEqual(len(set(claves)), 3)
+
+    def test_muchas_bases_nuevas(self):
+        bases = [f'autor{indice}2020' for indice in range(BASES_POR_CONSULTA * 2 + 1)]
+        for base in bases[:3]:
+            self._articulo(base)
+
+        claves = reservar_claves(bases)
+
+        self.assertEqual(claves[:3], [f'{base}_1' for base in bases[:3]])
+        self.assertEqual(claves[3:], bases[3:])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class AgregarArticuloBibTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('subidor', 'subidor@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto de subida', usuario_creador=self.usuario)
+        UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+        self.client.force_login(self.usuario)
+        self.url = reverse('articulos:agregar_articulo', args=[self.proyecto.id])
+
+    def _subir(self):
+        return self.client.post(self.url, {
+            'archivo': SimpleUploadedFile('referencias.bib', generar_bib(30), content_type='text/plain'),
+        })
+
+    def test_importacion_fallida_permite_volver_a_subir(self):
+        with mock.patch('articulos.bibtex.reservar_claves', side_effect=RuntimeError('fallo')):
+            self._subir()
+
+        self.assertFalse(ArchivoSubida.objects.filter(proyecto=self.proyecto).exists())
+        self.assertFalse(Articulo.objects.filter(proyecto=self.proyecto).exists())
+
+        self._subir()
+        self.assertEqual(Articulo.objects.filter(proyecto=self.proyecto).count(), 30)
+        self.assertEqual(ArchivoSubida.objects.get(proyecto=self.proyecto).articulos_procesados, 30)
+
+    def test_fallo_de_duplicados_conserva_la_importacion(self):
+        with mock.patch('articulos.bibtex.DetectorDuplicados.detectar', side_effect=RuntimeError('fallo')):
+            respuesta = self._subir()
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(Articulo.objects.filter(proyecto=self.proyecto).count(), 30)
+        self.assertEqual(ArchivoSubida.objects.get(proyecto=self.proyecto).articulos_procesados, 30)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class CompletarTrabajoTests(TestCase):
+
+    def test_fallo_de_duplicados_no_reencola_el_trabajo(self):
+        usuario = User.objects.create_user('extractor', 'extractor@gmail.com', 'clave')
+        proyecto = Proyecto.objects.create(nombre='Proyecto de extracción', usuario_creador=usuario)
+        archivo = ArchivoSubida(proyecto=proyecto, usuario=usuario, nombre_archivo='texto.txt')
+        archivo.ruta_archivo.save('texto.txt', ContentFile(b'Texto de prueba'), save=False)
+        archivo.save()
+        trabajo = encolar_extraccion(archivo, usuario)
+
+        texto = 'Texto de prueba del artículo extraído.'
+        metadata = ExtractorTexto.construir_metadata(texto, 'texto.txt')
+        with mock.patch('articulos.tareas.DetectorDuplicados.detectar', side_effect=RuntimeError('fallo')):
+            completar_trabajo(trabajo, metadata, texto)
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, 'COMPLETADO')
+        self.assertEqual(Articulo.objects.filter(proyecto=proyecto).count(), 1)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class ExtraccionPaginadaTests(TestCase):
+
+    def setUp(self):
+        usuario = User.objects.create_user('lector', 'lector@gmail.com', 'clave')
+        proyecto = Proyecto.objects.create(nombre='Proyecto de PDFs', usuario_creador=usuario)
+        archivo = ArchivoSubida(
+            proyecto=proyecto, usuario=usuario, nombre_archivo='estudio.pdf', hash_contenido='a' * 64
+        )
+        archivo.ruta_archivo.save('estudio.pdf', ContentFile(b'%PDF-1.4 no es un PDF real'), save=False)
+        archivo.save()
+        self.trabajo = encolar_extraccion(archivo, usuario)
+
+    def test_solo_se_extraen_las_paginas_sin_cache(self):
+        PaginaPdfExtraida.objects.bulk_create([
+            PaginaPdfExtraida(hash_contenido='a' * 64, numero_pagina=numero, texto=f'página {numero}')
+            for numero in range(30)
+        ])
+        with mock.patch.object(ExtractorTexto, 'contar_paginas_pdf', return_value=60):
+            extraccion = ExtraccionPaginada(self.trabajo, paginas_por_rango=25)
+
+        self.assertEqual(extraccion.rangos, [list(range(30, 55)), list(range(55, 60))])
+        for rango in extraccion.rangos:
+            extraccion.agregar({numero: f'página {numero}' for numero in rango})
+        self.assertTrue(extraccion.terminada)
+
+        _, texto = extraccion.resultado()
+        self.assertEqual(texto, ''.join(f'página {numero}\n' for numero in range(60)))
+        self.assertEqual(PaginaPdfExtraida.objects.filter(hash_contenido='a' * 64).count(), 60)
+
+    def test_pdf_ilegible_registra_el_error(self):
+        with self.assertLogs('articulos.utils', level='WARNING') as registro:
+            with self.assertRaises(Exception):
+                ExtractorTexto.extraer_paginas_pdf(self.trabajo.archivo.ruta_archivo.path, [0])
+
+        self.assertTrue(any('PyPDF2' in linea for linea in registro.output))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class ColaExtraccionTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('encolador', 'encolador@gmail.com', 'clave')
+        proyecto = Proyecto.objects.create(nombre='Proyecto de cola', usuario_creador=self.usuario)
+        self.archivo = ArchivoSubida(proyecto=proyecto, usuario=self.usuario, nombre_archivo='texto.txt')
+        self.archivo.ruta_archivo.save('texto.txt', ContentFile(b'Texto'), save=False)
+        self.archivo.save()
+
+    def test_cada_trabajo_se_reclama_una_vez(self):
+        primero = encolar_extraccion(self.archivo, self.usuario)
+        segundo = encolar_extraccion(self.archivo, self.usuario)
+
+        self.assertEqual([t.id for t in reclamar_trabajos(1)], [primero.id])
+        self.assertEqual([t.id for t in reclamar_trabajos(5)], [segundo.id])
+        self.assertEqual(reclamar_trabajos(5), [])
+
+    def test_fallo_reprograma_con_espera_exponencial(self):
+        trabajo = encolar_extraccion(self.archivo, self.usuario)
+        TrabajoExtraccion.objects.filter(id=trabajo.id).update(intentos=1)
+        trabajo, = reclamar_trabajos(1)
+
+        antes = timezone.now()
+        fallar_trabajo(trabajo, RuntimeError('ilegible'))
+
+        trabajo.refresh_from_db()
+        self.assertEqual((trabajo.estado, trabajo.intentos), ('PENDIENTE', 2))
+        self.assertGreaterEqual(trabajo.disponible_desde, antes + ESPERA_REINTENTO * 2)
+        self.assertEqual(reclamar_trabajos(1), [])
+
+    def test_ultimo_intento_marca_fallido(self):
+        trabajo = encolar_extraccion(self.archivo, self.usuario)
+        TrabajoExtraccion.objects.filter(id=trabajo.id).update(intentos=trabajo.max_intentos - 1)
+        trabajo, = reclamar_trabajos(1)
+
+        fallar_trabajo(trabajo, RuntimeError('ilegible'))
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, 'FALLIDO')
+        self.archivo.refresh_from_db()
+        self.assertEqual(self.archivo.errores_procesamiento['error'], 'ilegible')
+
+    def test_recuperar_respeta_los_trabajos_propios(self):
+        propio = encolar_extraccion(self.archivo, self.usuario)
+        ajeno = encolar_extraccion(self.archivo, self.usuario)
+        reclamar_trabajos(2)
+        TrabajoExtraccion.objects.update(fecha_inicio=timezone.now() - TIEMPO_MAXIMO_PROCESO * 2)
+
+        self.assertEqual(recuperar_trabajos_abandonados(excluir={propio.id}), 1)
+        self.assertEqual(TrabajoExtraccion.objects.get(id=ajeno.id).estado, 'PENDIENTE')
+        self.assertEqual(TrabajoExtraccion.objects.get(id=propio.id).estado, 'EN_PROCESO')
+
+    def test_los_rangos_de_un_pdf_ocupan_un_solo_hueco(self):
+        trabajo = encolar_extraccion(self.archivo, self.usuario)
+        otro = encolar_extraccion(self.archivo, self.usuario)
+        en_curso = {object(): (trabajo, None) for _ in range(4)}
+        en_curso[object()] = (otro, None)
+
+        self.assertEqual(_trabajos_en_curso(en_curso), {trabajo.id, otro.id})
+
+
+class CambioEstadoTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('revisor', 'revisor@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto de revisión', usuario_creador=self.usuario)
+        UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+        self.articulos = [
+            Articulo.objects.create(
+                proyecto=self.proyecto, usuario_carga=self.usuario,
+                bibtex_key=f'revision{indice}', titulo=f'Artículo {indice}', bibtex_original='@article{}'
+            )
+            for indice in range(3)
+        ]
+        self.client.force_login(self.usuario)
+
+    def _contadores(self):
+        campos = ['total_articulos', 'articulos_trabajados', *Proyecto.CAMPOS_CONTADOR_ESTADO.values()]
+        return Proyecto.objects.values(*campos).get(id=self.proyecto.id)
+
+    def assertContadoresCoinciden(self):
+        incrementales = self._contadores()
+        Proyecto.recalcular_contadores([self.proyecto.id])
+        self.assertEqual(incrementales, self._contadores())
+
+    def _mover(self, articulo, estado):
+        url = reverse('articulos:cambiar_estado_articulo', args=[articulo.id])
+        return self.client.post(url, {'estado': estado})
+
+    def test_cambio_de_estado_ajusta_contadores_e_historial(self):
+        respuesta = self._mover(self.articulos[0], 'APROBADO')
+
+        self.assertEqual(respuesta.json(), {'success': True, 'estado': 'APROBADO', 'cambiado': True})
+        self.assertEqual(Articulo.objects.get(id=self.articulos[0].id).estado, 'APROBADO')
+        self.assertEqual(self.articulos[0].historial.filter(tipo_cambio='CAMBIO_ESTADO').count(), 1)
+        self.assertContadoresCoinciden()
+
+    def test_mismo_estado_no_cambia_nada(self):
+        respuesta = self._mover(self.articulos[0], 'PENDIENTE')
+
+        self.assertFalse(respuesta.json()['cambiado'])
+        self.assertFalse(self.articulos[0].historial.exists())
+        self.assertContadoresCoinciden()
+
+    def test_eliminar_articulo_cambiado_descuenta_su_estado(self):
+        self._mover(self.articulos[1], 'RECHAZADO')
+        Articulo.objects.get(id=self.articulos[1].id).delete()
+
+        self.assertEqual(self._contadores()['total_articulos'], 2)
+        self.assertContadoresCoinciden()
+
+    def test_estado_no_valido(self):
+        self.assertEqual(self._mover(self.articulos[0], 'ARCHIVADO').status_code, 400)
+
+    def test_solo_miembros(self):
+        ajeno = User.objects.create_user('ajeno', 'ajeno@gmail.com', 'clave')
+        self.client.force_login(ajeno)
+
+        self.assertEqual(self._mover(self.articulos[0], 'APROBADO').status_code, 403)
+        self.assertEqual(Articulo.objects.get(id=self.articulos[0].id).estado, 'PENDIENTE')
+
+
+class KanbanArticulosTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('tablero', 'tablero@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto del tablero', usuario_creador=self.usuario)
+        UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+        Articulo.objects.bulk_create([
+            Articulo(
+                proyecto=self.proyecto, usuario_carga=self.usuario, estado=estado,
+                bibtex_key=f'tablero{indice}', titulo=f'Artículo {indice}', bibtex_original='@article{}'
+            )
+            for indice, estado in enumerate(['PENDIENTE'] * 5 + ['APROBADO'] * 2)
+        ])
+        Proyecto.recalcular_contadores([self.proyecto.id])
+        self.client.force_login(self.usuario)
+        self.url = reverse('articulos:kanban_articulos', args=[self.proyecto.id])
+
+    def _columnas(self, **parametros):
+        respuesta = self.client.get(self.url, parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        return {columna['estado']: columna for columna in respuesta.json()['columnas']}
+
+    def test_primera_carga_incluye_conteos_de_todas_las_columnas(self):
+        columnas = self._columnas(tamano=3)
+
+        self.assertEqual(set(columnas), {estado for estado, _ in Articulo._meta.get_field('estado').choices})
+        self.assertEqual(columnas['PENDIENTE']['total'], 5)
+        self.assertEqual(columnas['APROBADO']['total'], 2)
+        self.assertEqual(columnas['RECHAZADO']['total'], 0)
+        self.assertEqual(len(columnas['PENDIENTE']['articulos']), 3)
+        self.assertIsNotNone(columnas['PENDIENTE']['siguiente_cursor'])
+        self.assertEqual(len(columnas['APROBADO']['articulos']), 2)
+        self.assertIsNone(columnas['APROBADO']['siguiente_cursor'])
+
+    def test_paginas_por_cursor_recorren_la_columna_sin_repetir(self):
+        vistos = []
+        cursor = None
+        while True:
+            parametros = {'estado': 'PENDIENTE', 'tamano': 2}
+            if cursor:
+                parametros['cursor'] = cursor
+            columna = self._columnas(**parametros)['PENDIENTE']
+            self.assertNotIn('total', columna)
+            vistos.extend(articulo['id'] for articulo in columna['articulos'])
+            cursor = columna['siguiente_cursor']
+            if not cursor:
+                break
+
+        esperados = list(
+            Articulo.objects.filter(proyecto=self.proyecto, estado='PENDIENTE')
+            .order_by('-fecha_carga', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(vistos, esperados)
+
+    def test_tamano_se_limita(self):
+        self.assertEqual(len(self._columnas(estado='PENDIENTE', tamano=0)['PENDIENTE']['articulos']), 1)
+        self.assertEqual(len(self._columnas(estado='PENDIENTE', tamano=1000)['PENDIENTE']['articulos']), 5)
+        self.assertEqual(len(self._columnas(estado='PENDIENTE', tamano='x')['PENDIENTE']['articulos']), 5)
+
+    def test_cursor_y_estado_no_validos(self):
+        self.assertEqual(self.client.get(self.url, {'estado': 'PENDIENTE', 'cursor': 'basura'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'estado': 'ARCHIVADO'}).status_code, 400)
+
+    def test_solo_miembros(self):
+        self.client.force_login(User.objects.create_user('curioso', 'curioso@gmail.com', 'clave'))
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class DetectorDuplicadosTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('deduplicador', 'deduplicador@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto de duplicados', usuario_creador=self.usuario)
+
+    def _articulo(self, titulo, autores='Pérez, Ana', anio='2020'):
+        return Articulo.objects.create(
+            proyecto=self.proyecto, usuario_carga=self.usuario,
+            bibtex_key=f'dup{Articulo.objects.count()}', titulo=titulo, bibtex_original='@article{}',
+            metadata_completos={'autores': autores, 'anio_publicacion': anio}
+        )
+
+    def test_titulo_casi_identico_es_duplicado(self):
+        original = self._articulo('Efectos del ejercicio aeróbico sobre la memoria de trabajo en adultos mayores')
+        copia = self._articulo('Efectos del ejercicio aerobico sobre la memoria de trabajo en adultos mayores.')
+
+        self.assertEqual(DetectorDuplicados(self.proyecto).detectar([copia.id]), 1)
+        self.assertEqual(Articulo.objects.get(id=copia.id).articulo_original_id, original.id)
+
+    def test_titulos_distintos_no_son_duplicados(self):
+        self._articulo('Efectos del ejercicio aeróbico sobre la memoria de trabajo en adultos mayores')
+        otro = self._articulo('Intervenciones digitales para la adherencia al tratamiento antihipertensivo')
+
+        self.assertEqual(DetectorDuplicados(self.proyecto).detectar([otro.id]), 0)
+        self.assertIsNone(Articulo.objects.get(id=otro.id).articulo_original_id)
+
+    def test_firmas_similares_comparten_bandas(self):
+        """Con permutaciones independientes la fracción de filas iguales estima la similitud de Jaccard."""
+        a = RegistroDeduplicacion({'id': 1, 'titulo': 'Meta-análisis de la terapia cognitivo conductual en la ansiedad'})
+        b = RegistroDeduplicacion({'id': 2, 'titulo': 'Meta-análisis de la terapia cognitivo-conductual en ansiedad'})
+        c = RegistroDeduplicacion({'id': 3, 'titulo': 'Prevalencia de la diabetes tipo 2 en zonas rurales'})
+
+        self.assertTrue(set(a.claves) & set(b.claves))
+        self.assertFalse(set(a.claves) & set(c.claves))
+        iguales = sum(x == y for x, y in zip(a.firma, c.firma))
+        self.assertLess(iguales, 4)
+
+    def test_incremental_solo_carga_candidatos_por_clave(self):
+        original = self._articulo('Efectos del ejercicio aeróbico sobre la memoria de trabajo en adultos mayores')
+        for indice in range(20):
+            self._articulo(f'Estudio independiente número {indice} sobre otro tema', autores=f'Autor{indice}, X')
+        DetectorDuplicados(self.proyecto).detectar()
+        copia = self._articulo('Efectos del ejercicio aerobico sobre la memoria de trabajo en adultos mayores')
+
+        detector = DetectorDuplicados(self.proyecto)
+        self.assertEqual(detector.detectar([copia.id]), 1)
+        self.assertEqual(set(detector.registros), {original.id})
+        self.assertFalse(ClaveDeduplicacion.objects.filter(articulo_id=copia.id).exists())
+
+    def test_articulos_sin_claves_se_indexan_al_detectar(self):
+        original = self._articulo('Revisión sistemática de la telemedicina en atención primaria')
+        copia = self._articulo('Revision sistematica de la telemedicina en atencion primaria')
+
+        self.assertFalse(ClaveDeduplicacion.objects.filter(articulo_id=original.id).exists())
+        self.assertEqual(DetectorDuplicados(self.proyecto).detectar([copia.id]), 1)
+        self.assertTrue(ClaveDeduplicacion.objects.filter(articulo_id=original.id).exists())
+
+
+class BusquedaArticulosTests(TestCase):
+
+    def setUp(self):
+        if obtener_backend().nombre != 'fts5':
+            self.skipTest('SQLite sin FTS5')
+        self.usuario = User.objects.create_user('buscador', 'buscador@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto de búsqueda', usuario_creador=self.usuario)
+        # El índice se actualiza al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            self._crear_articulos()
+
+    def _crear_articulos(self):
+        self.en_abstract = self._articulo('Revisión de intervenciones escolares', 'Efecto de la meditación en estudiantes')
+        self.en_titulo = self._articulo('Meditación y ansiedad en adultos', 'Ensayo aleatorizado')
+        otro = Proyecto.objects.create(nombre='Otro proyecto', usuario_creador=self.usuario)
+        self._articulo('Meditación en otro proyecto', '', proyecto=otro)
+
+    def _articulo(self, titulo, abstract, proyecto=None):
+        return Articulo.objects.create(
+            proyecto=proyecto or self.proyecto, usuario_carga=self.usuario,
+            bibtex_key=f'busqueda{Articulo.objects.count()}', titulo=titulo, bibtex_original='@article{}',
+            metadata_completos={'abstract': abstract}
+        )
+
+    def _ids(self, consulta):
+        return [resultado['id'] for resultado in buscar_articulos(self.proyecto.id, consulta)]
+
+    def test_titulo_pesa_mas_que_abstract(self):
+        self.assertEqual(self._ids('meditacion'), [self.en_titulo.id, self.en_abstract.id])
+
+    def test_ultimo_termino_es_prefijo(self):
+        self.assertEqual(self._ids('ansiedad adul'), [self.en_titulo.id])
+
+    def test_resalta_coincidencias(self):
+        resultado = buscar_articulos(self.proyecto.id, 'ansiedad')[0]
+        self.assertIn('<mark>ansiedad</mark>', resultado['titulo_resaltado'])
+
+    def test_eliminar_articulo_lo_quita_del_indice(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.en_titulo.delete()
+        self.assertEqual(self._ids('meditacion'), [self.en_abstract.id])
+
+    def test_migracion_indexa_articulos_existentes(self):
+        obtener_backend().vaciar()
+        self.assertEqual(self._ids('meditacion'), [])
+
+        migracion = importlib.import_module('articulos.migrations.0009_indice_busqueda')
+        migracion.poblar_indice(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(self._ids('meditacion'), [self.en_titulo.id, self.en_abstract.id])
+
+    def test_buscar_es_obligatorio_en_cada_motor(self):
+        class SinBuscar(BackendBusqueda):
+            pass
+
+        with self.assertRaises(TypeError):
+            SinBuscar()
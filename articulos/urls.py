@@ -5,5 +5,10 @@ app_name = 'articulos'
 
 urlpatterns = [
     path('<int:proyecto_id>/', views.ver_articulos, name='ver_articulos'),
+    path('<int:proyecto_id>/kanban/', views.kanban_articulos, name='kanban_articulos'),
+    path('<int:proyecto_id>/buscar/', views.buscar_articulos, name='buscar_articulos'),
     path('<int:proyecto_id>/agregar/', views.agregar_articulo, name='agregar_articulo'),
+    path('articulo/<int:articulo_id>/estado/', views.cambiar_estado_articulo, name='cambiar_estado_articulo'),
+    path('articulo/<int:articulo_id>/texto/', views.texto_articulo, name='texto_articulo'),
+    path('trabajos/<int:trabajo_id>/estado/', views.estado_trabajo, name='estado_trabajo'),
 ]
\ No newline at end of file
@@ -1,17 +1,40 @@
 import re
+import hashlib
+import logging
 import PyPDF2
 import pdfplumber
 from docx import Document
 from django.utils import timezone
 import io
 
+
+logger = logging.getLogger(__name__)
+
+# Caracteres iniciales del documento en los que se buscan título, autores,
+# abstract, palabras clave y revista
+VENTANA_CABECERA = 20000
+LONGITUD_MAXIMA_KEYWORDS = 1000
+
+DOI_PATTERN = re.compile(r'doi(?:\.org/|[\s:]+)(10\.\d{4,}[^\s]+)', re.IGNORECASE)
+ANIO_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b')
+LINEA_PATTERN = re.compile(r'[^\n]+')
+AUTORES_PATTERN = re.compile(r'[A-Z][a-z]+.*[A-Z][a-z]+')
+ABSTRACT_PATTERN = re.compile(r'(?:abstract|resumen)[\s:]+', re.IGNORECASE)
+ABSTRACT_EN_PATTERN = re.compile(r'abstract[\s:]+', re.IGNORECASE)
+FIN_ABSTRACT_PATTERN = re.compile(r'\n\n|keywords|palabras clave|introduction', re.IGNORECASE)
+FIN_ABSTRACT_ALTERNATIVO_PATTERN = re.compile(r'\n\n|\n[a-z]', re.IGNORECASE)
+KEYWORDS_PATTERN = re.compile(r'(?:keywords|palabras clave)[\s:]+', re.IGNORECASE)
+FIN_KEYWORDS_PATTERN = re.compile(r'\n\n|\n[a-z]|introduction', re.IGNORECASE)
+JOURNAL_PATTERN = re.compile(r'(?:Published in|Journal|Revista)[\s:]+([A-Z][^\n]{10,100})', re.IGNORECASE)
+
+
 class ExtractorTexto:
     """Clase para extraer texto y metadata de diferentes tipos de archivos."""
     
     @staticmethod
     def extraer_de_pdf(archivo):
         """Extrae texto de un archivo PDF."""
-        texto_completo = ""
+        partes = []
         
         try:
             # Intentar con pdfplumber (mejor para PDFs con texto)
@@ -20,9 +43,10 @@ class ExtractorTexto:
                 for pagina in pdf.pages:
                     texto = pagina.extract_text()
                     if texto:
-                        texto_completo += texto + "\n"
+                        partes.append(texto)
         except Exception as e1:
-            print(f"Error con pdfplumber: {e1}, intentando con PyPDF2...")
+            logger.warning(f"Error con pdfplumber: {e1}, intentando con PyPDF2...")
+            partes = []
             
             try:
                 # Fallback a PyPDF2
@@ -31,12 +55,56 @@ class ExtractorTexto:
                 for pagina in pdf_reader.pages:
                     texto = pagina.extract_text()
                     if texto:
-                        texto_completo += texto + "\n"
+                        partes.append(texto)
             except Exception as e2:
-                print(f"Error con PyPDF2: {e2}")
+                logger.error(f"Error con PyPDF2: {e2}")
                 raise Exception(f"No se pudo extraer texto del PDF: {str(e2)}")
         
-        return texto_completo
+        return ''.join(f"{texto}\n" for texto in partes)
+    
+    @staticmethod
+    def contar_paginas_pdf(ruta):
+        """Devuelve el número de páginas de un PDF sin extraer su texto."""
+        try:
+            return len(PyPDF2.PdfReader(ruta).pages)
+        except Exception:
+            with pdfplumber.open(ruta) as pdf:
+                return len(pdf.pages)
+    
+    @staticmethod
+    def extraer_paginas_pdf(ruta, paginas):
+        """Extrae el texto de las páginas indicadas (numeradas desde 0). Devuelve {pagina: texto}."""
+        try:
+            with pdfplumber.open(ruta) as pdf:
+                return {numero: pdf.pages[numero].extract_text() or '' for numero in paginas}
+        except Exception as e1:
+            logger.warning(f"Error con pdfplumber: {e1}, intentando con PyPDF2...")
+            
+            try:
+                pdf_reader = PyPDF2.PdfReader(ruta)
+                return {numero: pdf_reader.pages[numero].extract_text() or '' for numero in paginas}
+            except Exception as e2:
+                logger.error(f"Error con PyPDF2: {e2}")
+                raise Exception(f"No se pudo extraer texto del PDF: {str(e2)}")
+    
+    @staticmethod
+    def dividir_en_rangos(paginas, paginas_por_rango):
+        """Divide una lista de páginas en rangos consecutivos de tamaño fijo."""
+        return [paginas[i:i + paginas_por_rango] for i in range(0, len(paginas), paginas_por_rango)]
+    
+    @staticmethod
+    def unir_paginas(textos):
+        """Une el texto de las páginas en orden, igual que extraer_de_pdf."""
+        return ''.join(f"{textos[numero]}\n" for numero in sorted(textos) if textos[numero])
+    
+    @staticmethod
+    def calcular_hash(archivo):
+        """Calcula el SHA-256 del contenido de un archivo leyéndolo por bloques."""
+        sha256 = hashlib.sha256()
+        archivo.seek(0)
+        for bloque in iter(lambda: archivo.read(64 * 1024), b''):
+            sha256.update(bloque)
+        return sha256.hexdigest()
     
     @staticmethod
     def extraer_de_docx(archivo):
@@ -44,12 +112,8 @@ class ExtractorTexto:
         try:
             archivo.seek(0)
             doc = Document(archivo)
-            texto_completo = ""
             
-            for parrafo in doc.paragraphs:
-                texto_completo += parrafo.text + "\n"
-            
-            return texto_completo
+            return ''.join(f"{parrafo.text}\n" for parrafo in doc.paragraphs)
         except Exception as e:
             raise Exception(f"No se pudo extraer texto del DOCX: {str(e)}")
     
@@ -79,7 +143,12 @@ class ExtractorTexto:
     
     @staticmethod
     def extraer_metadata(texto):
-        """Extrae metadata del texto usando expresiones regulares."""
+        """
+        Extrae metadata del texto usando expresiones regulares.
+
+        Título, autores, abstract, palabras clave y revista se buscan solo en la
+        cabecera del documento; cada patrón se detiene en la primera coincidencia.
+        """
         metadata = {
             'titulo': None,
             'autores': None,
@@ -91,91 +160,74 @@ class ExtractorTexto:
             'url': None
         }
         
-        # Normalizar texto
-        texto_limpio = ' '.join(texto.split())
+        cabecera = texto[:VENTANA_CABECERA]
         
         # Extraer DOI
-        doi_pattern = r'(?:DOI|doi)[\s:]+([10]\.\d{4,}[^\s]+)'
-        doi_match = re.search(doi_pattern, texto, re.IGNORECASE)
+        doi_match = DOI_PATTERN.search(texto)
         if doi_match:
             metadata['doi'] = doi_match.group(1).strip()
         
-        # Extraer año (buscar años entre 1900 y 2099)
-        anio_pattern = r'\b(19|20)\d{2}\b'
-        anios = re.findall(anio_pattern, texto)
-        if anios:
-            # Tomar el primer año encontrado
-            metadata['anio'] = int(anios[0])
-        
-        # Extraer título (generalmente las primeras líneas del documento)
-        lineas = texto.split('\n')
-        lineas_no_vacias = [l.strip() for l in lineas if l.strip()]
-        if lineas_no_vacias:
-            # El título suele ser la primera línea significativa
-            posibles_titulos = []
-            for linea in lineas_no_vacias[:10]:  # Revisar las primeras 10 líneas
-                if len(linea) > 20 and len(linea) < 300:  # Longitud razonable para un título
-                    posibles_titulos.append(linea)
-            
-            if posibles_titulos:
-                metadata['titulo'] = posibles_titulos[0]
+        # Extraer año (primer año entre 1900 y 2099)
+        anio_match = ANIO_PATTERN.search(texto)
+        if anio_match:
+            metadata['anio'] = int(anio_match.group(0))
         
-        # Extraer abstract
-        abstract_patterns = [
-            r'(?:ABSTRACT|Abstract|Resumen|RESUMEN)[\s:]+(.{100,2000}?)(?:\n\n|Keywords|KEYWORDS|Palabras clave|Introduction|INTRODUCTION)',
-            r'(?:ABSTRACT|Abstract)[\s:]+(.{100,2000}?)(?:\n\n|\n[A-Z])',
-        ]
+        # Extraer título: primera de las 10 primeras líneas con longitud razonable
+        lineas_no_vacias = []
+        for linea in LINEA_PATTERN.finditer(cabecera):
+            linea = linea.group(0).strip()
+            if linea:
+                lineas_no_vacias.append(linea)
+                if len(lineas_no_vacias) > 10:
+                    break
         
-        for pattern in abstract_patterns:
-            abstract_match = re.search(pattern, texto, re.IGNORECASE | re.DOTALL)
-            if abstract_match:
-                abstract_text = abstract_match.group(1).strip()
-                # Limpiar el abstract
-                abstract_text = ' '.join(abstract_text.split())
-                metadata['abstract'] = abstract_text
+        for indice, linea in enumerate(lineas_no_vacias[:10]):
+            if 20 < len(linea) < 300:
+                metadata['titulo'] = linea
+                # Extraer autores (generalmente la línea siguiente al título)
+                if indice + 1 < len(lineas_no_vacias):
+                    posible_autores = lineas_no_vacias[indice + 1]
+                    if len(posible_autores) < 200 and AUTORES_PATTERN.search(posible_autores):
+                        metadata['autores'] = posible_autores
                 break
         
-        # Extraer palabras clave
-        keywords_patterns = [
-            r'(?:Keywords|KEYWORDS|Palabras clave|PALABRAS CLAVE)[\s:]+(.+?)(?:\n\n|\n[A-Z]|Introduction|INTRODUCTION)',
-        ]
+        # Extraer abstract
+        abstract_text = ExtractorTexto._extraer_seccion(
+            cabecera, ABSTRACT_PATTERN, FIN_ABSTRACT_PATTERN, 100, 2000
+        ) or ExtractorTexto._extraer_seccion(
+            cabecera, ABSTRACT_EN_PATTERN, FIN_ABSTRACT_ALTERNATIVO_PATTERN, 100, 2000
+        )
+        if abstract_text:
+            metadata['abstract'] = ' '.join(abstract_text.split())
         
-        for pattern in keywords_patterns:
-            keywords_match = re.search(pattern, texto, re.IGNORECASE | re.DOTALL)
-            if keywords_match:
-                keywords_text = keywords_match.group(1).strip()
-                # Limpiar y formatear palabras clave
-                keywords_text = re.sub(r'\n', ' ', keywords_text)
-                keywords_text = re.sub(r'\s+', ' ', keywords_text)
-                metadata['palabras_clave'] = keywords_text
-                break
+        # Extraer palabras clave
+        keywords_text = ExtractorTexto._extraer_seccion(
+            cabecera, KEYWORDS_PATTERN, FIN_KEYWORDS_PATTERN, 1, LONGITUD_MAXIMA_KEYWORDS
+        )
+        if keywords_text:
+            metadata['palabras_clave'] = ' '.join(keywords_text.split())
         
         # Extraer journal/revista
-        journal_patterns = [
-            r'(?:Published in|Journal|Revista)[\s:]+([A-Z][^\n]{10,100})',
-        ]
-        
-        for pattern in journal_patterns:
-            journal_match = re.search(pattern, texto, re.IGNORECASE)
-            if journal_match:
-                metadata['journal'] = journal_match.group(1).strip()
-                break
-        
-        # Extraer autores (generalmente después del título)
-        # Este es más complejo y puede necesitar ajustes según el formato
-        if metadata['titulo'] and lineas_no_vacias:
-            try:
-                titulo_idx = next(i for i, l in enumerate(lineas_no_vacias) if metadata['titulo'] in l)
-                if titulo_idx + 1 < len(lineas_no_vacias):
-                    posible_autores = lineas_no_vacias[titulo_idx + 1]
-                    # Verificar si parece una línea de autores
-                    if re.search(r'[A-Z][a-z]+.*[A-Z][a-z]+', posible_autores) and len(posible_autores) < 200:
-                        metadata['autores'] = posible_autores
-            except StopIteration:
-                pass
+        journal_match = JOURNAL_PATTERN.search(cabecera)
+        if journal_match:
+            metadata['journal'] = journal_match.group(1).strip()
         
         return metadata
     
+    @staticmethod
+    def _extraer_seccion(texto, inicio_pattern, fin_pattern, longitud_minima, longitud_maxima):
+        """
+        Devuelve el texto entre un encabezado (p. ej. 'Abstract:') y el primer
+        terminador situado entre longitud_minima y longitud_maxima caracteres después.
+        Solo se examina esa ventana, sin retroceso sobre el resto del documento.
+        """
+        for encabezado in inicio_pattern.finditer(texto):
+            inicio = encabezado.end()
+            fin = fin_pattern.search(texto, inicio + longitud_minima, inicio + longitud_maxima + 20)
+            if fin and fin.start() <= inicio + longitud_maxima:
+                return texto[inicio:fin.start()].strip()
+        return None
+    
     @staticmethod
     def generar_bibtex_key(autores, anio):
         """Genera una clave BibTeX única."""
@@ -219,6 +271,12 @@ class ExtractorTexto:
         
         return bibtex
     
+    @classmethod
+    def procesar_ruta(cls, ruta, nombre_archivo):
+        """Procesa un archivo a partir de su ruta en disco (usado por los procesos del worker)."""
+        with open(ruta, 'rb') as archivo:
+            return cls.procesar_archivo(archivo, nombre_archivo)
+    
     @classmethod
     def procesar_archivo(cls, archivo, nombre_archivo):
         """Método principal para procesar cualquier tipo de archivo."""
@@ -234,7 +292,11 @@ class ExtractorTexto:
         else:
             raise Exception(f"Formato de archivo no soportado: {ext}")
         
-        # Extraer metadata
+        return cls.construir_metadata(texto, nombre_archivo), texto
+    
+    @classmethod
+    def construir_metadata(cls, texto, nombre_archivo):
+        """Extrae la metadata del texto y completa los valores por defecto."""
         metadata = cls.extraer_metadata(texto)
         
         # Valores por defecto si no se encontró información
@@ -255,4 +317,4 @@ class ExtractorTexto:
         if not metadata['palabras_clave']:
             metadata['palabras_clave'] = "pendiente de clasificación"
         
-        return metadata, texto
\ No newline at end of file
+        return metadata
\ No newline at end of file
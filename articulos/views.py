@@ -2,14 +2,63 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.urls import reverse
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
+from django.views.decorators.http import require_POST
 import os
 import json
 
-from .models import Articulo, ArchivoSubida, HistorialArticulo
-from pymetanalis.models import Proyecto, UsuarioProyecto
+from .models import Articulo, ArchivoSubida, HistorialArticulo, TextoCompletoArticulo, TrabajoExtraccion
+from pymetanalis.models import Proyecto
+from pymetanalis.notificaciones import notificar_articulos_nuevos
+from pymetanalis.paginacion import CursorInvalido, paginar_por_cursor
 from .utils import ExtractorTexto
+from .bibtex import ImportadorBibtex
+from .busqueda import buscar_articulos as buscar_en_indice
+from .claves import reservar_clave
+from .tareas import encolar_extraccion
+
+
+# Columnas del tablero Kanban (mismo orden que los estados del modelo)
+ESTADOS_ARTICULO = Articulo._meta.get_field('estado').choices
+
+# Orden de las tarjetas; termina en 'id' para que el cursor sea único
+ORDEN_TARJETAS = ('-fecha_carga', '-id')
+
+# Campos necesarios para pintar una tarjeta (sin bibtex_original ni metadata_completos)
+CAMPOS_TARJETA = (
+    'id', 'bibtex_key', 'titulo', 'doi', 'estado', 'fecha_carga', 'articulo_original_id',
+    'usuario_carga__username', 'usuario_carga__first_name', 'usuario_carga__last_name',
+)
+
+TARJETAS_POR_PAGINA = 50
+
+
+def _articulos_tarjeta(proyecto):
+    return Articulo.objects.filter(proyecto=proyecto).select_related('usuario_carga').only(*CAMPOS_TARJETA)
+
+
+def _conteo_por_estado(proyecto):
+    """Número de artículos de cada estado, leído de los contadores del proyecto (sin COUNT)."""
+    conteos = dict.fromkeys((estado for estado, _ in ESTADOS_ARTICULO), 0)
+    conteos.update(proyecto.conteo_por_estado)
+    return conteos
+
+
+def _tarjeta(articulo):
+    return {
+        'id': articulo.id,
+        'bibtex_key': articulo.bibtex_key,
+        'titulo': articulo.titulo,
+        'doi': articulo.doi,
+        'estado': articulo.estado,
+        'fecha_carga': articulo.fecha_carga.isoformat(),
+        'usuario_carga': articulo.usuario_carga.get_full_name() or articulo.usuario_carga.username,
+        'articulo_original_id': articulo.articulo_original_id,
+    }
 
 
 @login_required
@@ -17,35 +66,99 @@ def ver_articulos(request, proyecto_id):
     """Vista para que administradores e investigadores vean los artículos de un proyecto."""
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
 
-    # Verificar rol del usuario
-    usuario_proyecto = UsuarioProyecto.objects.filter(
-        usuario=request.user,
-        proyecto=proyecto
-    ).first()
+    conteos = _conteo_por_estado(proyecto)
+
+    # Obtener artículos del proyecto, paginados por cursor
+    articulos = _articulos_tarjeta(proyecto)
+    estado = request.GET.get('estado')
+    if estado in conteos:
+        articulos = articulos.filter(estado=estado)
+    else:
+        estado = ''
 
-    # Obtener artículos del proyecto
-    articulos = Articulo.objects.filter(proyecto=proyecto).order_by('-fecha_carga')
+    try:
+        articulos, siguiente_cursor = paginar_por_cursor(
+            articulos, ORDEN_TARJETAS, request.GET.get('cursor'), TARJETAS_POR_PAGINA
+        )
+    except CursorInvalido:
+        return redirect('articulos:ver_articulos', proyecto_id=proyecto.id)
 
     context = {
         'proyecto': proyecto,
-        'articulos': articulos
+        'articulos': articulos,
+        'conteos': conteos,
+        'total_articulos': sum(conteos.values()),
+        'estado_filtro': estado,
+        'estados': ESTADOS_ARTICULO,
+        'siguiente_cursor': siguiente_cursor,
+        'es_primera_pagina': not request.GET.get('cursor'),
     }
 
     return render(request, 'ver_articulos.html', context)
 
 
+@login_required
+def kanban_articulos(request, proyecto_id):
+    """
+    Vista AJAX con los datos del tablero Kanban.
+
+    Sin parámetros devuelve el conteo y la primera página de cada columna;
+    con ?estado=X&cursor=... devuelve la página siguiente de esa columna.
+    """
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+
+    if not request.permisos.es_miembro(proyecto.id):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+
+    try:
+        tamano = max(1, min(int(request.GET.get('tamano', TARJETAS_POR_PAGINA)), 200))
+    except ValueError:
+        tamano = TARJETAS_POR_PAGINA
+
+    estado = request.GET.get('estado')
+    nombres = dict(ESTADOS_ARTICULO)
+    if estado and estado not in nombres:
+        return JsonResponse({'success': False, 'error': 'Estado no válido'}, status=400)
+
+    conteos = None if estado else _conteo_por_estado(proyecto)
+
+    columnas = []
+    for clave, nombre in ESTADOS_ARTICULO:
+        if estado and clave != estado:
+            continue
+        if conteos is not None and not conteos[clave]:
+            tarjetas, siguiente = [], None
+        else:
+            try:
+                tarjetas, siguiente = paginar_por_cursor(
+                    _articulos_tarjeta(proyecto).filter(estado=clave),
+                    ORDEN_TARJETAS,
+                    request.GET.get('cursor') if estado else None,
+                    tamano
+                )
+            except CursorInvalido as e:
+                return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+        columna = {
+            'estado': clave,
+            'nombre': nombre,
+            'articulos': [_tarjeta(articulo) for articulo in tarjetas],
+            'siguiente_cursor': siguiente,
+        }
+        if conteos is not None:
+            columna['total'] = conteos[clave]
+        columnas.append(columna)
+
+    return JsonResponse({'success': True, 'columnas': columnas})
+
+
 @login_required
 def agregar_articulo(request, proyecto_id):
     """Vista para agregar un nuevo artículo al proyecto."""
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
     
     # Verificar que el usuario tiene acceso al proyecto
-    usuario_proyecto = UsuarioProyecto.objects.filter(
-        usuario=request.user,
-        proyecto=proyecto
-    ).first()
-    
-    if not usuario_proyecto:
+    if not request.permisos.es_miembro(proyecto.id):
         messages.error(request, 'No tienes permiso para agregar artículos a este proyecto.')
         return redirect('core:home')
     
@@ -57,97 +170,91 @@ def agregar_articulo(request, proyecto_id):
             try:
                 # Validar tipo de archivo
                 ext = os.path.splitext(archivo.name)[1].lower()
-                if ext not in ['.pdf', '.doc', '.docx', '.txt']:
-                    messages.error(request, 'Formato de archivo no válido. Solo se permiten PDF, DOC, DOCX o TXT.')
+                if ext not in ['.pdf', '.doc', '.docx', '.txt', '.bib']:
+                    messages.error(request, 'Formato de archivo no válido. Solo se permiten PDF, DOC, DOCX, TXT o BIB.')
                     return redirect('articulos:agregar_articulo', proyecto_id=proyecto.id)
                 
-                # Validar tamaño (10MB máximo)
-                if archivo.size > 10 * 1024 * 1024:
-                    messages.error(request, 'El archivo es demasiado grande. Tamaño máximo: 10MB.')
+                # Validar tamaño (10MB máximo, 50MB para exportaciones .bib)
+                tamano_maximo_mb = 50 if ext == '.bib' else 10
+                if archivo.size > tamano_maximo_mb * 1024 * 1024:
+                    messages.error(request, f'El archivo es demasiado grande. Tamaño máximo: {tamano_maximo_mb}MB.')
                     return redirect('articulos:agregar_articulo', proyecto_id=proyecto.id)
                 
-                # Guardar archivo
-                archivo_subida = ArchivoSubida.objects.create(
+                # Hash calculado por HashContenidoUploadHandler mientras se recibía el archivo
+                hash_contenido = getattr(request, 'hashes_subida', {}).get('archivo')
+                if not hash_contenido:
+                    hash_contenido = ExtractorTexto.calcular_hash(archivo)
+                
+                # Si el mismo contenido ya se subió al proyecto, reutilizar su resultado
+                existente = ArchivoSubida.objects.filter(
                     proyecto=proyecto,
-                    usuario=request.user,
-                    nombre_archivo=archivo.name,
-                    ruta_archivo=archivo
-                )
+                    hash_contenido=hash_contenido
+                ).first()
+                if existente:
+                    return _respuesta_archivo_duplicado(request, existente)
                 
+                # Guardar archivo
                 try:
-                    # Extraer metadata del archivo
-                    metadata, texto_completo = ExtractorTexto.procesar_archivo(
-                        archivo_subida.ruta_archivo,
-                        archivo.name
-                    )
-                    
-                    # Generar bibtex_key único
-                    bibtex_key = ExtractorTexto.generar_bibtex_key(
-                        metadata['autores'],
-                        metadata['anio']
-                    )
-                    
-                    # Asegurar que sea único
-                    contador = 1
-                    bibtex_key_original = bibtex_key
-                    while Articulo.objects.filter(bibtex_key=bibtex_key).exists():
-                        bibtex_key = f"{bibtex_key_original}_{contador}"
-                        contador += 1
-                    
-                    # Generar BibTeX
-                    bibtex_original = ExtractorTexto.generar_bibtex(metadata, bibtex_key)
-                    
-                    # Preparar metadata_completos
-                    metadata_completos = {
-                        'autores': metadata['autores'],
-                        'abstract': metadata['abstract'],
-                        'anio_publicacion': metadata['anio'],
-                        'palabras_clave': metadata['palabras_clave'].split(',') if metadata['palabras_clave'] else [],
-                        'archivo_origen': archivo.name,
-                        'texto_completo': texto_completo[:5000],  # Guardar primeros 5000 caracteres
-                        'extraido_automaticamente': True
-                    }
-                    
-                    if metadata.get('journal'):
-                        metadata_completos['journal'] = metadata['journal']
-                    if metadata.get('url'):
-                        metadata_completos['url'] = metadata['url']
-                    
-                    # Crear artículo
-                    articulo = Articulo.objects.create(
-                        proyecto=proyecto,
-                        usuario_carga=request.user,
-                        bibtex_key=bibtex_key,
-                        titulo=metadata['titulo'],
-                        doi=metadata.get('doi'),
-                        bibtex_original=bibtex_original,
-                        metadata_completos=metadata_completos,
-                        estado='PENDIENTE'
-                    )
-                    
-                    # Registrar en historial
-                    HistorialArticulo.objects.create(
-                        articulo=articulo,
-                        usuario=request.user,
-                        tipo_cambio='CREACION',
-                        valor_nuevo=f'Artículo creado desde archivo: {archivo.name}'
-                    )
-                    
-                    archivo_subida.articulos_procesados = 1
-                    archivo_subida.save()
+                    with transaction.atomic():
+                        archivo_subida = ArchivoSubida.objects.create(
+                            proyecto=proyecto,
+                            usuario=request.user,
+                            nombre_archivo=archivo.name,
+                            ruta_archivo=archivo,
+                            hash_contenido=hash_contenido
+                        )
+                except IntegrityError:
+                    # Otro colaborador subió el mismo archivo al mismo tiempo
+                    existente = ArchivoSubida.objects.get(proyecto=proyecto, hash_contenido=hash_contenido)
+                    return _respuesta_archivo_duplicado(request, existente)
+                
+                # ========== IMPORTACIÓN DE ARCHIVOS .BIB (VARIAS ENTRADAS) ==========
+                if ext == '.bib':
+                    importador = ImportadorBibtex(archivo_subida, request.user)
+                    try:
+                        importados = importador.importar()
+                    except Exception:
+                        # Deshacer la importación parcial: si el archivo quedara guardado,
+                        # cada nueva subida se trataría como duplicado y no se reintentaría
+                        Articulo.objects.filter(id__in=importador.ids_creados).delete()
+                        archivo_subida.ruta_archivo.delete(save=False)
+                        archivo_subida.delete()
+                        raise
+                    # Índice y duplicados: sus errores se registran sin perder lo importado
+                    importador.completar()
+                    notificar_articulos_nuevos(proyecto, importados, request.user)
                     
-                    messages.success(request, f'Artículo "{articulo.titulo}" agregado correctamente desde el archivo.')
+                    if importador.errores:
+                        messages.warning(
+                            request,
+                            f'{importados} artículos importados desde "{archivo.name}". '
+                            f'{len(importador.errores)} entradas no se pudieron procesar.'
+                        )
+                    else:
+                        messages.success(request, f'{importados} artículos importados correctamente desde "{archivo.name}".')
+                    if importador.duplicados:
+                        messages.info(
+                            request,
+                            f'{importador.duplicados} artículos se marcaron como posibles duplicados.'
+                        )
                     return redirect('articulos:ver_articulos', proyecto_id=proyecto.id)
-                    
-                except Exception as e:
-                    # Si hay error en la extracción, guardar el error
-                    archivo_subida.errores_procesamiento = {
-                        'error': str(e),
-                        'timestamp': timezone.now().isoformat()
-                    }
-                    archivo_subida.save()
-                    messages.error(request, f'Error al extraer datos del archivo: {str(e)}')
-                    return redirect('articulos:agregar_articulo', proyecto_id=proyecto.id)
+                
+                # ========== EXTRACCIÓN EN SEGUNDO PLANO (PDF/DOCX/TXT) ==========
+                # El worker `procesar_extracciones` crea el artículo fuera de la petición
+                trabajo = encolar_extraccion(archivo_subida, request.user)
+                
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({
+                        'success': True,
+                        'trabajo_id': trabajo.id,
+                        'url_estado': reverse('articulos:estado_trabajo', args=[trabajo.id])
+                    }, status=202)
+                
+                messages.success(
+                    request,
+                    f'Archivo "{archivo.name}" recibido. La extracción de datos se está procesando (trabajo #{trabajo.id}).'
+                )
+                return redirect('articulos:ver_articulos', proyecto_id=proyecto.id)
                 
             except Exception as e:
                 messages.error(request, f'Error al procesar el archivo: {str(e)}')
@@ -200,14 +307,7 @@ def agregar_articulo(request, proyecto_id):
                 
                 # Generar bibtex_key único
                 primer_autor = autores.split(';')[0].split(',')[0].strip().lower().replace(' ', '')
-                bibtex_key = f"{primer_autor}{anio}"
-                
-                # Asegurar que sea único
-                contador = 1
-                bibtex_key_original = bibtex_key
-                while Articulo.objects.filter(bibtex_key=bibtex_key).exists():
-                    bibtex_key = f"{bibtex_key_original}_{contador}"
-                    contador += 1
+                bibtex_key = reservar_clave(f"{primer_autor}{anio}")
                 
                 # Generar BibTeX
                 bibtex_original = f"""@article{{{bibtex_key},
@@ -269,6 +369,7 @@ def agregar_articulo(request, proyecto_id):
                     tipo_cambio='CREACION',
                     valor_nuevo=f'Artículo creado manualmente: {titulo}'
                 )
+                notificar_articulos_nuevos(proyecto, 1, request.user)
                 
                 messages.success(request, f'Artículo "{articulo.titulo}" agregado correctamente.')
                 return redirect('articulos:ver_articulos', proyecto_id=proyecto.id)
@@ -282,4 +383,153 @@ def agregar_articulo(request, proyecto_id):
         'proyecto': proyecto
     }
     
-    return render(request, 'indv_articulo.html', context)
\ No newline at end of file
+    return render(request, 'indv_articulo.html', context)
+
+
+def _respuesta_archivo_duplicado(request, archivo_subida):
+    """Responde a la subida de un archivo cuyo contenido ya existe en el proyecto."""
+    trabajo = archivo_subida.trabajos.order_by('-fecha_creacion').first()
+    
+    # Si la extracción anterior falló definitivamente, volver a intentarla
+    if trabajo and trabajo.estado == 'FALLIDO':
+        trabajo = encolar_extraccion(archivo_subida, request.user)
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        data = {
+            'success': True,
+            'duplicado': True,
+            'archivo_id': archivo_subida.id,
+            'articulos_procesados': archivo_subida.articulos_procesados,
+        }
+        if trabajo:
+            data['trabajo_id'] = trabajo.id
+            data['url_estado'] = reverse('articulos:estado_trabajo', args=[trabajo.id])
+        return JsonResponse(data)
+    
+    messages.info(
+        request,
+        f'El contenido de este archivo ya fue subido al proyecto como "{archivo_subida.nombre_archivo}" '
+        f'el {archivo_subida.fecha_subida:%d/%m/%Y}. Se reutiliza el resultado existente.'
+    )
+    return redirect('articulos:ver_articulos', proyecto_id=archivo_subida.proyecto_id)
+
+
+@login_required
+def estado_trabajo(request, trabajo_id):
+    """Vista AJAX para consultar el progreso de un trabajo de extracción."""
+    trabajo = get_object_or_404(
+        TrabajoExtraccion.objects.select_related('archivo'),
+        id=trabajo_id
+    )
+    
+    # Solo el autor de la subida o los miembros del proyecto pueden consultarlo
+    if trabajo.usuario_id != request.user.id and not request.permisos.es_miembro(trabajo.archivo.proyecto_id):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+    
+    data = {
+        'success': True,
+        'trabajo_id': trabajo.id,
+        'estado': trabajo.estado,
+        'estado_display': trabajo.get_estado_display(),
+        'progreso': trabajo.progreso,
+        'intentos': trabajo.intentos,
+        'max_intentos': trabajo.max_intentos,
+        'archivo': trabajo.archivo.nombre_archivo,
+        'error': trabajo.error,
+        'articulo_id': trabajo.articulo_id,
+    }
+    
+    if trabajo.estado == 'COMPLETADO':
+        data['url'] = reverse('articulos:ver_articulos', args=[trabajo.archivo.proyecto_id])
+    
+    return JsonResponse(data)
+
+
+@login_required
+def texto_articulo(request, articulo_id):
+    """Vista AJAX que devuelve bajo demanda el texto completo extraído de un artículo."""
+    articulo = get_object_or_404(Articulo.objects.only('id', 'proyecto_id'), id=articulo_id)
+    
+    if not request.permisos.es_miembro(articulo.proyecto_id):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+    
+    registro = TextoCompletoArticulo.objects.filter(articulo_id=articulo.id).first()
+    if not registro:
+        return JsonResponse({'success': False, 'error': 'El artículo no tiene texto extraído'}, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'articulo_id': articulo.id,
+        'longitud': registro.longitud,
+        'texto': registro.texto,
+    })
+
+
+@login_required
+@require_POST
+def cambiar_estado_articulo(request, articulo_id):
+    """
+    Vista AJAX para mover un artículo de columna en el tablero Kanban.
+    Usa Articulo.cambiar_estado: historial y contadores del proyecto en la misma transacción.
+    """
+    articulo = get_object_or_404(Articulo.objects.only('id', 'proyecto_id', 'estado'), id=articulo_id)
+    
+    if not request.permisos.es_miembro(articulo.proyecto_id):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+    
+    estado = request.POST.get('estado')
+    if estado not in dict(ESTADOS_ARTICULO):
+        return JsonResponse({'success': False, 'error': 'Estado no válido'}, status=400)
+    
+    cambiado = articulo.cambiar_estado(estado, usuario=request.user)
+    return JsonResponse({'success': True, 'estado': articulo.estado, 'cambiado': cambiado})
+
+
+RESULTADOS_BUSQUEDA_POR_PAGINA = 20
+
+
+@login_required
+def buscar_articulos(request, proyecto_id):
+    """Vista AJAX de búsqueda de texto completo en los artículos de un proyecto, ordenada por relevancia."""
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    if not request.permisos.es_miembro(proyecto.id):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+    
+    consulta = request.GET.get('q', '').strip()
+    if len(consulta) < 2:
+        return JsonResponse({'success': True, 'resultados': [], 'hay_mas': False})
+    
+    try:
+        pagina = max(int(request.GET.get('pagina', 1)), 1)
+    except ValueError:
+        pagina = 1
+    
+    # Se pide un resultado extra para saber si existe una página siguiente
+    resultados = buscar_en_indice(
+        proyecto.id,
+        consulta,
+        limite=RESULTADOS_BUSQUEDA_POR_PAGINA + 1,
+        desplazamiento=(pagina - 1) * RESULTADOS_BUSQUEDA_POR_PAGINA
+    )
+    hay_mas = len(resultados) > RESULTADOS_BUSQUEDA_POR_PAGINA
+    resultados = resultados[:RESULTADOS_BUSQUEDA_POR_PAGINA]
+    
+    articulos = Articulo.objects.only('id', 'bibtex_key', 'estado', 'doi').in_bulk(
+        [resultado['id'] for resultado in resultados]
+    )
+    for resultado in resultados:
+        articulo = articulos.get(resultado['id'])
+        if articulo:
+            resultado.update({
+                'bibtex_key': articulo.bibtex_key,
+                'estado': articulo.estado,
+                'doi': articulo.doi,
+            })
+    
+    return JsonResponse({
+        'success': True,
+        'resultados': resultados,
+        'pagina': pagina,
+        'hay_mas': hay_mas,
+    })
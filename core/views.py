@@ -26,14 +26,8 @@ def home_view(request):
     
     # Si el usuario está autenticado
     if request.user.is_authenticated:
-        # Verificar si es superusuario o administrador
-        is_admin = request.user.is_superuser
-        
-        if hasattr(request.user, 'profile') and request.user.profile.role:
-            is_admin = is_admin or request.user.profile.role.name == 'administrador'
-        
         # ==================== DASHBOARD PARA ADMINISTRADOR ====================
-        if is_admin:
+        if request.permisos.es_admin:
             context['total_usuarios'] = User.objects.count()
             context['total_roles'] = Role.objects.count()
             
@@ -48,8 +42,7 @@ def home_view(request):
             context['revisiones_pendientes'] = 12
         
         # ==================== DASHBOARD PARA INVESTIGADOR ====================
-        elif hasattr(request.user, 'profile') and request.user.profile.role and \
-             request.user.profile.role.name == 'investigador' and PROYECTOS_APP_INSTALLED:
+        elif request.permisos.roles.rol_global == 'investigador' and PROYECTOS_APP_INSTALLED:
             
             # Obtener proyectos del usuario
             usuario_proyectos = UsuarioProyecto.objects.filter(
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Proyecto, UsuarioProyecto, EstadisticaProyecto,Notificacion
+from .models import Proyecto, UsuarioProyecto, EstadisticaProyecto,Notificacion, ContadorNotificaciones, NotificacionArchivada, CorreoPendiente
 
 admin.site.register(Proyecto)
 admin.site.register(UsuarioProyecto)
@@ -9,4 +9,26 @@ class NotificacionAdmin(admin.ModelAdmin):
     list_display = ('usuario', 'tipo', 'titulo', 'leida', 'fecha_creacion')
     list_filter = ('tipo', 'leida', 'fecha_creacion')
     search_fields = ('usuario__username', 'titulo', 'mensaje')
-    readonly_fields = ('fecha_creacion', 'fecha_lectura')
\ No newline at end of file
+    readonly_fields = ('fecha_creacion', 'fecha_lectura')
+
+
+@admin.register(ContadorNotificaciones)
+class ContadorNotificacionesAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'no_leidas', 'fecha_actualizacion')
+    search_fields = ('usuario__username',)
+    readonly_fields = ('fecha_actualizacion',)
+
+
+@admin.register(NotificacionArchivada)
+class NotificacionArchivadaAdmin(admin.ModelAdmin):
+    list_display = ('usuario', 'tipo', 'titulo', 'fecha_creacion', 'fecha_archivado')
+    list_filter = ('tipo',)
+    search_fields = ('usuario__username', 'titulo')
+
+
+@admin.register(CorreoPendiente)
+class CorreoPendienteAdmin(admin.ModelAdmin):
+    list_display = ('asunto', 'estado', 'intentos', 'fecha_creacion', 'fecha_envio')
+    list_filter = ('estado',)
+    search_fields = ('asunto',)
+    readonly_fields = ('fecha_creacion', 'fecha_inicio', 'fecha_envio')
@@ -5,6 +5,14 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Las notificaciones en tiempo real (/notificaciones/eventos/) son conexiones
+Server-Sent Events de larga duración y solo funcionan servidas con ASGI, p. ej.:
+
+    uvicorn pymetanalis.asgi:application --workers 4
+
+Con más de un worker, NOTIFICACIONES_BACKPLANE = 'postgres' hace que cada
+notificación llegue a todos los procesos.
 """
 
 import os
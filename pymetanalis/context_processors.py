@@ -1,10 +1,13 @@
 # pymetanalis/context_processors.py
 
-from pymetanalis.models import UsuarioProyecto
+from pymetanalis.roles import obtener_roles
 
 def user_project_roles(request):
     """
-    Context processor que añade información sobre los roles del usuario en proyectos
+    Context processor que añade información sobre los roles del usuario en proyectos.
+    
+    Los roles se leen de una instantánea cacheada (ver pymetanalis.roles), por lo
+    que la mayoría de las páginas no hacen ninguna consulta aquí.
     """
     context = {
         'is_project_owner': False,
@@ -19,31 +22,22 @@ def user_project_roles(request):
     }
     
     if request.user.is_authenticated:
-        # Obtener todos los proyectos del usuario
-        user_projects = UsuarioProyecto.objects.filter(
-            usuario=request.user
-        ).select_related('proyecto')
+        roles = obtener_roles(request)
         
-        context['user_projects'] = user_projects
-        context['has_any_project_role'] = user_projects.exists()
+        context['user_projects'] = roles.membresias
+        context['has_any_project_role'] = bool(roles.membresias)
         
         # Separar proyectos por rol
-        context['owned_projects'] = user_projects.filter(rol_proyecto='DUEÑO')
-        context['supervised_projects'] = user_projects.filter(rol_proyecto='SUPERVISOR')
-        context['collaborated_projects'] = user_projects.filter(rol_proyecto='COLABORADOR')
+        context['owned_projects'] = roles.proyectos_con_rol('DUEÑO')
+        context['supervised_projects'] = roles.proyectos_con_rol('SUPERVISOR')
+        context['collaborated_projects'] = roles.proyectos_con_rol('COLABORADOR')
         
         # Verificar si tiene alguno de estos roles en algún proyecto
-        context['is_project_owner'] = context['owned_projects'].exists()
-        context['is_project_supervisor'] = context['supervised_projects'].exists()
-        context['is_project_collaborator'] = context['collaborated_projects'].exists()
+        context['is_project_owner'] = bool(context['owned_projects'])
+        context['is_project_supervisor'] = bool(context['supervised_projects'])
+        context['is_project_collaborator'] = bool(context['collaborated_projects'])
         
-        # Determinar si puede crear proyectos
         # Solo investigadores y administradores pueden crear proyectos
-        if hasattr(request.user, 'profile') and request.user.profile.role:
-            role_name = request.user.profile.role.name
-            context['can_create_projects'] = (
-                request.user.is_superuser or 
-                role_name in ['administrador', 'investigador']
-            )
+        context['can_create_projects'] = roles.puede_crear_proyectos
     
-    return context
\ No newline at end of file
+    return context
@@ -0,0 +1,135 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CorreoPendiente
+
+
+logger = logging.getLogger(__name__)
+
+# Espera base antes de reintentar un correo fallido (se duplica en cada intento)
+ESPERA_REINTENTO = datetime.timedelta(minutes=1)
+
+# Tiempo tras el cual un correo ENVIANDO se considera abandonado por su worker
+TIEMPO_MAXIMO_ENVIO = datetime.timedelta(minutes=10)
+
+
+def encolar_correo(asunto, cuerpo, destinatarios, remitente=None):
+    """
+    Guarda un correo en la bandeja de salida. Debe llamarse dentro de la transacción
+    del cambio que lo origina: si esta se revierte, el correo tampoco se envía.
+    """
+    destinatarios = [destinatario for destinatario in destinatarios if destinatario]
+    if not destinatarios:
+        return None
+    return CorreoPendiente.objects.create(
+        asunto=asunto,
+        cuerpo=cuerpo,
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=destinatarios,
+    )
+
+
+def encolar_correos(mensajes, remitente=None):
+    """Versión en bloque de encolar_correo: `mensajes` son tuplas (asunto, cuerpo, destinatarios)."""
+    remitente = remitente or settings.DEFAULT_FROM_EMAIL
+    return CorreoPendiente.objects.bulk_create([
+        CorreoPendiente(asunto=asunto, cuerpo=cuerpo, remitente=remitente, destinatarios=list(destinatarios))
+        for asunto, cuerpo, destinatarios in mensajes
+        if destinatarios
+    ])
+
+
+def reclamar_correos(limite):
+    """
+    Marca como ENVIANDO hasta `limite` correos disponibles y los devuelve.
+    Igual que la cola de extracción, cada correo se reclama con un UPDATE
+    condicionado al estado PENDIENTE para que dos workers no lo envíen dos veces.
+    """
+    ahora = timezone.now()
+    candidatos = CorreoPendiente.objects.filter(
+        estado='PENDIENTE',
+        disponible_desde__lte=ahora
+    ).values_list('id', flat=True)[:limite]
+
+    reclamados = [
+        correo_id for correo_id in candidatos
+        if CorreoPendiente.objects.filter(id=correo_id, estado='PENDIENTE').update(
+            estado='ENVIANDO',
+            intentos=F('intentos') + 1,
+            fecha_inicio=ahora
+        )
+    ]
+    return list(CorreoPendiente.objects.filter(id__in=reclamados))
+
+
+def recuperar_correos_abandonados():
+    """Devuelve a la cola los correos cuyo worker terminó sin confirmar el envío."""
+    limite = timezone.now() - TIEMPO_MAXIMO_ENVIO
+    return CorreoPendiente.objects.filter(
+        estado='ENVIANDO',
+        fecha_inicio__lt=limite
+    ).update(estado='PENDIENTE')
+
+
+def fallar_correo(correo, error):
+    """Reprograma el correo con espera exponencial o lo marca FALLIDO al agotar los intentos."""
+    correo.error = str(error)
+    if correo.intentos < correo.max_intentos:
+        correo.estado = 'PENDIENTE'
+        correo.disponible_desde = timezone.now() + ESPERA_REINTENTO * (2 ** (correo.intentos - 1))
+        logger.warning(f"Correo {correo.id} falló (intento {correo.intentos}), se reintentará: {error}")
+    else:
+        correo.estado = 'FALLIDO'
+        logger.error(f"Correo {correo.id} descartado tras {correo.intentos} intentos: {error}")
+    correo.save(update_fields=['estado', 'error', 'disponible_desde'])
+
+
+def enviar_correos(correos, conexion=None):
+    """
+    Envía un lote de correos reclamados reutilizando una única conexión SMTP.
+    Devuelve (enviados, fallidos).
+    """
+    if not correos:
+        return 0, 0
+
+    enviados = fallidos = 0
+    conexion = conexion or get_connection()
+    try:
+        conexion.open()
+    except Exception as e:
+        # Sin conexión no se puede enviar ninguno: todos se reprograman
+        for correo in correos:
+            fallar_correo(correo, e)
+        return 0, len(correos)
+
+    try:
+        for correo in correos:
+            mensaje = EmailMessage(
+                correo.asunto,
+                correo.cuerpo,
+                correo.remitente,
+                correo.destinatarios,
+                connection=conexion,
+            )
+            try:
+                mensaje.send()
+            except Exception as e:
+                fallar_correo(correo, e)
+                fallidos += 1
+            else:
+                # Se confirma en el momento: si el worker cae después, este correo no se reenvía
+                CorreoPendiente.objects.filter(id=correo.id).update(
+                    estado='ENVIADO',
+                    error=None,
+                    fecha_envio=timezone.now()
+                )
+                enviados += 1
+    finally:
+        conexion.close()
+
+    return enviados, fallidos
@@ -0,0 +1,131 @@
+import datetime
+from itertools import islice
+
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import EstadisticaProyecto, Proyecto
+
+
+TAMANO_LOTE = 1000
+
+CAMPOS_ESTADISTICA = ['total_articulos', 'articulos_aprobados']
+
+
+def _guardar(estadisticas):
+    """
+    Inserta o actualiza las filas usando la clave única (proyecto, fecha).
+    `estadisticas` puede ser un generador: se consume de TAMANO_LOTE en TAMANO_LOTE.
+    """
+    estadisticas = iter(estadisticas)
+    total = 0
+    while lote := list(islice(estadisticas, TAMANO_LOTE)):
+        EstadisticaProyecto.objects.bulk_create(
+            lote,
+            update_conflicts=True,
+            unique_fields=['proyecto', 'fecha'],
+            update_fields=CAMPOS_ESTADISTICA,
+        )
+        total += len(lote)
+    return total
+
+
+def registrar_instantanea(fecha=None):
+    """
+    Guarda la estadística del día de todos los proyectos con una sola consulta:
+    los totales salen de los contadores que ya mantiene Proyecto.
+    promedio_calidad queda vacío hasta que los artículos tengan una puntuación de calidad.
+    """
+    fecha = fecha or timezone.localdate()
+    return _guardar(
+        EstadisticaProyecto(
+            proyecto_id=proyecto_id,
+            fecha=fecha,
+            total_articulos=total,
+            articulos_aprobados=aprobados,
+        )
+        for proyecto_id, total, aprobados in Proyecto.objects.values_list(
+            'id', 'total_articulos', 'articulos_aprobados'
+        ).iterator(chunk_size=TAMANO_LOTE)
+    )
+
+
+def _eventos_por_dia(historial):
+    """{proyecto_id: {dia: cantidad}} de un queryset de HistorialArticulo, con una consulta agrupada."""
+    eventos = {}
+    for proyecto_id, dia, cantidad in (
+        historial.annotate(dia=TruncDate('fecha')).order_by()
+        .values_list('articulo__proyecto_id', 'dia').annotate(cantidad=Count('id'))
+    ):
+        eventos.setdefault(proyecto_id, {})[dia] = cantidad
+    return eventos
+
+
+def reconstruir_historial(desde=None, hasta=None):
+    """
+    Reconstruye la serie diaria de cada proyecto a partir del historial de artículos:
+    altas (CREACION) y entradas/salidas del estado APROBADO (CAMBIO_ESTADO).
+    Son tres consultas agrupadas en total, que solo traen los días con eventos;
+    la serie día a día se genera proyecto a proyecto y se guarda por lotes, sin
+    tener en memoria días × proyectos filas. Se guardan los días entre `desde` y
+    `hasta` (por defecto, hasta ayer).
+
+    Los artículos eliminados no dejan historial, así que la serie refleja los
+    artículos que siguen existiendo.
+    """
+    from articulos.models import HistorialArticulo
+
+    hasta = hasta or timezone.localdate() - datetime.timedelta(days=1)
+    historial = HistorialArticulo.objects.filter(fecha__date__lte=hasta)
+
+    altas = _eventos_por_dia(historial.filter(tipo_cambio='CREACION'))
+    aprobaciones = _eventos_por_dia(historial.filter(tipo_cambio='CAMBIO_ESTADO', valor_nuevo='APROBADO'))
+    desaprobaciones = _eventos_por_dia(historial.filter(tipo_cambio='CAMBIO_ESTADO', valor_anterior='APROBADO'))
+
+    return _guardar(_serie_diaria(altas, aprobaciones, desaprobaciones, desde, hasta))
+
+
+def _serie_diaria(altas, aprobaciones, desaprobaciones, desde, hasta):
+    """Genera las EstadisticaProyecto acumuladas de cada proyecto, un día tras otro."""
+    for proyecto_id, altas_proyecto in altas.items():
+        aprobadas = aprobaciones.get(proyecto_id, {})
+        desaprobadas = desaprobaciones.get(proyecto_id, {})
+
+        dia = min(altas_proyecto)
+        total = aprobados = 0
+        while dia <= hasta:
+            total += altas_proyecto.get(dia, 0)
+            aprobados += aprobadas.get(dia, 0) - desaprobadas.get(dia, 0)
+            if desde is None or dia >= desde:
+                yield EstadisticaProyecto(
+                    proyecto_id=proyecto_id,
+                    fecha=dia,
+                    total_articulos=total,
+                    articulos_aprobados=aprobados,
+                )
+            dia += datetime.timedelta(days=1)
+
+
+def serie_proyecto(proyecto_id, dias):
+    """Serie diaria de un proyecto con el avance de cada día respecto al anterior."""
+    inicio = timezone.localdate() - datetime.timedelta(days=dias - 1)
+    filas = list(
+        EstadisticaProyecto.objects.filter(proyecto_id=proyecto_id, fecha__gte=inicio)
+        .order_by('fecha')
+        .values_list('fecha', 'total_articulos', 'articulos_aprobados', 'promedio_calidad')
+    )
+
+    serie = []
+    anterior = None
+    for fecha, total, aprobados, calidad in filas:
+        serie.append({
+            'fecha': fecha.isoformat(),
+            'total_articulos': total,
+            'articulos_aprobados': aprobados,
+            'nuevos': total - anterior[0] if anterior else None,
+            'aprobados_dia': aprobados - anterior[1] if anterior else None,
+            'promedio_calidad': float(calidad) if calidad is not None else None,
+        })
+        anterior = (total, aprobados)
+    return serie
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Canal de LISTEN/NOTIFY cuando varios procesos comparten la base de datos PostgreSQL
+CANAL_POSTGRES = 'pymetanalis_notificaciones'
+
+# pg_notify admite cargas de hasta 8000 bytes; el mensaje se recorta antes de enviarlo
+LONGITUD_MAXIMA_MENSAJE = 500
+
+# Eventos pendientes por conexión antes de descartar los más antiguos
+TAMANO_COLA = 100
+
+
+class Difusor:
+    """
+    Reparte eventos entre las conexiones SSE abiertas en este proceso.
+
+    Cada conexión tiene su propia cola asyncio. `publicar` puede llamarse
+    desde cualquier hilo (las vistas síncronas corren en un pool de hilos
+    bajo ASGI), así que las colas se alimentan con call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._suscriptores = {}
+        self._lock = threading.Lock()
+
+    def suscribir(self, usuario_id):
+        cola = asyncio.Queue(maxsize=TAMANO_COLA)
+        suscripcion = (asyncio.get_running_loop(), cola)
+        with self._lock:
+            self._suscriptores.setdefault(usuario_id, set()).add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, usuario_id, suscripcion):
+        with self._lock:
+            suscripciones = self._suscriptores.get(usuario_id)
+            if suscripciones:
+                suscripciones.discard(suscripcion)
+                if not suscripciones:
+                    del self._suscriptores[usuario_id]
+
+    def publicar(self, usuario_id, evento):
+        with self._lock:
+            suscripciones = list(self._suscriptores.get(usuario_id, ()))
+        for loop, cola in suscripciones:
+            try:
+                loop.call_soon_threadsafe(_encolar, cola, evento)
+            except RuntimeError:
+                # El bucle de esa conexión ya se cerró
+                self.cancelar(usuario_id, (loop, cola))
+
+    @property
+    def conexiones(self):
+        with self._lock:
+            return sum(len(s) for s in self._suscriptores.values())
+
+
+def _encolar(cola, evento):
+    if cola.full():
+        # Un cliente lento no debe bloquear a los demás: se pierde el evento más antiguo
+        cola.get_nowait()
+    cola.put_nowait(evento)
+
+
+difusor = Difusor()
+
+
+def _usa_postgres():
+    return (
+        getattr(settings, 'NOTIFICACIONES_BACKPLANE', None) == 'postgres'
+        and connection.vendor == 'postgresql'
+    )
+
+
+def emitir(usuario_id, tipo, datos):
+    """
+    Envía un evento a las conexiones SSE del usuario una vez confirmada la transacción.
+
+    Sin backplane el evento solo llega a las conexiones de este proceso; con
+    NOTIFICACIONES_BACKPLANE = 'postgres' se difunde con pg_notify y cada
+    proceso lo reparte a sus propias conexiones.
+    """
+    evento = {'tipo': tipo, 'datos': datos}
+
+    def enviar():
+        if _usa_postgres():
+            carga = json.dumps({'usuario_id': usuario_id, 'evento': evento}, default=str)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [CANAL_POSTGRES, carga])
+        else:
+            difusor.publicar(usuario_id, evento)
+
+    transaction.on_commit(enviar)
+
+
+def emitir_notificacion(notificacion, no_leidas):
+    datos = {
+        'id': notificacion.id,
+        'tipo': notificacion.tipo,
+        'titulo': notificacion.titulo,
+        'mensaje': notificacion.mensaje[:LONGITUD_MAXIMA_MENSAJE],
+        'url': notificacion.url or '#',
+        'fecha_creacion': notificacion.fecha_creacion.isoformat(),
+        'no_leidas': no_leidas,
+    }
+    emitir(notificacion.usuario_id, 'notificacion', datos)
+
+
+def emitir_contador(usuario_id, no_leidas):
+    emitir(usuario_id, 'contador', {'no_leidas': no_leidas})
+
+
+# ==================== BACKPLANE POSTGRESQL ====================
+
+_escuchas = {}
+
+
+def iniciar_escucha():
+    """
+    Arranca, si hace falta, la tarea que escucha el canal de PostgreSQL en el
+    bucle actual. Se llama al abrir cada conexión SSE; solo la primera la crea.
+    """
+    if not _usa_postgres():
+        return
+    loop = asyncio.get_running_loop()
+    tarea = _escuchas.get(loop)
+    if tarea is None or tarea.done():
+        _escuchas[loop] = loop.create_task(_escuchar_postgres())
+
+
+async def _escuchar_postgres():
+    import psycopg
+
+    parametros = connection.get_connection_params()
+    parametros.pop('cursor_factory', None)
+    parametros.pop('context', None)
+    parametros.pop('server_side_binding', None)
+
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(autocommit=True, **parametros) as conexion:
+                await conexion.execute(f'LISTEN {CANAL_POSTGRES}')
+                async for aviso in conexion.notifies():
+                    try:
+                        carga = json.loads(aviso.payload)
+                        difusor.publicar(carga['usuario_id'], carga['evento'])
+                    except (ValueError, KeyError):
+                        logger.warning('Aviso de notificación inválido: %r', aviso.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Se perdió la escucha de notificaciones; reintentando')
+            await asyncio.sleep(5)
@@ -0,0 +1,135 @@
+import csv
+import io
+import re
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+from django.utils.crypto import get_random_string
+
+from .correos import encolar_correos
+from .models import Invitacion, UsuarioProyecto
+
+
+# Dominios de correo a los que se puede invitar
+DOMINIOS_PERMITIDOS = ('gmail.com', 'unemi.edu.ec')
+
+# Direcciones aceptadas en una sola invitación masiva
+MAXIMO_INVITACIONES_POR_LOTE = 500
+
+SEPARADORES = re.compile(r'[\s,;]+')
+
+
+def dominio_permitido(email):
+    """Compara el dominio completo (no una subcadena: 'x@gmail.com.mx' no es Gmail)."""
+    return email.rpartition('@')[2].lower() in DOMINIOS_PERMITIDOS
+
+
+def extraer_correos(texto='', archivo=None):
+    """
+    Lista de direcciones (en minúsculas, sin repetir y en orden) a partir de un texto
+    pegado y/o un CSV; del CSV se toma cualquier celda que contenga '@'.
+    """
+    candidatos = SEPARADORES.split(texto or '')
+    if archivo is not None:
+        contenido = archivo.read().decode('utf-8-sig', errors='replace')
+        for fila in csv.reader(io.StringIO(contenido)):
+            candidatos.extend(celda for celda in fila if '@' in celda)
+
+    correos = {}
+    for candidato in candidatos:
+        candidato = candidato.strip().strip('<>"\'').lower()
+        if candidato:
+            correos.setdefault(candidato, None)
+    return list(correos)
+
+
+def invitar_en_bloque(proyecto, correos, invitador, enlace):
+    """
+    Invita a varias direcciones a la vez.
+
+    Valida todas las direcciones, resuelve las invitaciones pendientes y las cuentas
+    existentes (con su membresía) en dos consultas, crea las invitaciones nuevas con
+    bulk_create y encola todos los correos en un solo lote. `enlace(token)` construye
+    la URL absoluta de aceptación.
+
+    Devuelve una lista de {'email', 'estado', 'mensaje'}; estado es 'creada',
+    'reenviada', 'miembro', 'dominio' o 'invalida'.
+    """
+    resultados = {}
+    validos = []
+    for email in correos:
+        try:
+            validate_email(email)
+        except ValidationError:
+            resultados[email] = ('invalida', 'Dirección de correo no válida')
+            continue
+        if not dominio_permitido(email):
+            resultados[email] = ('dominio', 'Solo se permiten correos Gmail o @unemi.edu.ec')
+            continue
+        validos.append(email)
+
+    with transaction.atomic():
+        pendientes = {
+            invitacion.email_destino.lower(): invitacion
+            for invitacion in Invitacion.objects.annotate(email_normalizado=Lower('email_destino')).filter(
+                proyecto=proyecto, aceptado=False, email_normalizado__in=validos
+            )
+        }
+        cuentas = dict(
+            User.objects.annotate(email_normalizado=Lower('email'))
+            .filter(email_normalizado__in=validos)
+            .annotate(es_miembro=Exists(
+                UsuarioProyecto.objects.filter(usuario=OuterRef('pk'), proyecto=proyecto)
+            ))
+            .values_list('email_normalizado', 'es_miembro')
+        )
+
+        nuevas = []
+        a_enviar = []
+        for email in validos:
+            if cuentas.get(email):
+                resultados[email] = ('miembro', 'Ya es miembro del proyecto')
+            elif email in pendientes:
+                a_enviar.append(pendientes[email])
+                resultados[email] = ('reenviada', 'Ya tenía una invitación pendiente; se reenvió')
+            else:
+                nuevas.append(Invitacion(
+                    proyecto=proyecto,
+                    email_destino=email,
+                    token=get_random_string(length=32),
+                    creado_por=invitador,
+                ))
+                resultados[email] = (
+                    'creada',
+                    'Invitación enviada (ya tiene cuenta)' if email in cuentas else 'Invitación enviada'
+                )
+
+        a_enviar.extend(Invitacion.objects.bulk_create(nuevas))
+
+        remitente_nombre = invitador.get_full_name() or invitador.username
+        encolar_correos(
+            (
+                f'Invitación al proyecto "{proyecto.nombre}"',
+                f"""Hola,
+
+{remitente_nombre} te ha invitado a colaborar en el proyecto "{proyecto.nombre}".
+
+Acepta la invitación en el siguiente enlace:
+{enlace(invitacion.token)}
+
+Saludos,
+Equipo de Metaanálisis
+""",
+                [invitacion.email_destino],
+            )
+            for invitacion in a_enviar
+        )
+
+    return [
+        {'email': email, 'estado': resultados[email][0], 'mensaje': resultados[email][1]}
+        for email in correos
+    ]
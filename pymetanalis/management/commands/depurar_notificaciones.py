@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pymetanalis.retencion import TAMANO_LOTE, aplicar_maximo, depurar_antiguas
+
+
+class Command(BaseCommand):
+    help = (
+        'Archiva (o elimina) las notificaciones leídas antiguas y aplica el máximo por usuario. '
+        'Pensado para ejecutarse periódicamente (cron) o en modo continuo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=settings.NOTIFICACIONES_RETENCION_DIAS,
+            help='Antigüedad en días a partir de la cual se depuran las leídas.'
+        )
+        parser.add_argument(
+            '--maximo',
+            type=int,
+            default=settings.NOTIFICACIONES_MAXIMO_POR_USUARIO,
+            help='Notificaciones que conserva cada usuario como máximo (0 para no limitar).'
+        )
+        parser.add_argument(
+            '--eliminar',
+            action='store_true',
+            help='Elimina las notificaciones en lugar de archivarlas.'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help='Filas por transacción.'
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.05,
+            help='Segundos de espera entre lotes para no saturar la base de datos.'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            help='Si se indica, repite la depuración cada N segundos en lugar de terminar.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self._depurar(options)
+            if not options['intervalo']:
+                break
+            time.sleep(options['intervalo'])
+
+    def _depurar(self, options):
+        inicio = time.monotonic()
+        archivar = settings.NOTIFICACIONES_ARCHIVAR and not options['eliminar']
+        accion = 'archivadas' if archivar else 'eliminadas'
+
+        antiguas = sum(depurar_antiguas(options['dias'], archivar, options['lote'], options['pausa']))
+        self.stdout.write(f"{antiguas} notificaciones leídas de más de {options['dias']} días {accion}.")
+
+        if options['maximo'] > 0:
+            usuarios = set()
+            excedentes = 0
+            for usuario_id, movidas in aplicar_maximo(options['maximo'], archivar, options['lote'], options['pausa']):
+                usuarios.add(usuario_id)
+                excedentes += movidas
+            self.stdout.write(
+                f"{excedentes} notificaciones {accion} de {len(usuarios)} usuarios "
+                f"por superar el máximo de {options['maximo']}."
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Depuración completada en {time.monotonic() - inicio:.2f}s'))
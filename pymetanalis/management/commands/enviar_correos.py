@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pymetanalis.correos import enviar_correos, reclamar_correos, recuperar_correos_abandonados
+
+
+class Command(BaseCommand):
+    help = (
+        'Entrega los correos de la bandeja de salida (CorreoPendiente) en lotes, '
+        'con una conexión SMTP por lote y reintentos con espera exponencial.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=50,
+            help='Correos enviados por cada conexión SMTP.'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre consultas a la cola cuando no hay correos.'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Envía los correos disponibles y termina.'
+        )
+
+    def handle(self, *args, **options):
+        recuperados = recuperar_correos_abandonados()
+        if recuperados:
+            self.stdout.write(f'{recuperados} correos abandonados devueltos a la cola.')
+
+        self.stdout.write('Worker de correo iniciado.')
+        total_enviados = total_fallidos = 0
+        try:
+            while True:
+                correos = reclamar_correos(max(1, options['lote']))
+                if not correos:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                inicio = time.monotonic()
+                enviados, fallidos = enviar_correos(correos)
+                total_enviados += enviados
+                total_fallidos += fallidos
+                self.stdout.write(
+                    f'Lote de {len(correos)} correos: {enviados} enviados, {fallidos} fallidos '
+                    f'en {time.monotonic() - inicio:.2f}s'
+                )
+        except KeyboardInterrupt:
+            self.stdout.write('Worker de correo detenido.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_enviados} correos enviados, {total_fallidos} con error.'
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pymetanalis.models import Proyecto
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de artículos por estado de los proyectos a partir de la tabla de artículos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--proyecto',
+            type=int,
+            help='ID del proyecto a recalcular (por defecto, todos)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Proyectos recalculados por consulta agrupada'
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        ids = list(Proyecto.objects.order_by('id').values_list('id', flat=True))
+        if options['proyecto']:
+            if options['proyecto'] not in ids:
+                raise CommandError(f"No existe el proyecto {options['proyecto']}")
+            ids = [options['proyecto']]
+
+        total = 0
+        for desde in range(0, len(ids), options['lote']):
+            total += Proyecto.recalcular_contadores(ids[desde:desde + options['lote']])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores de {total} proyectos recalculados en {time.monotonic() - inicio:.2f}s'
+        ))
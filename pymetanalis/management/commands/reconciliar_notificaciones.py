@@ -0,0 +1,74 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from pymetanalis.models import ContadorNotificaciones, Notificacion
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de notificaciones no leídas y corrige los que se hayan desviado.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--usuario',
+            type=int,
+            help='ID del usuario a reconciliar (por defecto, todos)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Usuarios procesados por transacción (por defecto 1000)'
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        usuarios = User.objects.order_by('id').values_list('id', flat=True)
+        if options['usuario']:
+            usuarios = usuarios.filter(id=options['usuario'])
+
+        revisados = corregidos = 0
+        ultimo_id = 0
+        while True:
+            ids = list(usuarios.filter(id__gt=ultimo_id)[:options['lote']])
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+            revisados += len(ids)
+            corregidos += self._reconciliar(ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{revisados} usuarios revisados, {corregidos} contadores corregidos '
+            f'en {time.monotonic() - inicio:.2f}s'
+        ))
+
+    def _reconciliar(self, ids):
+        with transaction.atomic():
+            # Bloquear los contadores hace que los incrementos concurrentes esperen
+            # y se apliquen sobre el valor corregido en lugar de perderse
+            actuales = dict(
+                ContadorNotificaciones.objects.select_for_update()
+                .filter(usuario_id__in=ids).values_list('usuario_id', 'no_leidas')
+            )
+            reales = dict(
+                Notificacion.objects.filter(usuario_id__in=ids, leida=False)
+                .values('usuario_id').annotate(total=Count('id')).values_list('usuario_id', 'total')
+            )
+
+            actualizar = []
+            crear = []
+            for usuario_id in ids:
+                real = reales.get(usuario_id, 0)
+                if usuario_id in actuales:
+                    if actuales[usuario_id] != real:
+                        actualizar.append(ContadorNotificaciones(usuario_id=usuario_id, no_leidas=real))
+                elif real:
+                    crear.append(ContadorNotificaciones(usuario_id=usuario_id, no_leidas=real))
+
+            ContadorNotificaciones.objects.bulk_update(actualizar, ['no_leidas'])
+            ContadorNotificaciones.objects.bulk_create(crear, ignore_conflicts=True)
+
+        return len(actualizar) + len(crear)
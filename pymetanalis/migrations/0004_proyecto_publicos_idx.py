@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pymetanalis', '0003_invitacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['estado', '-fecha_creacion', '-id'], name='proyecto_publicos_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('pymetanalis', '0004_proyecto_publicos_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorNotificaciones',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contador_notificaciones', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('no_leidas', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Contador de notificaciones',
+                'verbose_name_plural': 'Contadores de notificaciones',
+            },
+        ),
+    ]
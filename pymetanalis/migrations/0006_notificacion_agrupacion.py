@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pymetanalis', '0005_contadornotificaciones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='cantidad',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='clave_agrupacion',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='notificacion',
+            name='tipo',
+            field=models.CharField(choices=[('solicitud_aceptada', 'Solicitud Aceptada'), ('solicitud_rechazada', 'Solicitud Rechazada'), ('invitacion_proyecto', 'Invitación a Proyecto'), ('nueva_solicitud', 'Nueva Solicitud'), ('cambio_rol', 'Cambio de Rol'), ('articulos_nuevos', 'Artículos Nuevos'), ('general', 'General')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['clave_agrupacion', 'usuario'], name='notificacion_agrupacion_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pymetanalis', '0006_notificacion_agrupacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacionArchivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('solicitud_aceptada', 'Solicitud Aceptada'), ('solicitud_rechazada', 'Solicitud Rechazada'), ('invitacion_proyecto', 'Invitación a Proyecto'), ('nueva_solicitud', 'Nueva Solicitud'), ('cambio_rol', 'Cambio de Rol'), ('articulos_nuevos', 'Artículos Nuevos'), ('general', 'General')], max_length=30)),
+                ('titulo', models.CharField(max_length=255)),
+                ('mensaje', models.TextField()),
+                ('url', models.CharField(blank=True, max_length=500, null=True)),
+                ('cantidad', models.PositiveIntegerField(default=1)),
+                ('fecha_creacion', models.DateTimeField()),
+                ('fecha_lectura', models.DateTimeField(blank=True, null=True)),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+                ('proyecto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pymetanalis.proyecto')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones_archivadas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Notificación archivada',
+                'verbose_name_plural': 'Notificaciones archivadas',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['usuario', '-fecha_creacion'], name='notif_archivada_usuario_idx')],
+            },
+        ),
+    ]
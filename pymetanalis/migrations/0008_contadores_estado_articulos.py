@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:12
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+CAMPOS_CONTADOR_ESTADO = {
+    'PENDIENTE': 'articulos_pendientes',
+    'EN_REVISION': 'articulos_en_revision',
+    'APROBADO': 'articulos_aprobados',
+    'RECHAZADO': 'articulos_rechazados',
+}
+
+
+def calcular_contadores(apps, schema_editor):
+    """Rellena los contadores nuevos (y corrige total/trabajados) a partir de los artículos existentes."""
+    Proyecto = apps.get_model('pymetanalis', 'Proyecto')
+    Articulo = apps.get_model('articulos', 'Articulo')
+
+    conteos = {}
+    for proyecto_id, estado, total in (
+        Articulo.objects.order_by().values_list('proyecto_id', 'estado').annotate(total=Count('id'))
+    ):
+        conteos.setdefault(proyecto_id, {})[estado] = total
+
+    proyectos = []
+    for proyecto in Proyecto.objects.only('id'):
+        por_estado = conteos.get(proyecto.id, {})
+        for estado, campo in CAMPOS_CONTADOR_ESTADO.items():
+            setattr(proyecto, campo, por_estado.get(estado, 0))
+        proyecto.total_articulos = sum(por_estado.get(estado, 0) for estado in CAMPOS_CONTADOR_ESTADO)
+        proyecto.articulos_trabajados = por_estado.get('APROBADO', 0) + por_estado.get('RECHAZADO', 0)
+        proyectos.append(proyecto)
+
+    Proyecto.objects.bulk_update(
+        proyectos,
+        ['total_articulos', 'articulos_trabajados', *CAMPOS_CONTADOR_ESTADO.values()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pymetanalis', '0007_notificacionarchivada'),
+        ('articulos', '0009_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='articulos_aprobados',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='articulos_en_revision',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='articulos_pendientes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='articulos_rechazados',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
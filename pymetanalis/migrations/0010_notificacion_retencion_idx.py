@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pymetanalis', '0009_correopendiente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['leida', 'fecha_creacion'], name='notificacion_retencion_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
 class Proyecto(models.Model):
     ESTADO_CHOICES = [
@@ -23,15 +27,87 @@ class Proyecto(models.Model):
     configuracion = models.JSONField(null=True, blank=True)
     total_articulos = models.IntegerField(default=0)
     articulos_trabajados = models.IntegerField(default=0)
+    # Contadores por estado de artículo; se mantienen con Proyecto.ajustar_contadores
+    articulos_pendientes = models.IntegerField(default=0)
+    articulos_en_revision = models.IntegerField(default=0)
+    articulos_aprobados = models.IntegerField(default=0)
+    articulos_rechazados = models.IntegerField(default=0)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
 
+    # Estado de artículo -> campo contador
+    CAMPOS_CONTADOR_ESTADO = {
+        'PENDIENTE': 'articulos_pendientes',
+        'EN_REVISION': 'articulos_en_revision',
+        'APROBADO': 'articulos_aprobados',
+        'RECHAZADO': 'articulos_rechazados',
+    }
+    # Estados que cuentan como artículo trabajado en la barra de progreso
+    ESTADOS_TRABAJADOS = ('APROBADO', 'RECHAZADO')
+
     class Meta:
         verbose_name = 'Proyecto'
         verbose_name_plural = 'Proyectos'
+        indexes = [
+            # Listado de proyectos públicos (buscar_proyectos)
+            models.Index(fields=['estado', '-fecha_creacion', '-id'], name='proyecto_publicos_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    @property
+    def conteo_por_estado(self):
+        return {estado: getattr(self, campo) for estado, campo in self.CAMPOS_CONTADOR_ESTADO.items()}
+
+    @classmethod
+    def ajustar_contadores(cls, proyecto_id, cambios):
+        """
+        Aplica `cambios` ({estado: delta}) a los contadores de artículos con un único
+        UPDATE con F(), dentro de la transacción del llamador.
+        """
+        valores = {}
+        total = trabajados = 0
+        for estado, delta in cambios.items():
+            if not delta:
+                continue
+            campo = cls.CAMPOS_CONTADOR_ESTADO[estado]
+            valores[campo] = F(campo) + delta
+            total += delta
+            if estado in cls.ESTADOS_TRABAJADOS:
+                trabajados += delta
+        if total:
+            valores['total_articulos'] = F('total_articulos') + total
+        if trabajados:
+            valores['articulos_trabajados'] = F('articulos_trabajados') + trabajados
+        if valores:
+            cls.objects.filter(id=proyecto_id).update(**valores)
+
+    @classmethod
+    def recalcular_contadores(cls, proyectos_ids):
+        """Recalcula los contadores de los proyectos indicados con una consulta agrupada."""
+        from articulos.models import Articulo
+
+        proyectos_ids = list(proyectos_ids)
+        conteos = {proyecto_id: dict.fromkeys(cls.CAMPOS_CONTADOR_ESTADO, 0) for proyecto_id in proyectos_ids}
+        for proyecto_id, estado, total in (
+            Articulo.objects.filter(proyecto_id__in=proyectos_ids).order_by()
+            .values_list('proyecto_id', 'estado').annotate(total=models.Count('id'))
+        ):
+            if estado in cls.CAMPOS_CONTADOR_ESTADO:
+                conteos[proyecto_id][estado] = total
+
+        proyectos = []
+        for proyecto_id, por_estado in conteos.items():
+            proyecto = cls(id=proyecto_id, total_articulos=sum(por_estado.values()))
+            proyecto.articulos_trabajados = sum(por_estado[estado] for estado in cls.ESTADOS_TRABAJADOS)
+            for estado, campo in cls.CAMPOS_CONTADOR_ESTADO.items():
+                setattr(proyecto, campo, por_estado[estado])
+            proyectos.append(proyecto)
+
+        campos = ['total_articulos', 'articulos_trabajados', *cls.CAMPOS_CONTADOR_ESTADO.values()]
+        cls.objects.bulk_update(proyectos, campos)
+        return len(proyectos)
+
 class UsuarioProyecto(models.Model):
     ROL_PROYECTO_CHOICES = [
         ('DUEÑO', 'Dueño'),
@@ -104,6 +180,7 @@ class Notificacion(models.Model):
         ('invitacion_proyecto', 'Invitación a Proyecto'),
         ('nueva_solicitud', 'Nueva Solicitud'),  # ← Esta es la que necesitas
         ('cambio_rol', 'Cambio de Rol'),
+        ('articulos_nuevos', 'Artículos Nuevos'),
         ('general', 'General'),
     ]
     
@@ -138,12 +215,18 @@ class Notificacion(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_lectura = models.DateTimeField(null=True, blank=True)
     
+    # Eventos repetidos con la misma clave se acumulan en una sola notificación no leída
+    clave_agrupacion = models.CharField(max_length=100, blank=True, null=True)
+    cantidad = models.PositiveIntegerField(default=1)
+    
     class Meta:
         verbose_name = 'Notificación'
         verbose_name_plural = 'Notificaciones'
         ordering = ['-fecha_creacion']
         indexes = [
             models.Index(fields=['usuario', 'leida', '-fecha_creacion']),
+            models.Index(fields=['clave_agrupacion', 'usuario'], name='notificacion_agrupacion_idx'),
+            models.Index(fields=['leida', 'fecha_creacion'], name='notificacion_retencion_idx'),
         ]
     
     def __str__(self):
@@ -155,7 +238,155 @@ class Notificacion(models.Model):
             from django.utils import timezone
             self.leida = True
             self.fecha_lectura = timezone.now()
-            self.save(update_fields=['leida', 'fecha_lectura'])
+            # Actualización condicional: si otra petición ya la marcó, no se descuenta dos veces
+            marcadas = Notificacion.objects.filter(pk=self.pk, leida=False).update(
+                leida=True, fecha_lectura=self.fecha_lectura
+            )
+            if marcadas:
+                ContadorNotificaciones.decrementar(self.usuario_id)
+
+
+class NotificacionArchivada(models.Model):
+    """
+    Notificaciones leídas antiguas que el comando depurar_notificaciones saca de
+    la tabla principal para que esta y su índice se mantengan pequeños.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notificaciones_archivadas')
+    proyecto = models.ForeignKey(Proyecto, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    tipo = models.CharField(max_length=30, choices=Notificacion.TIPO_CHOICES)
+    titulo = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    url = models.CharField(max_length=500, blank=True, null=True)
+    cantidad = models.PositiveIntegerField(default=1)
+    fecha_creacion = models.DateTimeField()
+    fecha_lectura = models.DateTimeField(null=True, blank=True)
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Notificación archivada'
+        verbose_name_plural = 'Notificaciones archivadas'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['usuario', '-fecha_creacion'], name='notif_archivada_usuario_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.tipo} - {self.fecha_creacion:%Y-%m-%d}"
+
+
+class ContadorNotificaciones(models.Model):
+    """
+    Número de notificaciones no leídas de cada usuario, mantenido con
+    actualizaciones atómicas para que el contador del menú sea una lectura por
+    clave primaria. El comando reconciliar_notificaciones corrige desviaciones.
+    """
+    usuario = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='contador_notificaciones'
+    )
+    no_leidas = models.PositiveIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Contador de notificaciones'
+        verbose_name_plural = 'Contadores de notificaciones'
+
+    def __str__(self):
+        return f"{self.usuario_id}: {self.no_leidas} no leídas"
+
+    @classmethod
+    def obtener(cls, usuario_id):
+        no_leidas = cls.objects.filter(usuario_id=usuario_id).values_list('no_leidas', flat=True).first()
+        if no_leidas is None:
+            no_leidas = cls.recalcular(usuario_id)
+        return no_leidas
+
+    @classmethod
+    def incrementar(cls, usuario_id, cantidad=1):
+        """Llamar después de crear las notificaciones (si no hay fila, se siembra contándolas)."""
+        if not cls.objects.filter(usuario_id=usuario_id).update(no_leidas=F('no_leidas') + cantidad):
+            cls.recalcular(usuario_id)
+
+    @classmethod
+    def incrementar_varios(cls, usuarios_ids):
+        """Suma una notificación a cada usuario: un UPDATE para todos y una siembra para los que no tienen fila."""
+        usuarios_ids = list(usuarios_ids)
+        if not usuarios_ids:
+            return
+        cls.objects.filter(usuario_id__in=usuarios_ids).update(no_leidas=F('no_leidas') + 1)
+        existentes = set(cls.objects.filter(usuario_id__in=usuarios_ids).values_list('usuario_id', flat=True))
+        faltantes = [usuario_id for usuario_id in usuarios_ids if usuario_id not in existentes]
+        if faltantes:
+            reales = dict(
+                Notificacion.objects.filter(usuario_id__in=faltantes, leida=False)
+                .values('usuario_id').annotate(total=models.Count('id')).values_list('usuario_id', 'total')
+            )
+            cls.objects.bulk_create(
+                [cls(usuario_id=usuario_id, no_leidas=reales.get(usuario_id, 0)) for usuario_id in faltantes],
+                ignore_conflicts=True
+            )
+
+    @classmethod
+    def decrementar(cls, usuario_id, cantidad=1):
+        actualizadas = cls.objects.filter(usuario_id=usuario_id, no_leidas__gte=cantidad).update(
+            no_leidas=F('no_leidas') - cantidad
+        )
+        if not actualizadas:
+            # Sin fila o con un valor que quedaría negativo: el contador estaba desviado
+            cls.recalcular(usuario_id)
+
+    @classmethod
+    def recalcular(cls, usuario_id):
+        """Fija el contador a partir de la tabla de notificaciones y devuelve el valor."""
+        no_leidas = Notificacion.objects.filter(usuario_id=usuario_id, leida=False).count()
+        try:
+            with transaction.atomic():
+                cls.objects.update_or_create(usuario_id=usuario_id, defaults={'no_leidas': no_leidas})
+        except IntegrityError:
+            # Otra petición creó la fila a la vez
+            cls.objects.filter(usuario_id=usuario_id).update(no_leidas=no_leidas)
+        return no_leidas
+
+
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida: los correos se guardan en la misma transacción que el cambio
+    que los origina y el comando enviar_correos los entrega fuera de la petición.
+    """
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('ENVIANDO', 'Enviando'),
+        ('ENVIADO', 'Enviado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    asunto = models.CharField(max_length=255)
+    cuerpo = models.TextField()
+    remitente = models.CharField(max_length=254)
+    destinatarios = models.JSONField(default=list)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=5)
+    error = models.TextField(null=True, blank=True)
+    disponible_desde = models.DateTimeField(default=timezone.now)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Correo pendiente'
+        verbose_name_plural = 'Correos pendientes'
+        ordering = ['fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='correo_pendiente_cola_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)} ({self.estado})"
+
+
 class Invitacion(models.Model):
     proyecto = models.ForeignKey(Proyecto, on_delete=models.CASCADE, related_name='invitaciones')
     email_destino = models.EmailField()
@@ -166,4 +397,44 @@ class Invitacion(models.Model):
     aceptado = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"Invitación a {self.email_destino} para {self.proyecto.nombre}"
\ No newline at end of file
+        return f"Invitación a {self.email_destino} para {self.proyecto.nombre}"
+
+# ========== INVALIDACIÓN DE LA CACHÉ DE ROLES ==========
+
+@receiver([post_save, post_delete], sender=UsuarioProyecto)
+def invalidar_roles_membresia(sender, instance, **kwargs):
+    from .roles import invalidar_roles
+    invalidar_roles(instance.usuario_id)
+
+
+@receiver(post_save, sender=Proyecto)
+def invalidar_roles_proyecto(sender, instance, created, **kwargs):
+    # El nombre del proyecto forma parte de la instantánea de cada miembro
+    if not created:
+        from .roles import invalidar_roles
+        invalidar_roles(*instance.usuario_proyectos.values_list('usuario_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender='usuarios.Profile')
+def invalidar_roles_perfil(sender, instance, **kwargs):
+    from .roles import invalidar_roles
+    invalidar_roles(instance.user_id)
+
+
+@receiver(post_save, sender='usuarios.Role')
+def invalidar_roles_rol_global(sender, instance, created, **kwargs):
+    if not created:
+        from .roles import invalidar_roles
+        invalidar_roles(*instance.profile_set.values_list('user_id', flat=True))
+
+
+# ========== CONTADOR DE NOTIFICACIONES NO LEÍDAS ==========
+
+@receiver(post_delete, sender=Notificacion)
+def descontar_notificacion_eliminada(sender, instance, **kwargs):
+    # Solo se actualiza una fila existente: al borrar un usuario sus notificaciones
+    # caen en cascada y no debe sembrarse un contador para él
+    if not instance.leida:
+        ContadorNotificaciones.objects.filter(usuario_id=instance.usuario_id, no_leidas__gt=0).update(
+            no_leidas=F('no_leidas') - 1
+        )
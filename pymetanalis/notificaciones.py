@@ -0,0 +1,132 @@
+import datetime
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .eventos import emitir_notificacion
+from .models import ContadorNotificaciones, Notificacion, UsuarioProyecto
+
+
+logger = logging.getLogger(__name__)
+
+# Un evento con la misma clave de agrupación dentro de esta ventana se suma a la
+# notificación no leída existente en lugar de crear otra
+VENTANA_AGRUPACION = datetime.timedelta(hours=1)
+
+
+def notificar_proyecto(proyecto, tipo, titulo, mensaje, url=None, roles=None, excluir=(),
+                       clave_agrupacion=None, cantidad=1, ventana=VENTANA_AGRUPACION):
+    """
+    Notifica a los miembros de un proyecto con una consulta para resolver los
+    destinatarios y un bulk_create para las notificaciones nuevas.
+
+    - roles: limita los destinatarios a esos roles de proyecto (p. ej. ('DUEÑO', 'SUPERVISOR')).
+    - excluir: ids de usuarios que no deben recibirla (normalmente quien causó el evento).
+    - clave_agrupacion: si el destinatario tiene una notificación no leída con la misma
+      clave creada dentro de `ventana`, se le suma `cantidad` en lugar de crear otra.
+      `titulo` y `mensaje` pueden usar {cantidad}, que se rellena con el total acumulado.
+
+    Devuelve el número de destinatarios. Los errores se registran y no se propagan,
+    igual que en crear_notificacion.
+    """
+    try:
+        with transaction.atomic():
+            return _notificar_proyecto(
+                proyecto, tipo, titulo, mensaje, url, roles, excluir,
+                clave_agrupacion, cantidad, ventana
+            )
+    except Exception:
+        logger.exception(f"Error notificando al proyecto {proyecto.id}")
+        return 0
+
+
+def _notificar_proyecto(proyecto, tipo, titulo, mensaje, url, roles, excluir,
+                        clave_agrupacion, cantidad, ventana):
+    miembros = UsuarioProyecto.objects.filter(proyecto=proyecto)
+    if roles:
+        miembros = miembros.filter(rol_proyecto__in=roles)
+    if excluir:
+        miembros = miembros.exclude(usuario_id__in=excluir)
+    destinatarios = list(miembros.values_list('usuario_id', flat=True))
+    if not destinatarios:
+        return 0
+
+    ahora = timezone.now()
+
+    # Notificaciones no leídas que se pueden acumular, la más reciente por usuario
+    acumulables = {}
+    if clave_agrupacion:
+        for notificacion_id, usuario_id, anterior in (
+            Notificacion.objects.filter(
+                usuario_id__in=destinatarios,
+                clave_agrupacion=clave_agrupacion,
+                leida=False,
+                fecha_creacion__gte=ahora - ventana,
+            ).order_by('fecha_creacion').values_list('id', 'usuario_id', 'cantidad')
+        ):
+            acumulables[usuario_id] = (notificacion_id, anterior)
+
+    # Un UPDATE por cada total distinto (normalmente uno solo)
+    por_total = {}
+    for notificacion_id, anterior in acumulables.values():
+        por_total.setdefault(anterior + cantidad, []).append(notificacion_id)
+
+    textos = {}
+    for total, ids in por_total.items():
+        textos[total] = {'titulo': titulo.format(cantidad=total), 'mensaje': mensaje.format(cantidad=total)}
+        Notificacion.objects.filter(id__in=ids).update(
+            cantidad=F('cantidad') + cantidad, fecha_creacion=ahora, url=url, **textos[total]
+        )
+
+    emitidas = [
+        Notificacion(id=notificacion_id, usuario_id=usuario_id, tipo=tipo, url=url,
+                     fecha_creacion=ahora, **textos[anterior + cantidad])
+        for usuario_id, (notificacion_id, anterior) in acumulables.items()
+    ]
+
+    nuevos = [usuario_id for usuario_id in destinatarios if usuario_id not in acumulables]
+    creadas = Notificacion.objects.bulk_create([
+        Notificacion(
+            usuario_id=usuario_id,
+            tipo=tipo,
+            titulo=titulo.format(cantidad=cantidad),
+            mensaje=mensaje.format(cantidad=cantidad),
+            url=url,
+            proyecto=proyecto,
+            clave_agrupacion=clave_agrupacion,
+            cantidad=cantidad,
+        )
+        for usuario_id in nuevos
+    ])
+    ContadorNotificaciones.incrementar_varios(nuevos)
+    emitidas.extend(creadas)
+
+    no_leidas = dict(
+        ContadorNotificaciones.objects.filter(usuario_id__in=destinatarios).values_list('usuario_id', 'no_leidas')
+    )
+    for notificacion in emitidas:
+        emitir_notificacion(notificacion, no_leidas.get(notificacion.usuario_id, 0))
+
+    return len(destinatarios)
+
+
+def notificar_articulos_nuevos(proyecto, cantidad, usuario):
+    """Avisa al resto del equipo de artículos añadidos; las cargas seguidas se acumulan en un solo aviso."""
+    if cantidad <= 0:
+        return 0
+
+    # El título pasa por str.format: las llaves del nombre se escapan
+    nombre = proyecto.nombre.replace('{', '{{').replace('}', '}}')
+    return notificar_proyecto(
+        proyecto,
+        tipo='articulos_nuevos',
+        titulo=f'Artículos nuevos en {nombre}',
+        mensaje='Se han añadido {cantidad} artículos nuevos al proyecto.',
+        url=reverse('articulos:ver_articulos', args=[proyecto.id]),
+        excluir=[usuario.id],
+        clave_agrupacion=f'articulos_nuevos:{proyecto.id}',
+        cantidad=cantidad,
+    )
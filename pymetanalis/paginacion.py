@@ -0,0 +1,69 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no corresponde al orden de la consulta."""
+
+
+def codificar_cursor(valores):
+    """Serializa los valores de orden del último elemento en un token opaco para la URL."""
+    datos = json.dumps(valores, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        raise CursorInvalido('Cursor de paginación inválido')
+
+
+def _filtro_despues_de(modelo, orden, valores):
+    """
+    Condición "estrictamente después de `valores`" para un orden compuesto,
+    p. ej. ('-fecha_carga', '-id') -> fecha < v1 OR (fecha = v1 AND id < v2).
+    """
+    filtro = Q()
+    iguales = {}
+    for campo_orden, valor in zip(orden, valores):
+        nombre = campo_orden.lstrip('-')
+        valor = modelo._meta.get_field(nombre).to_python(valor)
+        comparacion = 'lt' if campo_orden.startswith('-') else 'gt'
+        filtro |= Q(**iguales, **{f'{nombre}__{comparacion}': valor})
+        iguales[nombre] = valor
+    return filtro
+
+
+def paginar_por_cursor(queryset, orden, cursor=None, tamano=50):
+    """
+    Paginación por clave (keyset): en lugar de OFFSET, cada página continúa
+    después de los valores de orden del último elemento de la anterior, por lo
+    que el coste no crece con el número de página.
+
+    `orden` debe terminar en un campo único (normalmente 'id' o '-id').
+    Devuelve (elementos, siguiente_cursor); siguiente_cursor es None en la última página.
+    """
+    queryset = queryset.order_by(*orden)
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if not isinstance(valores, list) or len(valores) != len(orden):
+            raise CursorInvalido('Cursor de paginación inválido')
+        try:
+            queryset = queryset.filter(_filtro_despues_de(queryset.model, orden, valores))
+        except Exception:
+            raise CursorInvalido('Cursor de paginación inválido')
+
+    elementos = list(queryset[:tamano + 1])
+    siguiente = None
+    if len(elementos) > tamano:
+        elementos = elementos[:tamano]
+        ultimo = elementos[-1]
+        siguiente = codificar_cursor([
+            ultimo[campo.lstrip('-')] if isinstance(ultimo, dict) else getattr(ultimo, campo.lstrip('-'))
+            for campo in orden
+        ])
+    return elementos, siguiente
@@ -0,0 +1,127 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.contrib import messages
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
+
+from .roles import obtener_roles
+
+
+ROLES_GESTORES = ('DUEÑO', 'SUPERVISOR')
+
+
+class Permisos:
+    """
+    Permisos del usuario de una petición: rol global y rol en cada proyecto.
+
+    Se apoya en la instantánea de pymetanalis.roles, así que todas las
+    comprobaciones de una petición comparten una única carga (o ninguna si
+    está en caché).
+    """
+
+    def __init__(self, request):
+        self.usuario = request.user
+        self._request = request
+        self._roles = None
+        self._membresias = None
+
+    @property
+    def roles(self):
+        if self._roles is None:
+            self._roles = obtener_roles(self._request)
+        return self._roles
+
+    def membresia(self, proyecto_id):
+        if self._membresias is None:
+            self._membresias = {m.proyecto_id: m for m in self.roles.membresias}
+        return self._membresias.get(int(proyecto_id))
+
+    @property
+    def es_superusuario(self):
+        return self.usuario.is_superuser
+
+    @property
+    def es_admin(self):
+        return self.usuario.is_superuser or self.roles.rol_global == 'administrador'
+
+    @property
+    def puede_crear_proyectos(self):
+        return self.usuario.is_superuser or self.roles.rol_global in ('administrador', 'investigador')
+
+    def rol_en(self, proyecto_id):
+        membresia = self.membresia(proyecto_id)
+        return membresia.rol if membresia else None
+
+    def es_miembro(self, proyecto_id):
+        return self.membresia(proyecto_id) is not None
+
+    def tiene_rol(self, proyecto_id, *roles):
+        return self.rol_en(proyecto_id) in roles
+
+    def puede_ver(self, proyecto_id):
+        return self.es_miembro(proyecto_id) or self.es_admin
+
+    def puede_editar(self, proyecto_id):
+        return self.tiene_rol(proyecto_id, 'DUEÑO') or self.es_superusuario
+
+    def puede_invitar(self, proyecto_id):
+        membresia = self.membresia(proyecto_id)
+        return bool(membresia and membresia.puede_invitar) or self.es_admin
+
+    def puede_gestionar_miembros(self, proyecto_id):
+        return self.tiene_rol(proyecto_id, *ROLES_GESTORES) or self.es_superusuario
+
+
+def obtener_permisos(request):
+    permisos = getattr(request, 'permisos', None)
+    if permisos is None:
+        permisos = request.permisos = Permisos(request)
+    return permisos
+
+
+class PermisosMiddleware:
+    """Añade request.permisos; los roles se cargan solo si una vista los consulta."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.permisos = SimpleLazyObject(lambda: Permisos(request))
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        return self.get_response(request)
+
+    async def _acall(self, request):
+        return await self.get_response(request)
+
+
+def requiere_permiso_proyecto(comprobacion, mensaje, redireccion='detalle_proyecto'):
+    """
+    Decorador para vistas con parámetro proyecto_id.
+
+    `comprobacion` es el nombre de un método de Permisos (p. ej. 'puede_editar').
+    Si falla, las peticiones AJAX reciben un 403 en JSON y el resto un mensaje
+    de error y una redirección.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, proyecto_id, *args, **kwargs):
+            if getattr(obtener_permisos(request), comprobacion)(proyecto_id):
+                return vista(request, proyecto_id, *args, **kwargs)
+
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({'success': False, 'message': mensaje}, status=403)
+
+            messages.error(request, mensaje)
+            if redireccion == 'detalle_proyecto':
+                return redirect(redireccion, proyecto_id=proyecto_id)
+            return redirect(redireccion)
+        return envoltura
+    return decorador
@@ -0,0 +1,89 @@
+import datetime
+import time
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Notificacion, NotificacionArchivada
+
+
+CAMPOS_ARCHIVADOS = (
+    'id', 'usuario_id', 'proyecto_id', 'tipo', 'titulo', 'mensaje', 'url',
+    'cantidad', 'fecha_creacion', 'fecha_lectura',
+)
+
+TAMANO_LOTE = 1000
+
+
+def _mover(filtro, archivar):
+    """
+    Archiva (si corresponde) y borra un lote de notificaciones leídas en una
+    transacción corta. Se borran con _raw_delete: un DELETE por lote sin cargar
+    las filas ni emitir post_delete, que solo ajusta el contador de no leídas
+    (ninguna de estas lo está) y nada depende de Notificacion en cascada.
+    """
+    with transaction.atomic():
+        filas = list(Notificacion.objects.filter(leida=True, **filtro).values(*CAMPOS_ARCHIVADOS))
+        if not filas:
+            return 0
+        if archivar:
+            NotificacionArchivada.objects.bulk_create([
+                NotificacionArchivada(**{campo: fila[campo] for campo in CAMPOS_ARCHIVADOS if campo != 'id'})
+                for fila in filas
+            ])
+        lote = Notificacion.objects.filter(id__in=[fila['id'] for fila in filas])
+        lote._raw_delete(lote.db)
+    return len(filas)
+
+
+def depurar_antiguas(dias, archivar=True, lote=TAMANO_LOTE, pausa=0):
+    """
+    Saca de la tabla las notificaciones leídas con más de `dias` días.
+
+    Cada lote toma las `lote` más antiguas con el índice (leida, fecha_creacion),
+    así nunca recorre la tabla y bloquea como mucho `lote` filas; `pausa`
+    (segundos) deja respirar a la base de datos entre lotes. No se recorre por
+    rangos de id porque la agrupación renueva fecha_creacion: el orden de los
+    ids no sigue al de las fechas. Las no leídas nunca se tocan.
+    Genera el número de notificaciones movidas en cada lote.
+    """
+    limite = timezone.now() - datetime.timedelta(days=dias)
+    antiguas = Notificacion.objects.filter(leida=True, fecha_creacion__lt=limite).order_by('fecha_creacion')
+
+    while True:
+        ids = list(antiguas.values_list('id', flat=True)[:lote])
+        if not ids:
+            break
+        yield _mover(dict(id__in=ids), archivar)
+        if pausa:
+            time.sleep(pausa)
+
+
+def aplicar_maximo(maximo, archivar=True, lote=TAMANO_LOTE, pausa=0):
+    """
+    Deja a cada usuario con como mucho `maximo` notificaciones, quitando primero
+    las leídas más antiguas. Las no leídas se conservan aunque superen el máximo.
+    Genera (usuario_id, movidas) por cada lote.
+    """
+    excedidos = (
+        Notificacion.objects.values('usuario_id')
+        .annotate(total=Count('id'))
+        .filter(total__gt=maximo)
+        .values_list('usuario_id', 'total')
+    )
+    for usuario_id, total in list(excedidos):
+        sobrantes = total - maximo
+        while sobrantes > 0:
+            ids = list(
+                Notificacion.objects.filter(usuario_id=usuario_id, leida=True)
+                .order_by('fecha_creacion', 'id')
+                .values_list('id', flat=True)[:min(lote, sobrantes)]
+            )
+            if not ids:
+                break
+            movidas = _mover(dict(id__in=ids), archivar)
+            sobrantes -= len(ids)
+            yield usuario_id, movidas
+            if pausa:
+                time.sleep(pausa)
@@ -0,0 +1,109 @@
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from usuarios.models import Profile
+
+from .models import UsuarioProyecto
+
+
+# Tiempo máximo que una instantánea de roles permanece en caché. No hay CACHES
+# configurado: la caché es LocMemCache, propia de cada proceso, y la invalidación
+# solo llega al proceso que hizo el cambio. Con una duración corta, los demás
+# workers dejan de usar un rol revocado en pocos segundos y la caché sigue
+# ahorrando las consultas de las peticiones seguidas de un mismo usuario.
+DURACION_CACHE_ROLES = 5
+
+# Roles globales que pueden crear proyectos
+ROLES_CREADORES = ('administrador', 'investigador')
+
+MembresiaProyecto = namedtuple('MembresiaProyecto', ['proyecto_id', 'proyecto_nombre', 'rol', 'puede_invitar'])
+
+
+class RolesUsuario:
+    """Instantánea de los roles de un usuario: rol global y membresías en proyectos."""
+
+    def __init__(self, membresias, rol_global, es_superusuario):
+        self.membresias = membresias
+        self.rol_global = rol_global
+        self.es_superusuario = es_superusuario
+
+    def proyectos_con_rol(self, rol):
+        return [membresia for membresia in self.membresias if membresia.rol == rol]
+
+    def rol_en(self, proyecto_id):
+        for membresia in self.membresias:
+            if membresia.proyecto_id == proyecto_id:
+                return membresia.rol
+        return None
+
+    @property
+    def puede_crear_proyectos(self):
+        # Requiere un rol global asignado, también para los superusuarios
+        return bool(self.rol_global) and (self.es_superusuario or self.rol_global in ROLES_CREADORES)
+
+
+def _clave_version(usuario_id):
+    return f'roles_usuario:{usuario_id}:version'
+
+
+def _clave_roles(usuario_id, version):
+    return f'roles_usuario:{usuario_id}:v{version}'
+
+
+def _cargar_roles(usuario):
+    membresias = [
+        MembresiaProyecto(*fila)
+        for fila in UsuarioProyecto.objects.filter(usuario=usuario).order_by('proyecto_id').values_list(
+            'proyecto_id', 'proyecto__nombre', 'rol_proyecto', 'puede_invitar'
+        )
+    ]
+    rol_global = Profile.objects.filter(user=usuario).values_list('role__name', flat=True).first()
+    return RolesUsuario(membresias, rol_global, usuario.is_superuser)
+
+
+def obtener_roles(request):
+    """
+    Devuelve los roles del usuario de la petición.
+
+    Se calculan una vez por petición y se guardan en la caché bajo una clave
+    versionada; cualquier cambio de membresía o de rol incrementa la versión.
+    """
+    if hasattr(request, '_roles_usuario'):
+        return request._roles_usuario
+
+    usuario = request.user
+    if not usuario.is_authenticated:
+        request._roles_usuario = RolesUsuario([], None, False)
+        return request._roles_usuario
+
+    version = cache.get_or_set(_clave_version(usuario.id), 1, None)
+    clave = _clave_roles(usuario.id, version)
+    roles = cache.get(clave)
+    if roles is None:
+        roles = _cargar_roles(usuario)
+        cache.set(clave, roles, DURACION_CACHE_ROLES)
+
+    request._roles_usuario = roles
+    return roles
+
+
+def invalidar_roles(*usuarios_ids):
+    """
+    Invalida la instantánea de roles de los usuarios indicados.
+
+    La versión cambia al confirmar la transacción: si cambiara antes, una
+    petición concurrente podría volver a guardar los roles viejos (aún visibles
+    en la base de datos) bajo la versión nueva.
+    """
+    claves = [_clave_version(usuario_id) for usuario_id in usuarios_ids]
+
+    def invalidar():
+        # Una versión única invalida aunque la anterior se haya expulsado de la caché
+        version = time.time_ns()
+        cache.set_many({clave: version for clave in claves}, None)
+
+    if claves:
+        transaction.on_commit(invalidar)
@@ -62,6 +62,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'pymetanalis.permisos.PermisosMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -134,6 +135,24 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Subida de archivos: el primer handler calcula el SHA-256 mientras se recibe el archivo
+FILE_UPLOAD_HANDLERS = [
+    'articulos.subidas.HashContenidoUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Difusión de notificaciones en tiempo real (SSE) entre procesos:
+# None reparte solo dentro de cada proceso; 'postgres' usa LISTEN/NOTIFY
+NOTIFICACIONES_BACKPLANE = None
+
+# Retención de notificaciones (comando depurar_notificaciones): las leídas con más
+# de N días se archivan y cada usuario conserva como máximo N notificaciones
+NOTIFICACIONES_RETENCION_DIAS = 90
+NOTIFICACIONES_MAXIMO_POR_USUARIO = 500
+# False: se eliminan en lugar de copiarse a NotificacionArchivada
+NOTIFICACIONES_ARCHIVAR = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,698 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from usuarios.models import Profile, Role
+
+from .correos import ESPERA_REINTENTO, encolar_correo, enviar_correos, reclamar_correos
+from .eventos import difusor
+from .estadisticas import reconstruir_historial, registrar_instantanea
+from .invitaciones import MAXIMO_INVITACIONES_POR_LOTE, dominio_permitido, extraer_correos
+from .models import (
+    ContadorNotificaciones, CorreoPendiente, EstadisticaProyecto, Invitacion, Notificacion, NotificacionArchivada,
+    Proyecto, UsuarioProyecto,
+)
+from .notificaciones import VENTANA_AGRUPACION, notificar_articulos_nuevos, notificar_proyecto
+from .permisos import Permisos
+from .retencion import aplicar_maximo, depurar_antiguas
+from .roles import obtener_roles
+from .views import crear_notificacion
+
+
+class MisProyectosConsultasTests(TestCase):
+    """El listado de proyectos no debe hacer consultas por proyecto."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('miembro', 'miembro@gmail.com', 'clave')
+        self.client.force_login(self.usuario)
+        self.url = reverse('mis_proyectos')
+
+    def _crear_proyectos(self, cantidad):
+        for _ in range(cantidad):
+            indice = Proyecto.objects.count()
+            proyecto = Proyecto.objects.create(nombre=f'Proyecto {indice}', usuario_creador=self.usuario)
+            UsuarioProyecto.objects.create(
+                usuario=self.usuario,
+                proyecto=proyecto,
+                rol_proyecto='DUEÑO' if indice % 2 else 'COLABORADOR',
+                puede_invitar=bool(indice % 2),
+            )
+
+    def _get(self):
+        # Sin la instantánea de roles en caché, ambas mediciones parten del mismo estado
+        cache.clear()
+        return self.client.get(self.url)
+
+    def test_consultas_constantes_con_mas_proyectos(self):
+        self._crear_proyectos(3)
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self._get()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.context['page_obj'].object_list), 3)
+
+        self._crear_proyectos(27)
+        with self.assertNumQueries(len(consultas)):
+            respuesta = self._get()
+        self.assertEqual(respuesta.context['page_obj'].paginator.count, 30)
+        self.assertEqual(len(respuesta.context['page_obj'].object_list), 9)
+
+
+class BuscarProyectosTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('buscador', 'buscador@gmail.com', 'clave')
+        self.otro = User.objects.create_user('creador', 'creador@gmail.com', 'clave')
+        self.proyectos = [
+            Proyecto.objects.create(nombre=f'Proyecto {indice}', usuario_creador=self.otro)
+            for indice in range(15)
+        ]
+        for proyecto in self.proyectos:
+            UsuarioProyecto.objects.create(usuario=self.otro, proyecto=proyecto, rol_proyecto='DUEÑO')
+        UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=self.proyectos[-1], rol_proyecto='COLABORADOR')
+        Proyecto.objects.filter(id=self.proyectos[0].id).update(estado='ARCHIVADO')
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.url = reverse('buscar_proyectos')
+
+    def _ajax(self, **parametros):
+        return self.client.get(self.url, parametros, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_paginas_por_cursor_con_participacion_y_miembros(self):
+        primera = self._ajax().json()
+        self.assertEqual(len(primera['proyectos']), 12)
+        reciente = primera['proyectos'][0]
+        self.assertEqual(reciente['id'], self.proyectos[-1].id)
+        self.assertTrue(reciente['ya_participo'])
+        self.assertEqual(reciente['num_miembros'], 2)
+        self.assertFalse(primera['proyectos'][1]['ya_participo'])
+        self.assertEqual(primera['proyectos'][1]['num_miembros'], 1)
+
+        segunda = self._ajax(cursor=primera['siguiente_cursor']).json()
+        self.assertIsNone(segunda['siguiente_cursor'])
+        ids = [proyecto['id'] for proyecto in primera['proyectos'] + segunda['proyectos']]
+        # Sin el proyecto archivado y sin repetidos
+        self.assertEqual(ids, [proyecto.id for proyecto in reversed(self.proyectos[1:])])
+
+    def test_cursor_no_valido(self):
+        self.assertEqual(self._ajax(cursor='basura').status_code, 400)
+
+    def test_pagina_html_no_depende_del_numero_de_proyectos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.context['page_obj'].paginator.count, 14)
+
+        for indice in range(10):
+            Proyecto.objects.create(nombre=f'Extra {indice}', usuario_creador=self.otro)
+        cache.clear()
+        with self.assertNumQueries(len(consultas)):
+            respuesta = self.client.get(self.url, {'page': 2})
+        self.assertEqual(respuesta.context['page_obj'].paginator.count, 24)
+        self.assertEqual(len(respuesta.context['page_obj'].object_list), 12)
+
+    def test_busqueda_filtra_en_la_base_de_datos(self):
+        proyectos = self._ajax(q='Proyecto 1').json()['proyectos']
+
+        self.assertEqual(
+            {proyecto['nombre'] for proyecto in proyectos},
+            {'Proyecto 1', 'Proyecto 10', 'Proyecto 11', 'Proyecto 12', 'Proyecto 13', 'Proyecto 14'},
+        )
+
+
+class BandejaSalidaTests(TestCase):
+
+    def _encolar(self, cantidad):
+        return [encolar_correo(f'Asunto {i}', 'Cuerpo', [f'destino{i}@gmail.com']) for i in range(cantidad)]
+
+    def test_reclamar_no_repite_correos(self):
+        self._encolar(3)
+
+        self.assertEqual(len(reclamar_correos(10)), 3)
+        self.assertEqual(reclamar_correos(10), [])
+        self.assertEqual(CorreoPendiente.objects.filter(estado='ENVIANDO', intentos=1).count(), 3)
+
+    def test_envio_marca_cada_correo_al_enviarlo(self):
+        self._encolar(2)
+        correos = reclamar_correos(10)
+        estados = []
+        envio_original = EmailBackend.send_messages
+
+        def enviar(backend, mensajes):
+            estados.append(list(CorreoPendiente.objects.order_by('id').values_list('estado', flat=True)))
+            return envio_original(backend, mensajes)
+
+        with mock.patch.object(EmailBackend, 'send_messages', enviar):
+            self.assertEqual(enviar_correos(correos), (2, 0))
+
+        # Al enviar el segundo, el primero ya figura como ENVIADO
+        self.assertEqual(estados[1], ['ENVIADO', 'ENVIANDO'])
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(CorreoPendiente.objects.exclude(estado='ENVIADO').exists())
+
+    def test_fallo_reprograma_con_espera_exponencial(self):
+        correo, = self._encolar(1)
+        CorreoPendiente.objects.filter(id=correo.id).update(intentos=2)
+        correos = reclamar_correos(10)
+
+        antes = timezone.now()
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=OSError('smtp')):
+            self.assertEqual(enviar_correos(correos), (0, 1))
+
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, 'PENDIENTE')
+        self.assertEqual(correo.intentos, 3)
+        self.assertGreaterEqual(correo.disponible_desde, antes + ESPERA_REINTENTO * 4)
+        self.assertLess(correo.disponible_desde, antes + ESPERA_REINTENTO * 4 + datetime.timedelta(seconds=5))
+        self.assertEqual(reclamar_correos(10), [])
+
+    def test_agotar_intentos_descarta_el_correo(self):
+        correo, = self._encolar(1)
+        CorreoPendiente.objects.filter(id=correo.id).update(intentos=correo.max_intentos - 1)
+
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=OSError('smtp')):
+            enviar_correos(reclamar_correos(10))
+
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, 'FALLIDO')
+
+
+class EventosNotificacionesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('oyente', 'oyente@gmail.com', 'clave')
+        self.url = reverse('eventos_notificaciones')
+
+    def test_wsgi_responde_204_para_volver_al_polling(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+
+    async def test_flujo_sse_envia_contador_y_eventos_publicados(self):
+        await self.async_client.aforce_login(self.usuario)
+        respuesta = await self.async_client.get(self.url)
+        self.assertEqual(respuesta['Content-Type'], 'text/event-stream')
+
+        # Se consume igual que ASGIHandler.send_response
+        flujo = aiter(respuesta)
+        try:
+            self.assertEqual(await anext(flujo), b'retry: 5000\n')
+            self.assertEqual(await anext(flujo), b'event: contador\ndata: {"no_leidas": 0}\n\n')
+            self.assertEqual(difusor.conexiones, 1)
+
+            difusor.publicar(self.usuario.id, {'tipo': 'contador', 'datos': {'no_leidas': 3}})
+            self.assertEqual(await anext(flujo), b'event: contador\ndata: {"no_leidas": 3}\n\n')
+        finally:
+            await flujo.aclose()
+
+
+class PermisosProyectoTests(TestCase):
+    """Las vistas de gestión de miembros comprueban el rol con requiere_permiso_proyecto."""
+
+    def setUp(self):
+        self.dueno = User.objects.create_user('dueno', 'dueno@gmail.com', 'clave')
+        self.colaborador = User.objects.create_user('colaborador', 'colaborador@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto compartido', usuario_creador=self.dueno)
+        UsuarioProyecto.objects.create(usuario=self.dueno, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+        UsuarioProyecto.objects.create(usuario=self.colaborador, proyecto=self.proyecto, rol_proyecto='COLABORADOR')
+        self.url = reverse('eliminar_miembro', args=[self.proyecto.id, self.dueno.id])
+
+    def test_colaborador_recibe_403(self):
+        self.client.force_login(self.colaborador)
+        respuesta = self.client.post(self.url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertFalse(respuesta.json()['success'])
+        self.assertTrue(UsuarioProyecto.objects.filter(usuario=self.dueno, proyecto=self.proyecto).exists())
+
+    def test_busqueda_de_invitados_requiere_poder_invitar(self):
+        self.client.force_login(self.colaborador)
+        url = reverse('buscar_usuarios_disponibles', args=[self.proyecto.id])
+
+        respuesta = self.client.get(url, {'q': 'due'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(respuesta.status_code, 403)
+
+    def _permisos(self, usuario):
+        cache.clear()
+        peticion = RequestFactory().get('/')
+        peticion.user = usuario
+        return Permisos(peticion)
+
+    def test_comprobaciones_por_rol(self):
+        supervisor = User.objects.create_user('supervisor', 'supervisor@gmail.com', 'clave')
+        UsuarioProyecto.objects.create(
+            usuario=supervisor, proyecto=self.proyecto, rol_proyecto='SUPERVISOR', puede_invitar=True
+        )
+        administrador = User.objects.create_user('administrador', 'administrador@gmail.com', 'clave')
+        Profile.objects.filter(user=administrador).update(role=Role.objects.get_or_create(name='administrador')[0])
+        ajeno = User.objects.create_user('ajeno', 'ajeno@gmail.com', 'clave')
+
+        casos = {
+            self.dueno: (True, True, False, True),
+            supervisor: (True, False, True, True),
+            self.colaborador: (True, False, False, False),
+            administrador: (True, False, True, False),
+            ajeno: (False, False, False, False),
+        }
+        for usuario, esperado in casos.items():
+            permisos = self._permisos(usuario)
+            obtenido = (
+                permisos.puede_ver(self.proyecto.id),
+                permisos.puede_editar(self.proyecto.id),
+                permisos.puede_invitar(str(self.proyecto.id)),
+                permisos.puede_gestionar_miembros(self.proyecto.id),
+            )
+            self.assertEqual(obtenido, esperado, usuario.username)
+
+    def test_todas_las_comprobaciones_comparten_una_carga(self):
+        permisos = self._permisos(self.dueno)
+
+        # Una consulta para las membresías y otra para el rol global
+        with self.assertNumQueries(2):
+            for _ in range(5):
+                permisos.es_admin
+                permisos.puede_editar(self.proyecto.id)
+                permisos.puede_invitar(self.proyecto.id)
+                permisos.es_miembro(self.proyecto.id + 1)
+
+
+class CacheRolesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('investigador', 'investigador@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto inicial', usuario_creador=self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+
+    def _roles(self):
+        peticion = RequestFactory().get('/')
+        peticion.user = self.usuario
+        return obtener_roles(peticion)
+
+    def test_una_carga_por_peticion_y_cache_entre_peticiones(self):
+        peticion = RequestFactory().get('/')
+        peticion.user = self.usuario
+        with self.assertNumQueries(2):
+            roles = obtener_roles(peticion)
+            self.assertIs(obtener_roles(peticion), roles)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._roles().rol_en(self.proyecto.id), 'DUEÑO')
+
+    def test_cambio_de_membresia_invalida_al_confirmar(self):
+        self._roles()
+        otro = Proyecto.objects.create(nombre='Proyecto nuevo', usuario_creador=self.usuario)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=otro, rol_proyecto='COLABORADOR')
+            # Hasta confirmar, la versión vieja sigue vigente
+            self.assertIsNone(self._roles().rol_en(otro.id))
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self._roles().rol_en(otro.id), 'COLABORADOR')
+
+    def test_renombrar_proyecto_y_cambiar_rol_global_invalidan(self):
+        self.assertEqual(self._roles().rol_global, 'invitado')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.proyecto.nombre = 'Proyecto renombrado'
+            self.proyecto.save()
+            perfil = self.usuario.profile
+            perfil.role = Role.objects.get_or_create(name='investigador')[0]
+            perfil.save()
+
+        roles = self._roles()
+        self.assertEqual(roles.membresias[0].proyecto_nombre, 'Proyecto renombrado')
+        self.assertEqual(roles.rol_global, 'investigador')
+        self.assertTrue(roles.puede_crear_proyectos)
+
+    def test_eliminar_membresia_invalida(self):
+        self._roles()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UsuarioProyecto.objects.filter(usuario=self.usuario).get().delete()
+
+        self.assertEqual(self._roles().membresias, [])
+
+
+class ContadorNotificacionesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('avisado', 'avisado@gmail.com', 'clave')
+        self.client.force_login(self.usuario)
+
+    def _crear(self, cantidad):
+        for indice in range(cantidad):
+            crear_notificacion(self.usuario, 'general', f'Aviso {indice}', 'Mensaje')
+        return list(Notificacion.objects.filter(usuario=self.usuario).order_by('id'))
+
+    def _contar(self):
+        respuesta = self.client.get(reverse('contar_notificaciones'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        return respuesta.json()['no_leidas']
+
+    def test_crear_y_leer_ajustan_el_contador(self):
+        notificaciones = self._crear(3)
+        self.assertEqual(ContadorNotificaciones.objects.get(usuario=self.usuario).no_leidas, 3)
+
+        url = reverse('marcar_notificacion_leida', args=[notificaciones[0].id])
+        self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        # Marcarla otra vez no descuenta dos veces
+        self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(self._contar(), 2)
+
+        notificaciones[1].delete()
+        self.assertEqual(self._contar(), 1)
+
+        self.client.post(reverse('marcar_todas_notificaciones_leidas'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(self._contar(), 0)
+
+    def test_contar_es_una_lectura_por_clave(self):
+        self._crear(5)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(ContadorNotificaciones.obtener(self.usuario.id), 5)
+
+    def test_sin_fila_se_siembra_contando(self):
+        self._crear(2)
+        ContadorNotificaciones.objects.all().delete()
+
+        ContadorNotificaciones.incrementar_varios([self.usuario.id])
+        self.assertEqual(ContadorNotificaciones.obtener(self.usuario.id), 2)
+
+        ContadorNotificaciones.objects.all().delete()
+        self.assertEqual(self._contar(), 2)
+
+    def test_decremento_desviado_recalcula(self):
+        self._crear(2)
+        ContadorNotificaciones.objects.filter(usuario=self.usuario).update(no_leidas=0)
+
+        ContadorNotificaciones.decrementar(self.usuario.id)
+
+        self.assertEqual(ContadorNotificaciones.obtener(self.usuario.id), 2)
+
+    def test_reconciliar_corrige_desviaciones(self):
+        self._crear(4)
+        ContadorNotificaciones.objects.filter(usuario=self.usuario).update(no_leidas=9)
+
+        call_command('reconciliar_notificaciones', lote=1, stdout=StringIO())
+
+        self.assertEqual(ContadorNotificaciones.obtener(self.usuario.id), 4)
+
+
+class NotificarProyectoTests(TestCase):
+
+    def setUp(self):
+        self.dueno = User.objects.create_user('jefa', 'jefa@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto {raro}', usuario_creador=self.dueno)
+        UsuarioProyecto.objects.create(usuario=self.dueno, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+        self.miembros = [self._miembro(indice) for indice in range(3)]
+
+    def _miembro(self, indice):
+        usuario = User.objects.create_user(f'miembro{indice}', f'miembro{indice}@gmail.com', 'clave')
+        UsuarioProyecto.objects.create(usuario=usuario, proyecto=self.proyecto, rol_proyecto='COLABORADOR')
+        return usuario
+
+    def test_consultas_constantes_con_mas_miembros(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(notificar_proyecto(self.proyecto, 'general', 'Aviso', 'Mensaje'), 4)
+
+        for indice in range(3, 10):
+            self._miembro(indice)
+        with self.assertNumQueries(len(consultas)):
+            self.assertEqual(notificar_proyecto(self.proyecto, 'general', 'Aviso', 'Mensaje'), 11)
+
+        self.assertEqual(ContadorNotificaciones.obtener(self.miembros[0].id), 2)
+
+    def test_roles_y_excluidos(self):
+        enviados = notificar_proyecto(
+            self.proyecto, 'general', 'Aviso', 'Mensaje', roles=('COLABORADOR',), excluir=[self.miembros[0].id]
+        )
+
+        self.assertEqual(enviados, 2)
+        self.assertEqual(
+            set(Notificacion.objects.values_list('usuario_id', flat=True)),
+            {self.miembros[1].id, self.miembros[2].id},
+        )
+
+    def test_cargas_seguidas_se_acumulan(self):
+        notificar_articulos_nuevos(self.proyecto, 3, self.dueno)
+        notificar_articulos_nuevos(self.proyecto, 4, self.dueno)
+
+        notificacion = Notificacion.objects.get(usuario=self.miembros[0])
+        self.assertEqual(notificacion.cantidad, 7)
+        self.assertEqual(notificacion.titulo, 'Artículos nuevos en Proyecto {raro}')
+        self.assertEqual(notificacion.mensaje, 'Se han añadido 7 artículos nuevos al proyecto.')
+        self.assertEqual(ContadorNotificaciones.obtener(self.miembros[0].id), 1)
+        self.assertFalse(Notificacion.objects.filter(usuario=self.dueno).exists())
+
+    def test_leida_o_fuera_de_la_ventana_crea_otra(self):
+        notificar_articulos_nuevos(self.proyecto, 1, self.dueno)
+        Notificacion.objects.get(usuario=self.miembros[0]).marcar_como_leida()
+        Notificacion.objects.filter(usuario=self.miembros[1]).update(
+            fecha_creacion=timezone.now() - VENTANA_AGRUPACION - datetime.timedelta(minutes=1)
+        )
+
+        notificar_articulos_nuevos(self.proyecto, 2, self.dueno)
+
+        for miembro in self.miembros[:2]:
+            self.assertEqual(
+                list(Notificacion.objects.filter(usuario=miembro).order_by('id').values_list('cantidad', flat=True)),
+                [1, 2],
+            )
+        self.assertEqual(Notificacion.objects.get(usuario=self.miembros[2]).cantidad, 3)
+        self.assertEqual(ContadorNotificaciones.obtener(self.miembros[0].id), 1)
+        self.assertEqual(ContadorNotificaciones.obtener(self.miembros[1].id), 2)
+
+    def test_error_no_se_propaga(self):
+        with mock.patch('pymetanalis.notificaciones.Notificacion.objects.bulk_create', side_effect=RuntimeError):
+            with self.assertLogs('pymetanalis.notificaciones', 'ERROR'):
+                self.assertEqual(notificar_proyecto(self.proyecto, 'general', 'Aviso', 'Mensaje'), 0)
+
+        self.assertFalse(Notificacion.objects.exists())
+
+
+class InvitacionMasivaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.dueno = User.objects.create_user('anfitrion', 'anfitrion@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto abierto', usuario_creador=self.dueno)
+        UsuarioProyecto.objects.create(
+            usuario=self.dueno, proyecto=self.proyecto, rol_proyecto='DUEÑO', puede_invitar=True
+        )
+        self.client.force_login(self.dueno)
+        self.url = reverse('invitar_usuario', args=[self.proyecto.id])
+
+    def _invitar(self, correos='', archivo=None):
+        datos = {'metodo': 'masivo', 'correos': correos}
+        if archivo is not None:
+            datos['archivo_csv'] = archivo
+        respuesta = self.client.post(self.url, datos)
+        return {resultado['email']: resultado['estado'] for resultado in respuesta.context['resultados_masivos']}
+
+    def test_dominio_completo(self):
+        self.assertTrue(dominio_permitido('Ana@GMAIL.com'))
+        self.assertTrue(dominio_permitido('ana@unemi.edu.ec'))
+        self.assertFalse(dominio_permitido('ana@gmail.com.mx'))
+        self.assertFalse(dominio_permitido('gmail.com@otro.org'))
+
+    def test_extraer_correos_de_texto_y_csv(self):
+        archivo = SimpleUploadedFile('correos.csv', 'nombre,correo\nAna,ana@gmail.com\nLuis,<Luis@gmail.com>\n'.encode())
+
+        self.assertEqual(
+            extraer_correos('ana@gmail.com; pedro@gmail.com\nANA@gmail.com', archivo),
+            ['ana@gmail.com', 'pedro@gmail.com', 'luis@gmail.com'],
+        )
+
+    def test_cada_direccion_recibe_su_estado(self):
+        miembro = User.objects.create_user('socio', 'Socio@gmail.com', 'clave')
+        UsuarioProyecto.objects.create(usuario=miembro, proyecto=self.proyecto, rol_proyecto='COLABORADOR')
+        User.objects.create_user('cuenta', 'cuenta@unemi.edu.ec', 'clave')
+        Invitacion.objects.create(
+            proyecto=self.proyecto, email_destino='Pendiente@gmail.com', token='t' * 32, creado_por=self.dueno
+        )
+
+        estados = self._invitar(
+            'nueva@gmail.com, cuenta@unemi.edu.ec, socio@gmail.com, pendiente@gmail.com, '
+            'ajena@hotmail.com, falsa@gmail.com.mx, no-es-correo@'
+        )
+
+        self.assertEqual(estados, {
+            'nueva@gmail.com': 'creada',
+            'cuenta@unemi.edu.ec': 'creada',
+            'socio@gmail.com': 'miembro',
+            'pendiente@gmail.com': 'reenviada',
+            'ajena@hotmail.com': 'dominio',
+            'falsa@gmail.com.mx': 'dominio',
+            'no-es-correo@': 'invalida',
+        })
+        self.assertEqual(Invitacion.objects.filter(proyecto=self.proyecto).count(), 3)
+        self.assertEqual(
+            sorted(destino for correo in CorreoPendiente.objects.all() for destino in correo.destinatarios),
+            ['Pendiente@gmail.com', 'cuenta@unemi.edu.ec', 'nueva@gmail.com'],
+        )
+
+    def test_consultas_constantes_con_mas_direcciones(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self._invitar(' '.join(f'invitado{i}@gmail.com' for i in range(3)))
+
+        cache.clear()
+        with self.assertNumQueries(len(consultas)):
+            self._invitar(' '.join(f'otro{i}@gmail.com' for i in range(40)))
+
+        self.assertEqual(Invitacion.objects.count(), 43)
+        self.assertEqual(CorreoPendiente.objects.count(), 43)
+
+    def test_limite_por_lote(self):
+        correos = ' '.join(f'invitado{i}@gmail.com' for i in range(MAXIMO_INVITACIONES_POR_LOTE + 1))
+        respuesta = self.client.post(self.url, {'metodo': 'masivo', 'correos': correos})
+
+        self.assertNotIn('resultados_masivos', respuesta.context)
+        self.assertFalse(Invitacion.objects.exists())
+
+
+class RetencionNotificacionesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('lector', 'lector@gmail.com', 'clave')
+
+    def _notificacion(self, dias, leida):
+        notificacion = Notificacion.objects.create(
+            usuario=self.usuario, tipo='general', titulo='Aviso', mensaje='Mensaje', leida=leida
+        )
+        Notificacion.objects.filter(id=notificacion.id).update(
+            fecha_creacion=timezone.now() - datetime.timedelta(days=dias)
+        )
+        return notificacion
+
+    def test_depura_leidas_antiguas_por_lotes(self):
+        antiguas = [self._notificacion(100, leida=True) for _ in range(5)]
+        no_leida = self._notificacion(100, leida=False)
+        # Una agrupación renovó la fecha de la primera: su id es viejo pero no debe depurarse
+        Notificacion.objects.filter(id=antiguas[0].id).update(fecha_creacion=timezone.now())
+        ContadorNotificaciones.recalcular(self.usuario.id)
+
+        self.assertEqual(list(depurar_antiguas(90, lote=2)), [2, 2])
+
+        self.assertEqual(
+            set(Notificacion.objects.values_list('id', flat=True)), {antiguas[0].id, no_leida.id}
+        )
+        self.assertEqual(NotificacionArchivada.objects.count(), 4)
+        self.assertEqual(ContadorNotificaciones.obtener(self.usuario.id), 1)
+
+    def test_maximo_conserva_no_leidas(self):
+        for dias in range(6):
+            self._notificacion(dias, leida=dias % 2 == 0)
+        ContadorNotificaciones.recalcular(self.usuario.id)
+
+        movidas = sum(cantidad for _, cantidad in aplicar_maximo(2, archivar=False))
+
+        self.assertEqual(movidas, 3)
+        self.assertEqual(list(Notificacion.objects.values_list('leida', flat=True)), [False] * 3)
+        self.assertFalse(NotificacionArchivada.objects.exists())
+        self.assertEqual(ContadorNotificaciones.obtener(self.usuario.id), 3)
+
+
+class ReconstruirHistorialTests(TestCase):
+
+    def setUp(self):
+        from articulos.models import Articulo, HistorialArticulo
+
+        self.usuario = User.objects.create_user('analista', 'analista@gmail.com', 'clave')
+        self.proyectos = [
+            Proyecto.objects.create(nombre=f'Proyecto {indice}', usuario_creador=self.usuario)
+            for indice in range(2)
+        ]
+        self.hoy = timezone.localdate()
+        for indice in range(6):
+            articulo = Articulo.objects.create(
+                proyecto=self.proyectos[indice % 2], usuario_carga=self.usuario,
+                bibtex_key=f'historia{indice}', titulo=f'Artículo {indice}', bibtex_original='@article{}'
+            )
+            alta = HistorialArticulo.objects.create(articulo=articulo, usuario=self.usuario, tipo_cambio='CREACION')
+            HistorialArticulo.objects.filter(id=alta.id).update(
+                fecha=timezone.now() - datetime.timedelta(days=10 - indice)
+            )
+            if indice % 3 == 0:
+                articulo.cambiar_estado('APROBADO', self.usuario)
+        articulo.cambiar_estado('EN_REVISION', self.usuario)
+
+    def test_totales_coinciden_con_los_contadores(self):
+        with mock.patch('pymetanalis.estadisticas.TAMANO_LOTE', 3):
+            filas = reconstruir_historial(hasta=self.hoy)
+
+        # Un proyecto desde hace 10 días y el otro desde hace 9, ambos hasta hoy
+        self.assertEqual(filas, 11 + 10)
+        for proyecto in Proyecto.objects.filter(id__in=[p.id for p in self.proyectos]):
+            instantanea = EstadisticaProyecto.objects.get(proyecto=proyecto, fecha=self.hoy)
+            self.assertEqual(instantanea.total_articulos, proyecto.total_articulos)
+            self.assertEqual(instantanea.articulos_aprobados, proyecto.articulos_aprobados)
+
+    def test_desde_limita_los_dias_guardados(self):
+        desde = self.hoy - datetime.timedelta(days=2)
+
+        self.assertEqual(reconstruir_historial(desde=desde, hasta=self.hoy), 6)
+        self.assertFalse(EstadisticaProyecto.objects.filter(fecha__lt=desde).exists())
+
+
+class EstadisticasProyectoTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('estadistico', 'estadistico@gmail.com', 'clave')
+        self.proyecto = Proyecto.objects.create(nombre='Proyecto medido', usuario_creador=self.usuario)
+        UsuarioProyecto.objects.create(usuario=self.usuario, proyecto=self.proyecto, rol_proyecto='DUEÑO')
+        self.hoy = timezone.localdate()
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.url = reverse('estadisticas_proyecto', args=[self.proyecto.id])
+
+    def _instantanea(self, dias_atras, total, aprobados):
+        Proyecto.objects.filter(id=self.proyecto.id).update(total_articulos=total, articulos_aprobados=aprobados)
+        registrar_instantanea(self.hoy - datetime.timedelta(days=dias_atras))
+
+    def test_instantanea_es_una_consulta_y_se_puede_repetir(self):
+        Proyecto.objects.create(nombre='Otro proyecto', usuario_creador=self.usuario)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(registrar_instantanea(self.hoy), 2)
+        self._instantanea(0, 5, 1)
+
+        instantanea = EstadisticaProyecto.objects.get(proyecto=self.proyecto, fecha=self.hoy)
+        self.assertEqual((instantanea.total_articulos, instantanea.articulos_aprobados), (5, 1))
+        self.assertEqual(EstadisticaProyecto.objects.count(), 2)
+
+    def test_serie_con_avance_diario(self):
+        self._instantanea(2, 3, 0)
+        self._instantanea(1, 7, 2)
+        self._instantanea(0, 8, 5)
+        self._instantanea(10, 1, 0)
+
+        respuesta = self.client.get(self.url, {'dias': 3}).json()
+
+        self.assertEqual(respuesta['dias'], 3)
+        self.assertEqual(
+            [(dia['total_articulos'], dia['nuevos'], dia['aprobados_dia']) for dia in respuesta['serie']],
+            [(3, None, None), (7, 4, 2), (8, 1, 3)],
+        )
+        self.assertEqual(respuesta['serie'][-1]['fecha'], self.hoy.isoformat())
+
+    def test_dias_se_limita_y_se_valida(self):
+        self.assertEqual(self.client.get(self.url, {'dias': 100000}).json()['dias'], 730)
+        self.assertEqual(self.client.get(self.url, {'dias': 0}).json()['dias'], 1)
+        self.assertEqual(self.client.get(self.url, {'dias': 'x'}).status_code, 400)
+
+    def test_solo_quien_puede_ver(self):
+        self.client.force_login(User.objects.create_user('mirón', 'miron@gmail.com', 'clave'))
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
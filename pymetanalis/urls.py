@@ -10,6 +10,7 @@ urlpatterns = [
     path('', include('core.urls')),  # URLs del core, incluyendo el home
     path('usuarios/', include('usuarios.urls')),  # URLs de usuarios con prefijo
     path('security/', include('security.urls')),
+    path('articulos/', include('articulos.urls')),
 
     # ==================== URLs DE PROYECTOS ====================
     path('proyectos/crear/', views.crear_proyecto, name='crear_proyecto'),
@@ -17,6 +18,7 @@ urlpatterns = [
     path('proyectos/buscar/', views.buscar_proyectos, name='buscar_proyectos'),
     path('proyectos/<int:proyecto_id>/', views.detalle_proyecto, name='detalle_proyecto'),
     path('proyectos/<int:proyecto_id>/editar/', views.editar_proyecto, name='editar_proyecto'),
+    path('proyectos/<int:proyecto_id>/estadisticas/', views.estadisticas_proyecto, name='estadisticas_proyecto'),
     path('proyectos/<int:proyecto_id>/buscar-usuarios/', views.buscar_usuarios_disponibles, name='buscar_usuarios_disponibles'),
     path('proyectos/<int:proyecto_id>/invitar/', views.invitar_usuario, name='invitar_usuario'),
     path('proyectos/<int:proyecto_id>/abandonar/', views.abandonar_proyecto, name='abandonar_proyecto'),
@@ -33,6 +35,7 @@ urlpatterns = [
     # ==================== URLs DE NOTIFICACIONES ====================
     path('notificaciones/obtener/', views.obtener_notificaciones, name='obtener_notificaciones'),
     path('notificaciones/contar/', views.contar_notificaciones, name='contar_notificaciones'),
+    path('notificaciones/eventos/', views.eventos_notificaciones, name='eventos_notificaciones'),
     path('notificaciones/marcar-leida/<int:notificacion_id>/', views.marcar_notificacion_leida, name='marcar_notificacion_leida'),
     path('notificaciones/marcar-todas-leidas/', views.marcar_todas_notificaciones_leidas, name='marcar_todas_notificaciones_leidas'),
 ]
\ No newline at end of file
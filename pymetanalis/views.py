@@ -1,18 +1,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from asgiref.sync import sync_to_async
 from django.db import transaction
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
-from django.core.mail import send_mail
-from django.conf import settings
 from django.urls import reverse
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Exists, F, FilteredRelation, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.crypto import get_random_string
-from .models import Proyecto, UsuarioProyecto, SolicitudProyecto, Notificacion, Invitacion
+from usuarios.busqueda import buscar_usuarios
+from .models import Proyecto, UsuarioProyecto, SolicitudProyecto, Notificacion, ContadorNotificaciones, Invitacion
+from .correos import encolar_correo
+from .estadisticas import serie_proyecto
+from .invitaciones import MAXIMO_INVITACIONES_POR_LOTE, dominio_permitido, extraer_correos, invitar_en_bloque
+from .eventos import difusor, emitir_contador, emitir_notificacion, iniciar_escucha
+from .paginacion import CursorInvalido, paginar_por_cursor
+from .permisos import requiere_permiso_proyecto
+import asyncio
 import json
 import datetime
 
@@ -23,13 +32,7 @@ def crear_proyecto(request):
     """Vista para crear un nuevo proyecto"""
     
     # Verificar que el usuario puede crear proyectos
-    puede_crear = False
-    if request.user.is_superuser:
-        puede_crear = True
-    elif hasattr(request.user, 'profile') and request.user.profile.role:
-        puede_crear = request.user.profile.role.name in ['administrador', 'investigador']
-    
-    if not puede_crear:
+    if not request.permisos.puede_crear_proyectos:
         messages.error(request, 'No tienes permisos para crear proyectos. Solicita el rol de Investigador.')
         return redirect('core:home')
     
@@ -89,10 +92,19 @@ def crear_proyecto(request):
 def mis_proyectos(request):
     """Vista para listar los proyectos del usuario"""
     
-    # Obtener proyectos donde el usuario participa
-    usuario_proyectos = UsuarioProyecto.objects.filter(
-        usuario=request.user
-    ).select_related('proyecto').order_by('-fecha_incorporacion')
+    # Proyectos donde el usuario participa, con su rol unido en la misma consulta
+    proyectos = Proyecto.objects.annotate(
+        membresia=FilteredRelation(
+            'usuario_proyectos',
+            condition=Q(usuario_proyectos__usuario=request.user)
+        )
+    ).filter(
+        membresia__isnull=False
+    ).annotate(
+        rol=F('membresia__rol_proyecto'),
+        puede_invitar_miembro=F('membresia__puede_invitar'),
+        fecha_incorporacion=F('membresia__fecha_incorporacion'),
+    ).select_related('usuario_creador').order_by('-fecha_incorporacion', '-id')
     
     # Filtros
     filtro_rol = request.GET.get('rol', '')
@@ -101,10 +113,7 @@ def mis_proyectos(request):
     busqueda = request.GET.get('q', '')
     
     if filtro_rol:
-        usuario_proyectos = usuario_proyectos.filter(rol_proyecto=filtro_rol)
-    
-    proyectos_ids = usuario_proyectos.values_list('proyecto_id', flat=True)
-    proyectos = Proyecto.objects.filter(id__in=proyectos_ids)
+        proyectos = proyectos.filter(rol=filtro_rol)
     
     if filtro_estado:
         proyectos = proyectos.filter(estado=filtro_estado)
@@ -120,23 +129,23 @@ def mis_proyectos(request):
             Q(usuario_creador__last_name__icontains=busqueda)
         )
     
-    # Agregar información del rol del usuario en cada proyecto
-    proyectos_data = []
-    for proyecto in proyectos:
-        usuario_proyecto = usuario_proyectos.filter(proyecto=proyecto).first()
-        proyectos_data.append({
-            'proyecto': proyecto,
-            'rol': usuario_proyecto.rol_proyecto if usuario_proyecto else None,
-            'puede_invitar': usuario_proyecto.puede_invitar if usuario_proyecto else False,
-            'progreso': (proyecto.articulos_trabajados / proyecto.total_articulos * 100) 
-                        if proyecto.total_articulos > 0 else 0
-        })
-    
-    # Paginación
-    paginator = Paginator(proyectos_data, 9)
+    # Paginación en la base de datos (COUNT + LIMIT/OFFSET)
+    paginator = Paginator(proyectos, 9)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    # Solo se preparan los datos de los proyectos de la página actual
+    page_obj.object_list = [
+        {
+            'proyecto': proyecto,
+            'rol': proyecto.rol,
+            'puede_invitar': proyecto.puede_invitar_miembro,
+            'progreso': (proyecto.articulos_trabajados / proyecto.total_articulos * 100)
+                        if proyecto.total_articulos > 0 else 0
+        }
+        for proyecto in page_obj.object_list
+    ]
+    
     context = {
         'page_obj': page_obj,
         'filtro_rol': filtro_rol,
@@ -150,6 +159,31 @@ def mis_proyectos(request):
     
     return render(request, 'mis_proyectos.html', context)
 
+# Días máximos que puede pedir el endpoint de estadísticas
+MAXIMO_DIAS_ESTADISTICAS = 730
+
+
+@login_required
+def estadisticas_proyecto(request, proyecto_id):
+    """Serie diaria de estadísticas del proyecto en JSON (sale de EstadisticaProyecto, no de los artículos)"""
+    
+    if not request.permisos.puede_ver(proyecto_id):
+        return JsonResponse({'success': False, 'error': 'Sin permisos'}, status=403)
+    
+    proyecto = get_object_or_404(Proyecto.objects.only('id', 'nombre'), id=proyecto_id)
+    
+    try:
+        dias = min(max(int(request.GET.get('dias', 90)), 1), MAXIMO_DIAS_ESTADISTICAS)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Parámetro dias no válido'}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'proyecto_id': proyecto.id,
+        'dias': dias,
+        'serie': serie_proyecto(proyecto.id, dias),
+    })
+
 @login_required
 def detalle_proyecto(request, proyecto_id):
     """Vista para ver los detalles de un proyecto"""
@@ -157,21 +191,19 @@ def detalle_proyecto(request, proyecto_id):
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
     
     # Verificar que el usuario tiene acceso al proyecto
-    usuario_proyecto = UsuarioProyecto.objects.filter(
-        usuario=request.user,
-        proyecto=proyecto
-    ).first()
-    
-    es_admin = request.user.is_superuser or (
-        hasattr(request.user, 'profile') and 
-        request.user.profile.role and 
-        request.user.profile.role.name == 'administrador'
-    )
+    permisos = request.permisos
+    es_admin = permisos.es_admin
     
-    if not usuario_proyecto and not es_admin:
+    if not permisos.puede_ver(proyecto.id):
         messages.error(request, 'No tienes acceso a este proyecto.')
         return redirect('mis_proyectos')
     
+    # La plantilla muestra la fecha de incorporación y el rol del usuario
+    usuario_proyecto = UsuarioProyecto.objects.filter(
+        usuario=request.user,
+        proyecto=proyecto
+    ).first() if permisos.es_miembro(proyecto.id) else None
+    
     # Obtener miembros del proyecto
     miembros = UsuarioProyecto.objects.filter(
         proyecto=proyecto
@@ -184,7 +216,7 @@ def detalle_proyecto(request, proyecto_id):
     
     # Obtener solicitudes pendientes si es dueño o supervisor
     solicitudes_pendientes = None
-    if usuario_proyecto and usuario_proyecto.rol_proyecto in ['DUEÑO', 'SUPERVISOR']:
+    if permisos.tiene_rol(proyecto.id, 'DUEÑO', 'SUPERVISOR'):
         solicitudes_pendientes = SolicitudProyecto.objects.filter(
             proyecto=proyecto,
             estado='PENDIENTE'
@@ -203,14 +235,14 @@ def detalle_proyecto(request, proyecto_id):
     
     return render(request, 'detalle_proyecto.html', context)
 
-@login_required
-def buscar_proyectos(request):
-    """Vista para buscar proyectos públicos"""
-    
-    busqueda = request.GET.get('q', '')
-    categoria = request.GET.get('categoria', '')
-    
-    # Obtener todos los proyectos activos
+PROYECTOS_POR_PAGINA = 12
+
+# Orden del listado público; termina en 'id' para que el cursor sea único
+ORDEN_PROYECTOS_PUBLICOS = ('-fecha_creacion', '-id')
+
+
+def _consulta_proyectos_publicos(usuario, busqueda, categoria):
+    """Proyectos activos con la participación del usuario y el número de miembros calculados en SQL."""
     proyectos = Proyecto.objects.filter(estado='ACTIVO').select_related('usuario_creador')
     
     if busqueda:
@@ -223,27 +255,73 @@ def buscar_proyectos(request):
     if categoria:
         proyectos = proyectos.filter(categoria=categoria)
     
-    # Anotar con el número de miembros
-    proyectos = proyectos.annotate(num_miembros=Count('usuario_proyectos'))
+    # Subconsultas correlacionadas: solo se evalúan para las filas de la página
+    num_miembros = UsuarioProyecto.objects.filter(
+        proyecto=OuterRef('pk')
+    ).order_by().values('proyecto').annotate(total=Count('id')).values('total')
     
-    # Marcar proyectos donde el usuario ya participa
-    mis_proyectos_ids = UsuarioProyecto.objects.filter(
-        usuario=request.user
-    ).values_list('proyecto_id', flat=True)
+    return proyectos.annotate(
+        ya_participo=Exists(UsuarioProyecto.objects.filter(proyecto=OuterRef('pk'), usuario=usuario)),
+        num_miembros=Coalesce(Subquery(num_miembros), 0),
+    ).order_by(*ORDEN_PROYECTOS_PUBLICOS)
+
+
+@login_required
+def buscar_proyectos(request):
+    """
+    Vista para buscar proyectos públicos.
     
-    proyectos_data = []
-    for proyecto in proyectos:
-        proyectos_data.append({
-            'proyecto': proyecto,
-            'ya_participo': proyecto.id in mis_proyectos_ids,
-            'num_miembros': proyecto.num_miembros,
+    Las peticiones AJAX reciben JSON paginado por cursor (?cursor=...), cuyo
+    coste no crece con la profundidad de la página.
+    """
+    
+    busqueda = request.GET.get('q', '')
+    categoria = request.GET.get('categoria', '')
+    
+    proyectos = _consulta_proyectos_publicos(request.user, busqueda, categoria)
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        try:
+            pagina, siguiente_cursor = paginar_por_cursor(
+                proyectos, ORDEN_PROYECTOS_PUBLICOS, request.GET.get('cursor'), PROYECTOS_POR_PAGINA
+            )
+        except CursorInvalido as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        
+        return JsonResponse({
+            'success': True,
+            'proyectos': [
+                {
+                    'id': proyecto.id,
+                    'nombre': proyecto.nombre,
+                    'categoria': proyecto.categoria,
+                    'categoria_display': proyecto.get_categoria_display(),
+                    'creador': proyecto.usuario_creador.get_full_name() or proyecto.usuario_creador.username,
+                    'num_miembros': proyecto.num_miembros,
+                    'total_articulos': proyecto.total_articulos,
+                    'fecha_creacion': proyecto.fecha_creacion.strftime('%d/%m/%Y'),
+                    'ya_participo': proyecto.ya_participo,
+                    'url': reverse('detalle_proyecto', args=[proyecto.id]),
+                }
+                for proyecto in pagina
+            ],
+            'siguiente_cursor': siguiente_cursor,
         })
     
-    # Paginación
-    paginator = Paginator(proyectos_data, 12)
+    # Paginación en la base de datos (COUNT + LIMIT/OFFSET)
+    paginator = Paginator(proyectos, PROYECTOS_POR_PAGINA)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    page_obj.object_list = [
+        {
+            'proyecto': proyecto,
+            'ya_participo': proyecto.ya_participo,
+            'num_miembros': proyecto.num_miembros,
+        }
+        for proyecto in page_obj.object_list
+    ]
+    
     context = {
         'page_obj': page_obj,
         'busqueda': busqueda,
@@ -254,22 +332,12 @@ def buscar_proyectos(request):
     return render(request, 'buscar_proyectos.html', context)
 
 @login_required
+@requiere_permiso_proyecto('puede_editar', 'No tienes permisos para editar este proyecto.')
 def editar_proyecto(request, proyecto_id):
     """Vista para editar un proyecto (solo dueños)"""
     
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
     
-    # Verificar permisos
-    usuario_proyecto = UsuarioProyecto.objects.filter(
-        usuario=request.user,
-        proyecto=proyecto,
-        rol_proyecto='DUEÑO'
-    ).first()
-    
-    if not usuario_proyecto and not request.user.is_superuser:
-        messages.error(request, 'No tienes permisos para editar este proyecto.')
-        return redirect('detalle_proyecto', proyecto_id=proyecto_id)
-    
     if request.method == 'POST':
         nombre = request.POST.get('nombre', '').strip()
         categoria = request.POST.get('categoria')
@@ -312,28 +380,12 @@ import logging
 logger = logging.getLogger(__name__)
 
 @login_required
+@requiere_permiso_proyecto('puede_invitar', 'No tienes permisos para invitar usuarios a este proyecto.')
 def invitar_usuario(request, proyecto_id):
     """Vista para invitar usuarios al proyecto"""
     
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
     
-    # Verificar permisos
-    usuario_proyecto = UsuarioProyecto.objects.filter(
-        usuario=request.user,
-        proyecto=proyecto,
-        puede_invitar=True
-    ).first()
-    
-    es_admin = request.user.is_superuser or (
-        hasattr(request.user, 'profile') and 
-        request.user.profile.role and 
-        request.user.profile.role.name == 'administrador'
-    )
-    
-    if not usuario_proyecto and not es_admin:
-        messages.error(request, 'No tienes permisos para invitar usuarios a este proyecto.')
-        return redirect('detalle_proyecto', proyecto_id=proyecto_id)
-    
     if request.method == 'POST':
         logger.debug(f"POST recibido: metodo={request.POST.get('metodo')}")
         metodo = request.POST.get('metodo')  # 'usuario' o 'email'
@@ -386,8 +438,7 @@ def invitar_usuario(request, proyecto_id):
                 })
             
             # Validar dominios permitidos
-            dominios_permitidos = ['@gmail.com', '@unemi.edu.ec']
-            if not any(dominio in destinatario_email for dominio in dominios_permitidos):
+            if not dominio_permitido(destinatario_email):
                 messages.error(request, 'Solo se permiten correos Gmail o @unemi.edu.ec')
                 return render(request, 'invitar_usuario.html', {
                     'proyecto': proyecto,
@@ -441,6 +492,43 @@ def invitar_usuario(request, proyecto_id):
                     'tab_activo': 'email'
                 })
         
+        elif metodo == 'masivo':
+            correos = extraer_correos(request.POST.get('correos', ''), request.FILES.get('archivo_csv'))
+            
+            if not correos:
+                messages.error(request, 'Pega las direcciones o sube un archivo CSV.')
+                return render(request, 'invitar_usuario.html', {
+                    'proyecto': proyecto,
+                    'tab_activo': 'masivo'
+                })
+            
+            if len(correos) > MAXIMO_INVITACIONES_POR_LOTE:
+                messages.error(request, f'Se pueden invitar como máximo {MAXIMO_INVITACIONES_POR_LOTE} direcciones a la vez.')
+                return render(request, 'invitar_usuario.html', {
+                    'proyecto': proyecto,
+                    'tab_activo': 'masivo'
+                })
+            
+            resultados = invitar_en_bloque(
+                proyecto,
+                correos,
+                request.user,
+                lambda token: request.build_absolute_uri(reverse('aceptar_invitacion', args=[token]))
+            )
+            enviadas = sum(1 for resultado in resultados if resultado['estado'] in ('creada', 'reenviada'))
+            logger.debug(f"Invitación masiva: proyecto={proyecto.id}, direcciones={len(correos)}, enviadas={enviadas}")
+            
+            if enviadas:
+                messages.success(request, f'{enviadas} de {len(correos)} invitaciones enviadas.')
+            else:
+                messages.warning(request, 'No se envió ninguna invitación. Revisa el detalle de cada dirección.')
+            
+            return render(request, 'invitar_usuario.html', {
+                'proyecto': proyecto,
+                'resultados_masivos': resultados,
+                'tab_activo': 'masivo'
+            })
+        
         else:
             logger.warning("Método de invitación no válido")
             messages.error(request, 'Método de invitación no válido.')
@@ -567,10 +655,7 @@ def solicitar_unirse_proyecto(request, proyecto_id):
         proyecto = get_object_or_404(Proyecto, id=proyecto_id, estado='ACTIVO')
         
         # Verificar que el usuario no sea ya miembro
-        ya_miembro = UsuarioProyecto.objects.filter(
-            usuario=request.user,
-            proyecto=proyecto
-        ).exists()
+        ya_miembro = request.permisos.es_miembro(proyecto.id)
         
         if ya_miembro:
             return JsonResponse({
@@ -613,7 +698,7 @@ def solicitar_unirse_proyecto(request, proyecto_id):
                 ).usuario
                 
                 # Crear la notificación
-                Notificacion.objects.create(
+                crear_notificacion(
                     usuario=dueno,
                     tipo='nueva_solicitud',
                     titulo=f'Nueva solicitud para {proyecto.nombre}',
@@ -639,12 +724,10 @@ Saludos,
 Equipo de Metaanálisis
 """
                     
-                    send_mail(
+                    encolar_correo(
                         asunto,
                         mensaje_email,
-                        settings.DEFAULT_FROM_EMAIL,
                         [dueno.email],
-                        fail_silently=True,
                     )
             except UsuarioProyecto.DoesNotExist:
                 pass
@@ -672,13 +755,7 @@ def gestionar_solicitud(request, solicitud_id):
         solicitud = get_object_or_404(SolicitudProyecto, id=solicitud_id, estado='PENDIENTE')
         
         # Verificar permisos (debe ser dueño o supervisor)
-        usuario_proyecto = UsuarioProyecto.objects.filter(
-            usuario=request.user,
-            proyecto=solicitud.proyecto,
-            rol_proyecto__in=['DUEÑO', 'SUPERVISOR']
-        ).first()
-        
-        if not usuario_proyecto and not request.user.is_superuser:
+        if not request.permisos.puede_gestionar_miembros(solicitud.proyecto_id):
             return JsonResponse({
                 'success': False,
                 'message': 'No tienes permisos para gestionar solicitudes.'
@@ -733,10 +810,9 @@ def gestionar_solicitud(request, solicitud_id):
                 
                 # Enviar email
                 if solicitud.usuario.email:
-                    try:
-                        send_mail(
-                            f'¡Solicitud aceptada! - {solicitud.proyecto.nombre}',
-                            f"""Hola {solicitud.usuario.get_full_name() or solicitud.usuario.username},
+                    encolar_correo(
+                        f'¡Solicitud aceptada! - {solicitud.proyecto.nombre}',
+                        f"""Hola {solicitud.usuario.get_full_name() or solicitud.usuario.username},
 
 ¡Buenas noticias! Tu solicitud para unirte al proyecto "{solicitud.proyecto.nombre}" ha sido aceptada.
 
@@ -746,12 +822,8 @@ Ya puedes acceder al proyecto y comenzar a colaborar:
 Saludos,
 Equipo de Metaanálisis
 """,
-                            settings.DEFAULT_FROM_EMAIL,
-                            [solicitud.usuario.email],
-                            fail_silently=True,
-                        )
-                    except Exception as e:
-                        print(f"Error enviando email: {e}")
+                        [solicitud.usuario.email],
+                    )
                 
             else:  # rechazar
                 solicitud.estado = 'RECHAZADA'
@@ -774,10 +846,9 @@ Equipo de Metaanálisis
                 
                 # Enviar email
                 if solicitud.usuario.email:
-                    try:
-                        send_mail(
-                            f'Actualización de solicitud - {solicitud.proyecto.nombre}',
-                            f"""Hola {solicitud.usuario.get_full_name() or solicitud.usuario.username},
+                    encolar_correo(
+                        f'Actualización de solicitud - {solicitud.proyecto.nombre}',
+                        f"""Hola {solicitud.usuario.get_full_name() or solicitud.usuario.username},
 
 Tu solicitud para unirte al proyecto "{solicitud.proyecto.nombre}" no ha sido aceptada en este momento.
 
@@ -786,12 +857,8 @@ Puedes buscar otros proyectos que puedan interesarte en la plataforma.
 Saludos,
 Equipo de Metaanálisis
 """,
-                            settings.DEFAULT_FROM_EMAIL,
-                            [solicitud.usuario.email],
-                            fail_silently=True,
-                        )
-                    except Exception as e:
-                        print(f"Error enviando email: {e}")
+                        [solicitud.usuario.email],
+                    )
         
         return JsonResponse({
             'success': True,
@@ -805,6 +872,7 @@ Equipo de Metaanálisis
         }, status=500)
 
 @login_required
+@requiere_permiso_proyecto('puede_invitar', 'Sin permisos')
 def buscar_usuarios_disponibles(request, proyecto_id):
     """Vista AJAX para buscar usuarios disponibles para invitar"""
     
@@ -814,22 +882,6 @@ def buscar_usuarios_disponibles(request, proyecto_id):
     try:
         proyecto = get_object_or_404(Proyecto, id=proyecto_id)
         
-        # Verificar permisos
-        usuario_proyecto = UsuarioProyecto.objects.filter(
-            usuario=request.user,
-            proyecto=proyecto,
-            puede_invitar=True
-        ).first()
-        
-        es_admin = request.user.is_superuser or (
-            hasattr(request.user, 'profile') and 
-            request.user.profile.role and 
-            request.user.profile.role.name == 'administrador'
-        )
-        
-        if not usuario_proyecto and not es_admin:
-            return JsonResponse({'error': 'Sin permisos'}, status=403)
-        
         # Obtener término de búsqueda
         query = request.GET.get('q', '').strip()
         
@@ -839,22 +891,16 @@ def buscar_usuarios_disponibles(request, proyecto_id):
                 'usuarios': []
             })
         
-        # Obtener IDs de usuarios que ya son miembros
-        miembros_ids = UsuarioProyecto.objects.filter(
+        # Excluir a los miembros y al usuario actual
+        excluir = set(UsuarioProyecto.objects.filter(
             proyecto=proyecto
-        ).values_list('usuario_id', flat=True)
-        
-        # Buscar usuarios que NO sean miembros
-        usuarios = User.objects.filter(
-            Q(username__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query)
-        ).exclude(
-            id__in=miembros_ids
-        ).exclude(
-            id=request.user.id  # Excluir al usuario actual
-        )[:10]  # Limitar a 10 resultados
+        ).values_list('usuario_id', flat=True))
+        excluir.add(request.user.id)
+        
+        # Los 10 más relevantes según el índice de búsqueda, en orden de ranking
+        ids = buscar_usuarios(query, limite=10, excluir=excluir)
+        encontrados = User.objects.in_bulk(ids)
+        usuarios = [encontrados[usuario_id] for usuario_id in ids if usuario_id in encontrados]
         
         usuarios_data = []
         for usuario in usuarios:
@@ -879,6 +925,7 @@ def buscar_usuarios_disponibles(request, proyecto_id):
 
 @login_required
 @require_POST
+@requiere_permiso_proyecto('puede_editar', 'No tienes permisos para cambiar roles.')
 def cambiar_rol_miembro(request, proyecto_id, usuario_id):
     """Vista para cambiar el rol de un miembro del proyecto"""
     
@@ -888,19 +935,6 @@ def cambiar_rol_miembro(request, proyecto_id, usuario_id):
     try:
         proyecto = get_object_or_404(Proyecto, id=proyecto_id)
         
-        # Verificar permisos (solo dueño puede cambiar roles)
-        usuario_proyecto_gestor = UsuarioProyecto.objects.filter(
-            usuario=request.user,
-            proyecto=proyecto,
-            rol_proyecto='DUEÑO'
-        ).first()
-        
-        if not usuario_proyecto_gestor and not request.user.is_superuser:
-            return JsonResponse({
-                'success': False,
-                'message': 'No tienes permisos para cambiar roles.'
-            }, status=403)
-        
         # Obtener el miembro a modificar
         miembro = get_object_or_404(
             UsuarioProyecto,
@@ -956,6 +990,7 @@ def cambiar_rol_miembro(request, proyecto_id, usuario_id):
 
 @login_required
 @require_POST
+@requiere_permiso_proyecto('puede_gestionar_miembros', 'No tienes permisos para eliminar miembros.')
 def eliminar_miembro(request, proyecto_id, usuario_id):
     """Vista para eliminar un miembro del proyecto"""
     
@@ -965,19 +1000,6 @@ def eliminar_miembro(request, proyecto_id, usuario_id):
     try:
         proyecto = get_object_or_404(Proyecto, id=proyecto_id)
         
-        # Verificar permisos (dueño o supervisor pueden eliminar)
-        usuario_proyecto_gestor = UsuarioProyecto.objects.filter(
-            usuario=request.user,
-            proyecto=proyecto,
-            rol_proyecto__in=['DUEÑO', 'SUPERVISOR']
-        ).first()
-        
-        if not usuario_proyecto_gestor and not request.user.is_superuser:
-            return JsonResponse({
-                'success': False,
-                'message': 'No tienes permisos para eliminar miembros.'
-            }, status=403)
-        
         # Obtener el miembro a eliminar
         miembro = get_object_or_404(
             UsuarioProyecto,
@@ -1084,10 +1106,9 @@ def abandonar_proyecto(request, proyecto_id):
                 
                 # Enviar email al dueño
                 if dueno.email:
-                    try:
-                        send_mail(
-                            f'Miembro abandonó proyecto - {nombre_proyecto}',
-                            f"""Hola {dueno.get_full_name() or dueno.username},
+                    encolar_correo(
+                        f'Miembro abandonó proyecto - {nombre_proyecto}',
+                        f"""Hola {dueno.get_full_name() or dueno.username},
 
 Te informamos que {nombre_usuario} ha abandonado el proyecto "{nombre_proyecto}".
 
@@ -1097,12 +1118,8 @@ Puedes revisar el estado del proyecto aquí:
 Saludos,
 Equipo de Metaanálisis
 """,
-                            settings.DEFAULT_FROM_EMAIL,
-                            [dueno.email],
-                            fail_silently=True,
-                        )
-                    except Exception as e:
-                        print(f"Error enviando email: {e}")
+                        [dueno.email],
+                    )
                         
             except UsuarioProyecto.DoesNotExist:
                 pass
@@ -1150,10 +1167,7 @@ def obtener_notificaciones(request):
             })
         
         # Contar no leídas
-        no_leidas = Notificacion.objects.filter(
-            usuario=request.user,
-            leida=False
-        ).count()
+        no_leidas = ContadorNotificaciones.obtener(request.user.id)
         
         return JsonResponse({
             'success': True,
@@ -1175,10 +1189,7 @@ def contar_notificaciones(request):
         return JsonResponse({'error': 'Petición no válida'}, status=400)
     
     try:
-        no_leidas = Notificacion.objects.filter(
-            usuario=request.user,
-            leida=False
-        ).count()
+        no_leidas = ContadorNotificaciones.obtener(request.user.id)
         
         return JsonResponse({
             'success': True,
@@ -1191,6 +1202,50 @@ def contar_notificaciones(request):
             'error': str(e)
         }, status=500)
 
+# Intervalo de los comentarios de mantenimiento que evitan que proxies cierren la conexión
+INTERVALO_LATIDO_SSE = 25
+
+
+def _evento_sse(evento):
+    return f"event: {evento['tipo']}\ndata: {json.dumps(evento['datos'], default=str)}\n\n"
+
+
+@login_required
+async def eventos_notificaciones(request):
+    """
+    Flujo Server-Sent Events con las notificaciones nuevas y el contador de no leídas.
+
+    Sustituye al polling de contar_notificaciones. Necesita un servidor ASGI; bajo
+    WSGI responde 204 para que el navegador vuelva al polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    usuario = await request.auser()
+    no_leidas = await sync_to_async(ContadorNotificaciones.obtener)(usuario.id)
+
+    async def flujo():
+        suscripcion = difusor.suscribir(usuario.id)
+        iniciar_escucha()
+        _, cola = suscripcion
+        try:
+            yield 'retry: 5000\n'
+            yield _evento_sse({'tipo': 'contador', 'datos': {'no_leidas': no_leidas}})
+            while True:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), INTERVALO_LATIDO_SSE)
+                except asyncio.TimeoutError:
+                    yield ': latido\n\n'
+                    continue
+                yield _evento_sse(evento)
+        finally:
+            difusor.cancelar(usuario.id, suscripcion)
+
+    respuesta = StreamingHttpResponse(flujo(), content_type='text/event-stream')
+    respuesta['Cache-Control'] = 'no-cache'
+    respuesta['X-Accel-Buffering'] = 'no'
+    return respuesta
+
 @login_required
 @require_POST
 def marcar_notificacion_leida(request, notificacion_id):
@@ -1207,6 +1262,7 @@ def marcar_notificacion_leida(request, notificacion_id):
         )
         
         notificacion.marcar_como_leida()
+        emitir_contador(request.user.id, ContadorNotificaciones.obtener(request.user.id))
         
         return JsonResponse({
             'success': True,
@@ -1236,6 +1292,10 @@ def marcar_todas_notificaciones_leidas(request):
             leida=True,
             fecha_lectura=timezone.now()
         )
+        # Se descuentan las marcadas (no se pone a cero) para no perder las creadas mientras tanto
+        if actualizadas:
+            ContadorNotificaciones.decrementar(request.user.id, actualizadas)
+        emitir_contador(request.user.id, ContadorNotificaciones.obtener(request.user.id))
         
         return JsonResponse({
             'success': True,
@@ -1252,7 +1312,7 @@ def marcar_todas_notificaciones_leidas(request):
 
 def crear_notificacion(usuario, tipo, titulo, mensaje, url=None, proyecto=None, solicitud=None):
     try:
-        Notificacion.objects.create(
+        notificacion = Notificacion.objects.create(
             usuario=usuario,
             tipo=tipo,
             titulo=titulo,
@@ -1261,6 +1321,8 @@ def crear_notificacion(usuario, tipo, titulo, mensaje, url=None, proyecto=None,
             proyecto=proyecto,
             solicitud=solicitud
         )
+        ContadorNotificaciones.incrementar(usuario.id)
+        emitir_notificacion(notificacion, ContadorNotificaciones.obtener(usuario.id))
     except Exception as e:
         # Log del error pero no fallar la operación principal
         print(f"Error creando notificación: {e}")
\ No newline at end of file
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import RoleSyncJob
+
+
+@admin.register(RoleSyncJob)
+class RoleSyncJobAdmin(admin.ModelAdmin):
+    list_display = ('role', 'status', 'attempts', 'users_total', 'duration', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SecurityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'security'
+
+    def ready(self):
+        from .catalog import invalidate_permission_catalog
+
+        # Las migraciones son lo único que crea o borra permisos y tipos de contenido
+        post_migrate.connect(invalidate_permission_catalog, dispatch_uid='security_invalidar_catalogo')
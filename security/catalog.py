@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+
+# Reemplazos por idioma para los nombres que genera Django ("Can add ...")
+PERMISSION_TRANSLATIONS = {
+    'es': (
+        ('can add', 'Puede agregar'),
+        ('can change', 'Puede modificar'),
+        ('can delete', 'Puede eliminar'),
+        ('can view', 'Puede ver'),
+    ),
+}
+
+# La interfaz está en español: es el idioma por defecto del catálogo
+DEFAULT_LANGUAGE = 'es'
+
+CATALOG_VERSION_KEY = 'security:catalogo:version'
+
+# La caché por defecto (LocMemCache) es propia de cada proceso y post_migrate solo
+# se emite en el proceso de `migrate`: los workers en marcha no ven ese cambio de
+# versión, así que el catálogo también caduca y se reconstruye cada pocos minutos.
+CATALOG_TIMEOUT = 300
+
+
+def _language():
+    idioma = (get_language() or settings.LANGUAGE_CODE).split('-')[0]
+    return idioma if idioma in PERMISSION_TRANSLATIONS else DEFAULT_LANGUAGE
+
+
+def translate_permission_name(permission_name, language=DEFAULT_LANGUAGE):
+    """Traduce automáticamente los nombres de permisos al idioma indicado"""
+    name_lower = permission_name.lower()
+    for original, traduccion in PERMISSION_TRANSLATIONS.get(language, ()):
+        if name_lower.startswith(original):
+            return traduccion + permission_name[len(original):]
+    return permission_name
+
+
+def _build_catalog(language):
+    """
+    Todos los permisos en una sola consulta (con su ContentType), agrupados
+    por tipo de contenido en orden app_label/model/codename.
+    """
+    catalog = {}
+    permissions = Permission.objects.select_related('content_type').order_by(
+        'content_type__app_label', 'content_type__model', 'codename'
+    )
+    for permission in permissions:
+        catalog.setdefault(permission.content_type, []).append({
+            'id': permission.id,
+            'codename': permission.codename,
+            'name': translate_permission_name(permission.name, language),
+            'original_name': permission.name,
+        })
+    return catalog
+
+
+def get_permission_catalog():
+    """
+    {ContentType: [permisos]} con los nombres traducidos al idioma activo.
+
+    Los permisos y tipos de contenido solo cambian al migrar, así que el catálogo
+    se guarda en caché (uno por idioma) hasta CATALOG_TIMEOUT y se invalida en
+    post_migrate.
+    """
+    language = _language()
+    version = cache.get_or_set(CATALOG_VERSION_KEY, time.time_ns, None)
+    key = f'security:catalogo:{version}:{language}'
+
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = _build_catalog(language)
+        cache.set(key, catalog, CATALOG_TIMEOUT)
+    return catalog
+
+
+def invalidate_permission_catalog(**kwargs):
+    """
+    Receptor de post_migrate: descarta los catálogos de todos los idiomas.
+    La versión nueva es única aunque la anterior se haya expulsado de la caché.
+    """
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
@@ -0,0 +1,97 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from security.sync import BATCH_SIZE, claim_jobs, recover_abandoned_jobs, run_job, sync_role
+from usuarios.models import Role
+
+
+class Command(BaseCommand):
+    help = (
+        'Procesa la cola de sincronización de permisos de roles (RoleSyncJob): '
+        'deja los user_permissions de cada usuario iguales a los permisos de su rol.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rol',
+            type=int,
+            help='ID de un rol a sincronizar directamente, sin pasar por la cola.'
+        )
+        parser.add_argument(
+            '--todos',
+            action='store_true',
+            help='Sincroniza directamente todos los roles y termina.'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=BATCH_SIZE,
+            help='Usuarios por transacción al sincronizar con --rol o --todos.'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre consultas a la cola cuando no hay trabajos.'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Procesa las sincronizaciones disponibles y termina.'
+        )
+
+    def _report(self, role_name, report):
+        self.stdout.write(
+            f'Rol "{role_name}": {report["users"]} usuarios, {report["added"]} permisos agregados, '
+            f'{report["removed"]} quitados en {report["seconds"]:.2f}s'
+        )
+
+    def handle(self, *args, **options):
+        lote = max(1, options['lote'])
+
+        if options['rol'] or options['todos']:
+            if options['rol']:
+                roles = Role.objects.filter(id=options['rol'])
+                if not roles:
+                    raise CommandError(f"No existe el rol {options['rol']}")
+            else:
+                roles = Role.objects.order_by('name')
+
+            inicio = time.monotonic()
+            for role in roles:
+                self._report(role.name, sync_role(role.id, batch_size=lote))
+            self.stdout.write(self.style.SUCCESS(
+                f'Sincronización terminada en {time.monotonic() - inicio:.2f}s'
+            ))
+            return
+
+        recuperados = recover_abandoned_jobs()
+        if recuperados:
+            self.stdout.write(f'{recuperados} sincronizaciones abandonadas devueltas a la cola.')
+
+        self.stdout.write('Worker de sincronización de permisos iniciado.')
+        completados = fallidos = 0
+        try:
+            while True:
+                jobs = claim_jobs(1)
+                if not jobs:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                job = jobs[0]
+                report = run_job(job)
+                if report is None:
+                    fallidos += 1
+                    self.stderr.write(f'Sincronización #{job.id} del rol "{job.role.name}" falló: {job.error}')
+                else:
+                    completados += 1
+                    self._report(job.role.name, report)
+        except KeyboardInterrupt:
+            self.stdout.write('Worker de sincronización de permisos detenido.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{completados} sincronizaciones completadas, {fallidos} con error.'
+        ))
@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+
+from usuarios.models import Role
+
+
+class RoleSyncJob(models.Model):
+    """
+    Sincronización pendiente de los permisos de un rol con los user_permissions de
+    sus usuarios. Los roles grandes se sincronizan fuera de la petición HTTP.
+    """
+    STATUS_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    role = models.ForeignKey(Role, on_delete=models.CASCADE, related_name='sync_jobs')
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='role_sync_jobs'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDIENTE')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    error = models.TextField(null=True, blank=True)
+
+    # Resultado de la última ejecución
+    users_total = models.PositiveIntegerField(default=0)
+    permissions_added = models.PositiveIntegerField(default=0)
+    permissions_removed = models.PositiveIntegerField(default=0)
+    duration = models.FloatField(null=True, blank=True, help_text='Segundos')
+
+    available_from = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_from']),
+        ]
+
+    def __str__(self):
+        return f"Sincronización #{self.id} - {self.role.name} ({self.status})"
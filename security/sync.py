@@ -0,0 +1,182 @@
+import datetime
+import logging
+import time
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from usuarios.models import Profile, Role
+
+from .models import RoleSyncJob
+
+
+logger = logging.getLogger(__name__)
+
+# Tabla intermedia de User.user_permissions (user_id, permission_id)
+UserPermission = User.user_permissions.through
+
+# Usuarios procesados por transacción
+BATCH_SIZE = 1000
+
+# Hasta este número de usuarios el rol se sincroniza dentro de la petición
+SYNC_INLINE_MAX_USERS = 500
+
+# Espera base antes de reintentar una sincronización fallida (se duplica en cada intento)
+RETRY_DELAY = datetime.timedelta(seconds=30)
+
+# Tiempo tras el cual una sincronización EN_PROCESO se considera abandonada por su worker
+MAX_PROCESSING_TIME = datetime.timedelta(minutes=15)
+
+
+def _chunks(items, size=BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def sync_users(user_ids, permission_ids):
+    """
+    Deja los user_permissions de `user_ids` iguales a `permission_ids`.
+
+    Lee las asignaciones actuales del lote en una consulta y calcula la diferencia
+    como operaciones de conjuntos; después borra las sobrantes por id y crea las
+    que faltan con bulk_create sobre la tabla intermedia. Devuelve (agregados, quitados).
+    """
+    desired_permissions = set(permission_ids)
+    added = removed = 0
+
+    with transaction.atomic():
+        current = {
+            (user_id, permission_id): row_id
+            for row_id, user_id, permission_id in UserPermission.objects.filter(
+                user_id__in=user_ids
+            ).values_list('id', 'user_id', 'permission_id')
+        }
+        desired = {
+            (user_id, permission_id)
+            for user_id in user_ids
+            for permission_id in desired_permissions
+        }
+
+        to_remove = [current[pair] for pair in current.keys() - desired]
+        for chunk in _chunks(to_remove):
+            removed += UserPermission.objects.filter(id__in=chunk).delete()[0]
+
+        to_add = desired - current.keys()
+        UserPermission.objects.bulk_create(
+            [UserPermission(user_id=user_id, permission_id=permission_id) for user_id, permission_id in to_add],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        added = len(to_add)
+
+    return added, removed
+
+
+def sync_role(role_id, batch_size=BATCH_SIZE):
+    """
+    Sincroniza a todos los usuarios de un rol, un lote de usuarios por transacción
+    para no bloquear la tabla durante toda la operación.
+    Devuelve {'users', 'added', 'removed', 'seconds'}.
+    """
+    start = time.monotonic()
+    permission_ids = list(Role.objects.get(id=role_id).permissions.values_list('id', flat=True))
+    user_ids = Profile.objects.filter(role_id=role_id).order_by('user_id').values_list('user_id', flat=True)
+
+    report = {'users': 0, 'added': 0, 'removed': 0}
+    for batch in _chunks(user_ids, batch_size):
+        added, removed = sync_users(batch, permission_ids)
+        report['users'] += len(batch)
+        report['added'] += added
+        report['removed'] += removed
+
+    report['seconds'] = round(time.monotonic() - start, 3)
+    logger.info(
+        f"Rol {role_id} sincronizado: {report['users']} usuarios, +{report['added']} "
+        f"-{report['removed']} permisos en {report['seconds']}s"
+    )
+    return report
+
+
+def request_role_sync(role, requested_by=None):
+    """
+    Sincroniza el rol en la petición si es pequeño; si no (o si esa sincronización
+    falla), encola un RoleSyncJob o reutiliza el que ya esté pendiente: al
+    ejecutarse lee los permisos actuales. Debe llamarse fuera de una transacción.
+    Devuelve (informe, None) o (None, trabajo).
+    """
+    if Profile.objects.filter(role=role).count() <= SYNC_INLINE_MAX_USERS:
+        try:
+            return sync_role(role.id), None
+        except Exception as e:
+            # El cambio del rol ya está guardado: la sincronización se reintenta desde la cola
+            logger.error(f"Sincronización del rol {role.id} falló en la petición, se encola: {e}")
+
+    job = RoleSyncJob.objects.filter(role=role, status='PENDIENTE').first()
+    if job is None:
+        job = RoleSyncJob.objects.create(role=role, requested_by=requested_by)
+    return None, job
+
+
+def claim_jobs(limit):
+    """
+    Marca como EN_PROCESO hasta `limit` sincronizaciones disponibles y las devuelve,
+    reclamando cada una con un UPDATE condicionado al estado PENDIENTE.
+    """
+    now = timezone.now()
+    candidates = RoleSyncJob.objects.filter(
+        status='PENDIENTE',
+        available_from__lte=now
+    ).values_list('id', flat=True)[:limit]
+
+    claimed = [
+        job_id for job_id in candidates
+        if RoleSyncJob.objects.filter(id=job_id, status='PENDIENTE').update(
+            status='EN_PROCESO',
+            attempts=F('attempts') + 1,
+            started_at=now
+        )
+    ]
+    return list(RoleSyncJob.objects.filter(id__in=claimed).select_related('role'))
+
+
+def recover_abandoned_jobs():
+    """Devuelve a la cola las sincronizaciones cuyo worker terminó sin completarlas."""
+    limit = timezone.now() - MAX_PROCESSING_TIME
+    return RoleSyncJob.objects.filter(
+        status='EN_PROCESO',
+        started_at__lt=limit
+    ).update(status='PENDIENTE')
+
+
+def run_job(job):
+    """Ejecuta una sincronización reclamada y guarda su informe o su error."""
+    try:
+        report = sync_role(job.role_id)
+    except Exception as e:
+        job.error = str(e)
+        if job.attempts < job.max_attempts:
+            job.status = 'PENDIENTE'
+            job.available_from = timezone.now() + RETRY_DELAY * (2 ** (job.attempts - 1))
+            logger.warning(f"Sincronización {job.id} falló (intento {job.attempts}), se reintentará: {e}")
+        else:
+            job.status = 'FALLIDO'
+            job.finished_at = timezone.now()
+            logger.error(f"Sincronización {job.id} descartada tras {job.attempts} intentos: {e}")
+        job.save(update_fields=['status', 'error', 'available_from', 'finished_at'])
+        return None
+
+    job.status = 'COMPLETADO'
+    job.error = None
+    job.users_total = report['users']
+    job.permissions_added = report['added']
+    job.permissions_removed = report['removed']
+    job.duration = report['seconds']
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'error', 'users_total', 'permissions_added',
+        'permissions_removed', 'duration', 'finished_at',
+    ])
+    return report
@@ -1,3 +1,185 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from usuarios.models import Profile, Role
+
+from .catalog import get_permission_catalog, invalidate_permission_catalog, translate_permission_name
+from .models import RoleSyncJob
+from .sync import (
+    MAX_PROCESSING_TIME, RETRY_DELAY, claim_jobs, recover_abandoned_jobs, request_role_sync, run_job, sync_role,
+    sync_users,
+)
+
+
+class AccesoSeguridadTests(TestCase):
+    """Las vistas de seguridad usan request.permisos.es_admin."""
+
+    def setUp(self):
+        # Los roles se guardan en caché por id de usuario, que se reutiliza entre pruebas
+        cache.clear()
+        self.usuario = User.objects.create_user('gestor', 'gestor@gmail.com', 'clave')
+        self.client.force_login(self.usuario)
+
+    def _asignar_rol(self, nombre):
+        perfil = self.usuario.profile
+        perfil.role = Role.objects.get_or_create(name=nombre)[0]
+        perfil.save()
+
+    def test_investigador_no_accede(self):
+        self._asignar_rol('investigador')
+
+        self.assertRedirects(self.client.get(reverse('security:dashboard')), reverse('core:home'),
+                             fetch_redirect_response=False)
+        respuesta = self.client.get(reverse('security:permissions_by_content_type'))
+        self.assertEqual(respuesta.status_code, 403)
+
+    def test_administrador_accede(self):
+        self._asignar_rol('administrador')
+
+        self.assertEqual(self.client.get(reverse('security:dashboard')).status_code, 200)
+
+    def test_superusuario_accede(self):
+        User.objects.filter(id=self.usuario.id).update(is_superuser=True)
+
+        self.assertEqual(self.client.get(reverse('security:dashboard')).status_code, 200)
+
+
+class CatalogoPermisosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tipo = ContentType.objects.get_for_model(Role)
+
+    def test_una_consulta_y_luego_cache(self):
+        with self.assertNumQueries(1):
+            catalogo = get_permission_catalog()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_permission_catalog(), catalogo)
+
+        nombres = [permiso['name'] for permiso in catalogo[self.tipo]]
+        self.assertIn('Puede agregar role', nombres)
+        self.assertEqual(
+            [permiso['codename'] for permiso in catalogo[self.tipo]],
+            ['add_role', 'change_role', 'delete_role', 'view_role'],
+        )
+
+    def test_invalidar_reconstruye_el_catalogo(self):
+        get_permission_catalog()
+        Permission.objects.create(codename='exportar_role', name='Can export role', content_type=self.tipo)
+
+        self.assertNotIn('exportar_role', [p['codename'] for p in get_permission_catalog()[self.tipo]])
+        invalidate_permission_catalog()
+        self.assertIn('exportar_role', [p['codename'] for p in get_permission_catalog()[self.tipo]])
+
+    def test_idioma_sin_traducciones_usa_el_espanol(self):
+        with translation.override('en'):
+            catalogo = get_permission_catalog()
+
+        self.assertIn('Puede ver role', [permiso['name'] for permiso in catalogo[self.tipo]])
+        self.assertEqual(translate_permission_name('Can view role', 'fr'), 'Can view role')
+
+
+class SincronizacionRolTests(TestCase):
+
+    def setUp(self):
+        self.role = Role.objects.create(name='revisor')
+        permisos = Permission.objects.filter(content_type=ContentType.objects.get_for_model(Role)).order_by('codename')
+        self.agregar, self.modificar, self.eliminar, self.ver = permisos
+        self.role.permissions.set([self.agregar, self.ver])
+        self.usuarios = []
+        for indice in range(3):
+            usuario = User.objects.create_user(f'revisor{indice}', f'revisor{indice}@gmail.com', 'clave')
+            Profile.objects.filter(user=usuario).update(role=self.role)
+            self.usuarios.append(usuario)
+
+    def _permisos(self, usuario):
+        return set(usuario.user_permissions.values_list('codename', flat=True))
+
+    def test_sync_users_aplica_solo_la_diferencia(self):
+        self.usuarios[0].user_permissions.set([self.ver, self.eliminar])
+        ids = [usuario.id for usuario in self.usuarios]
+
+        self.assertEqual(sync_users(ids, [self.agregar.id, self.ver.id]), (5, 1))
+        self.assertEqual(sync_users(ids, [self.agregar.id, self.ver.id]), (0, 0))
+        for usuario in self.usuarios:
+            self.assertEqual(self._permisos(usuario), {'add_role', 'view_role'})
+
+    def test_sync_role_por_lotes(self):
+        self.usuarios[2].user_permissions.set([self.modificar])
+
+        informe = sync_role(self.role.id, batch_size=2)
+
+        self.assertEqual((informe['users'], informe['added'], informe['removed']), (3, 6, 1))
+        self.assertEqual(self._permisos(self.usuarios[2]), {'add_role', 'view_role'})
+
+    def test_rol_pequeno_se_sincroniza_en_la_peticion(self):
+        informe, trabajo = request_role_sync(self.role)
+
+        self.assertIsNone(trabajo)
+        self.assertEqual(informe['users'], 3)
+        self.assertFalse(RoleSyncJob.objects.exists())
+
+    def test_rol_grande_se_encola_una_vez(self):
+        with mock.patch('security.sync.SYNC_INLINE_MAX_USERS', 2):
+            _, trabajo = request_role_sync(self.role)
+            _, repetido = request_role_sync(self.role)
+
+        self.assertEqual(trabajo.id, repetido.id)
+        self.assertEqual(RoleSyncJob.objects.count(), 1)
+        self.assertEqual(self._permisos(self.usuarios[0]), set())
+
+    def test_fallo_en_la_peticion_se_encola(self):
+        with mock.patch('security.sync.sync_role', side_effect=RuntimeError('bloqueo')):
+            with self.assertLogs('security.sync', 'ERROR'):
+                informe, trabajo = request_role_sync(self.role)
+
+        self.assertIsNone(informe)
+        self.assertEqual(trabajo.status, 'PENDIENTE')
+
+    def test_reclamar_y_ejecutar(self):
+        trabajo = RoleSyncJob.objects.create(role=self.role)
+
+        reclamados = claim_jobs(10)
+        self.assertEqual([t.id for t in reclamados], [trabajo.id])
+        self.assertEqual(claim_jobs(10), [])
+
+        run_job(reclamados[0])
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.status, 'COMPLETADO')
+        self.assertEqual((trabajo.users_total, trabajo.permissions_added), (3, 6))
+
+    def test_fallos_reintentan_con_espera_y_se_descartan(self):
+        trabajo = RoleSyncJob.objects.create(role=self.role, max_attempts=2)
+
+        with mock.patch('security.sync.sync_role', side_effect=RuntimeError('bloqueo')), self.assertLogs('security.sync'):
+            antes = timezone.now()
+            run_job(claim_jobs(1)[0])
+            trabajo.refresh_from_db()
+            self.assertEqual(trabajo.status, 'PENDIENTE')
+            self.assertGreaterEqual(trabajo.available_from, antes + RETRY_DELAY)
+            self.assertEqual(claim_jobs(1), [])
+
+            RoleSyncJob.objects.filter(id=trabajo.id).update(available_from=timezone.now())
+            run_job(claim_jobs(1)[0])
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.status, 'FALLIDO')
+        self.assertEqual(trabajo.attempts, 2)
+        self.assertEqual(trabajo.error, 'bloqueo')
+
+    def test_recuperar_trabajos_abandonados(self):
+        trabajo = RoleSyncJob.objects.create(role=self.role)
+        claim_jobs(1)
+        RoleSyncJob.objects.filter(id=trabajo.id).update(
+            started_at=timezone.now() - MAX_PROCESSING_TIME - datetime.timedelta(seconds=1)
+        )
 
-# Create your tests here.
+        self.assertEqual(recover_abandoned_jobs(), 1)
+        self.assertEqual(claim_jobs(1)[0].id, trabajo.id)
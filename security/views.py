@@ -9,33 +9,16 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.core.paginator import Paginator
 from django.db.models import Q
-from usuarios.models import Role, Profile  # Importar desde la app usuarios
+from usuarios.models import Role  # Importar desde la app usuarios
+from .catalog import get_permission_catalog
+from .sync import request_role_sync
 import json
 
-def translate_permission_name(permission_name):
-    """Traduce automáticamente los nombres de permisos al español"""
-    # Convertir a minúsculas para comparar
-    name_lower = permission_name.lower()
-    
-    # Reemplazos automáticos
-    if 'can add' in name_lower:
-        return permission_name.replace('Can add', 'Puede agregar').replace('can add', 'Puede agregar')
-    elif 'can change' in name_lower:
-        return permission_name.replace('Can change', 'Puede modificar').replace('can change', 'Puede modificar')
-    elif 'can delete' in name_lower:
-        return permission_name.replace('Can delete', 'Puede eliminar').replace('can delete', 'Puede eliminar')
-    elif 'can view' in name_lower:
-        return permission_name.replace('Can view', 'Puede ver').replace('can view', 'Puede ver')
-    else:
-        return permission_name
-
 @login_required
 def security_dashboard(request):
     """Dashboard principal de seguridad con tabla de roles"""
     # Verificar permisos de administrador
-    if not (hasattr(request.user, 'profile') and 
-            request.user.profile.role and 
-            request.user.profile.role.name == 'administrador'):
+    if not request.permisos.es_admin:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('core:home')
     
@@ -61,9 +44,7 @@ def security_dashboard(request):
 def role_edit(request, role_id):
     """Editar permisos de un rol existente"""
     # Verificar permisos
-    if not (hasattr(request.user, 'profile') and 
-            request.user.profile.role and 
-            request.user.profile.role.name == 'administrador'):
+    if not request.permisos.es_admin:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('core:home')
     
@@ -81,34 +62,29 @@ def role_edit(request, role_id):
                 else:
                     role.permissions.clear()
                 
-                # Sincronizar permisos de usuarios con este rol
-                sync_users_permissions_sync(role.id)
-                
-                messages.success(request, f'Permisos del rol "{role.name}" actualizados correctamente.')
-                return redirect('security:dashboard')
-                
         except Exception as e:
             messages.error(request, f'Error al actualizar los permisos: {str(e)}')
-    
-    # Obtener todos los permisos agrupados por ContentType
-    content_types = ContentType.objects.all().order_by('app_label', 'model')
-    permissions_by_content_type = {}
-    
-    for content_type in content_types:
-        permissions = Permission.objects.filter(content_type=content_type).order_by('codename')
-        if permissions:
-            # Crear lista de permisos con nombres traducidos
-            permissions_list = []
-            for permission in permissions:
-                permission_dict = {
-                    'id': permission.id,
-                    'codename': permission.codename,
-                    'name': translate_permission_name(permission.name),
-                    'original_name': permission.name,
-                }
-                permissions_list.append(permission_dict)
+        else:
+            # Sincronizar permisos de usuarios con este rol una vez confirmado el cambio:
+            # cada lote de usuarios usa su propia transacción (en segundo plano si el rol es grande)
+            report, job = request_role_sync(role, requested_by=request.user)
             
-            permissions_by_content_type[content_type] = permissions_list
+            if job:
+                messages.success(
+                    request,
+                    f'Permisos del rol "{role.name}" actualizados. Los usuarios del rol '
+                    f'se sincronizarán en segundo plano (sincronización #{job.id}).'
+                )
+            else:
+                messages.success(
+                    request,
+                    f'Permisos del rol "{role.name}" actualizados correctamente '
+                    f'({report["users"]} usuarios sincronizados en {report["seconds"]:.2f}s).'
+                )
+            return redirect('security:dashboard')
+    
+    # Todos los permisos agrupados por ContentType (catálogo precalculado en caché)
+    permissions_by_content_type = get_permission_catalog()
     
     # Permisos actuales del rol
     current_permissions = list(role.permissions.values_list('id', flat=True))
@@ -125,9 +101,7 @@ def role_edit(request, role_id):
 @login_required
 def permissions_by_content_type_ajax(request):
     """Obtener permisos por tipo de contenido via AJAX"""
-    if not (hasattr(request.user, 'profile') and 
-            request.user.profile.role and 
-            request.user.profile.role.name == 'administrador'):
+    if not request.permisos.es_admin:
         return JsonResponse({'success': False, 'error': 'No autorizado'}, status=403)
     
     content_type_id = request.GET.get('content_type_id')
@@ -150,15 +124,3 @@ def permissions_by_content_type_ajax(request):
         })
     except ContentType.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'ContentType no encontrado'}, status=404)
-
-def sync_users_permissions_sync(role_id):
-    """Sincronizar permisos de usuarios con un rol específico (versión síncrona)"""
-    try:
-        role = Role.objects.get(id=role_id)
-        profiles = Profile.objects.filter(role=role).select_related('user')
-        
-        for profile in profiles:
-            profile.sync_user_permissions()
-            
-    except Role.DoesNotExist:
-        pass
\ No newline at end of file
@@ -0,0 +1,215 @@
+import hashlib
+import re
+import unicodedata
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+
+from .models import Profile, TerminoBusqueda
+
+
+# Campos de User que alimentan el índice
+CAMPOS_USUARIO = ('username', 'first_name', 'last_name', 'email')
+
+# Peso de cada origen en el ranking; una coincidencia exacta vale el doble que un prefijo
+PESO_NOMBRE = 3
+PESO_USUARIO = 3
+PESO_CORREO = 2
+PESO_DOMINIO = 1
+
+# Longitud mínima de una palabra de la consulta y de los términos guardados
+MINIMO_CARACTERES = 2
+LONGITUD_TERMINO = 64
+
+# Resultados rankeados que se guardan en caché por consulta
+MAXIMO_CANDIDATOS = 100
+DURACION_CACHE = 60
+CLAVE_VERSION = 'usuarios:busqueda:version'
+
+TAMANO_LOTE = 1000
+
+PALABRAS = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'Núñez' → 'nunez'."""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def palabras(texto):
+    """Palabras normalizadas de un texto, con la longitud mínima para indexarse."""
+    return [
+        palabra[:LONGITUD_TERMINO]
+        for palabra in PALABRAS.findall(normalizar(texto))
+        if len(palabra) >= MINIMO_CARACTERES
+    ]
+
+
+def terminos(username, nombres, email):
+    """
+    {termino: peso} de un usuario. `nombres` son los nombres y apellidos (de User
+    y de Profile); del correo se indexa la parte local completa y cada palabra,
+    y el dominio con menos peso.
+    """
+    resultado = {}
+
+    def agregar(lista, peso):
+        for termino in lista:
+            if peso > resultado.get(termino, 0):
+                resultado[termino] = peso
+
+    agregar(palabras(' '.join(nombres)), PESO_NOMBRE)
+    local, _, dominio = normalizar(email).partition('@')
+    agregar(palabras(dominio), PESO_DOMINIO)
+    agregar(palabras(local), PESO_CORREO)
+    if len(local) >= MINIMO_CARACTERES:
+        agregar([local[:LONGITUD_TERMINO]], PESO_CORREO)
+    agregar(palabras(username), PESO_USUARIO)
+    username = normalizar(username)
+    if len(username) >= MINIMO_CARACTERES:
+        agregar([username[:LONGITUD_TERMINO]], PESO_USUARIO)
+    return resultado
+
+
+def _terminos_usuario(usuario, perfil=None):
+    nombres = [usuario.first_name, usuario.last_name]
+    if perfil is not None:
+        nombres += [perfil.first_name, perfil.last_name]
+    return terminos(usuario.username, nombres, usuario.email)
+
+
+def _invalidar_cache():
+    """Cambia la versión de las claves: las consultas cacheadas dejan de usarse."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, 1, None)
+
+
+def reindexar_usuario(usuario):
+    """
+    Actualiza los términos de un usuario. Solo escribe (e invalida la caché)
+    si el conjunto de términos cambió.
+    """
+    perfil = Profile.objects.filter(user_id=usuario.pk).first()
+    nuevos = _terminos_usuario(usuario, perfil)
+    actuales = dict(
+        TerminoBusqueda.objects.filter(usuario_id=usuario.pk).values_list('termino', 'peso')
+    )
+    if nuevos == actuales:
+        return False
+
+    with transaction.atomic():
+        TerminoBusqueda.objects.filter(usuario_id=usuario.pk).delete()
+        TerminoBusqueda.objects.bulk_create([
+            TerminoBusqueda(usuario_id=usuario.pk, termino=termino, peso=peso)
+            for termino, peso in nuevos.items()
+        ])
+    _invalidar_cache()
+    return True
+
+
+def reconstruir_indice(lote=TAMANO_LOTE):
+    """
+    Reconstruye el índice completo por rangos de id (para usuarios creados sin
+    señales, p. ej. con bulk_create). Genera el número de usuarios indexados por lote.
+    """
+    ultimo_id = 0
+    while True:
+        usuarios = list(
+            User.objects.filter(id__gt=ultimo_id).select_related('profile').order_by('id')[:lote]
+        )
+        if not usuarios:
+            break
+        with transaction.atomic():
+            TerminoBusqueda.objects.filter(usuario_id__in=[usuario.id for usuario in usuarios]).delete()
+            TerminoBusqueda.objects.bulk_create([
+                TerminoBusqueda(usuario_id=usuario.id, termino=termino, peso=peso)
+                for usuario in usuarios
+                for termino, peso in _terminos_usuario(usuario, getattr(usuario, 'profile', None)).items()
+            ])
+        ultimo_id = usuarios[-1].id
+        yield len(usuarios)
+    _invalidar_cache()
+
+
+def _prefijo(palabra):
+    """
+    'termino empieza por palabra'. Los términos están normalizados, así que
+    LIKE 'palabra%' puede resolverse con el índice de termino.
+    """
+    return Q(termino__startswith=palabra)
+
+
+def coincidencias(consulta):
+    """
+    Queryset de (usuario_id, puntuacion) con los usuarios que tienen, para cada
+    palabra de la consulta, algún término que empieza por ella; de mayor a menor
+    puntuación. Devuelve None si la consulta no tiene palabras buscables.
+    """
+    buscadas = list(dict.fromkeys(palabras(consulta)))
+    if not buscadas:
+        return None
+
+    condicion = Q()
+    puntuaciones = {}
+    for indice, palabra in enumerate(buscadas):
+        condicion |= _prefijo(palabra)
+        puntuaciones[f'p{indice}'] = Max(Case(
+            When(termino=palabra, then=F('peso') * 2),
+            When(_prefijo(palabra), then=F('peso')),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+
+    return (
+        TerminoBusqueda.objects.filter(condicion)
+        .values('usuario_id')
+        .annotate(**puntuaciones)
+        # Un usuario aparece solo si todas las palabras coinciden con alguno de sus términos
+        .filter(**{f'{nombre}__gt': 0 for nombre in puntuaciones})
+        .annotate(puntuacion=sum((F(nombre) for nombre in puntuaciones), Value(0)))
+        .order_by('-puntuacion', 'usuario_id')
+        .values_list('usuario_id', 'puntuacion')
+    )
+
+
+def ids_coincidentes(consulta):
+    """Subconsulta con los ids de los usuarios que coinciden, para filtrar otros querysets."""
+    encontrados = coincidencias(consulta)
+    if encontrados is None:
+        return None
+    return encontrados.values('usuario_id')
+
+
+def buscar_usuarios(consulta, limite=10, excluir=()):
+    """
+    Ids de los `limite` usuarios más relevantes para la consulta, sin los de `excluir`.
+
+    Los MAXIMO_CANDIDATOS primeros de cada consulta se guardan en caché unos
+    segundos, así las pulsaciones repetidas del autocompletado no vuelven a la
+    base de datos; solo se consulta con la exclusión si la caché no alcanza.
+    """
+    buscadas = palabras(consulta)
+    if not buscadas:
+        return []
+
+    version = cache.get_or_set(CLAVE_VERSION, 1, None)
+    huella = hashlib.md5(' '.join(buscadas).encode()).hexdigest()
+    clave = f'usuarios:busqueda:{version}:{huella}'
+
+    candidatos = cache.get(clave)
+    if candidatos is None:
+        candidatos = [usuario_id for usuario_id, _ in coincidencias(consulta)[:MAXIMO_CANDIDATOS]]
+        cache.set(clave, candidatos, DURACION_CACHE)
+
+    excluir = set(excluir)
+    resultado = [usuario_id for usuario_id in candidatos if usuario_id not in excluir][:limite]
+    if len(resultado) < limite and len(candidatos) == MAXIMO_CANDIDATOS:
+        resultado = [
+            usuario_id for usuario_id, _ in coincidencias(consulta).exclude(usuario_id__in=excluir)[:limite]
+        ]
+    return resultado
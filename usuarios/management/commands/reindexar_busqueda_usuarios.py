@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from usuarios.busqueda import TAMANO_LOTE, reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye el índice de búsqueda de usuarios (TerminoBusqueda). Necesario tras '
+        'crear o modificar usuarios sin pasar por save(), p. ej. con bulk_create o update().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help='Usuarios reindexados por transacción'
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        total = 0
+        for indexados in reconstruir_indice(lote=max(1, options['lote'])):
+            total += indexados
+            self.stdout.write(f'{total} usuarios indexados...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice de búsqueda reconstruido: {total} usuarios en {time.monotonic() - inicio:.2f}s'
+        ))
@@ -0,0 +1,109 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:18
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Copia de las reglas de usuarios.busqueda en el momento de esta migración;
+# la migración no importa el módulo para no cambiar si este se modifica
+PESO_NOMBRE = 3
+PESO_USUARIO = 3
+PESO_CORREO = 2
+PESO_DOMINIO = 1
+MINIMO_CARACTERES = 2
+LONGITUD_TERMINO = 64
+TAMANO_LOTE = 1000
+
+PALABRAS = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def palabras(texto):
+    return [
+        palabra[:LONGITUD_TERMINO]
+        for palabra in PALABRAS.findall(normalizar(texto))
+        if len(palabra) >= MINIMO_CARACTERES
+    ]
+
+
+def terminos(username, nombres, email):
+    resultado = {}
+
+    def agregar(lista, peso):
+        for termino in lista:
+            if peso > resultado.get(termino, 0):
+                resultado[termino] = peso
+
+    agregar(palabras(' '.join(nombres)), PESO_NOMBRE)
+    local, _, dominio = normalizar(email).partition('@')
+    agregar(palabras(dominio), PESO_DOMINIO)
+    agregar(palabras(local), PESO_CORREO)
+    if len(local) >= MINIMO_CARACTERES:
+        agregar([local[:LONGITUD_TERMINO]], PESO_CORREO)
+    agregar(palabras(username), PESO_USUARIO)
+    username = normalizar(username)
+    if len(username) >= MINIMO_CARACTERES:
+        agregar([username[:LONGITUD_TERMINO]], PESO_USUARIO)
+    return resultado
+
+
+def indexar_usuarios(apps, schema_editor):
+    """Indexa a los usuarios que ya existen, un lote de usuarios (con sus perfiles) cada vez."""
+    User = apps.get_model('auth', 'User')
+    Profile = apps.get_model('usuarios', 'Profile')
+    TerminoBusqueda = apps.get_model('usuarios', 'TerminoBusqueda')
+
+    ultimo_id = 0
+    while True:
+        usuarios = list(
+            User.objects.filter(id__gt=ultimo_id).order_by('id')
+            .values_list('id', 'username', 'first_name', 'last_name', 'email')[:TAMANO_LOTE]
+        )
+        if not usuarios:
+            break
+        perfiles = {
+            user_id: [first_name, last_name]
+            for user_id, first_name, last_name in Profile.objects.filter(
+                user_id__in=[usuario[0] for usuario in usuarios]
+            ).values_list('user_id', 'first_name', 'last_name')
+        }
+        TerminoBusqueda.objects.bulk_create([
+            TerminoBusqueda(usuario_id=usuario_id, termino=termino, peso=peso)
+            for usuario_id, username, first_name, last_name, email in usuarios
+            for termino, peso in terminos(
+                username, [first_name, last_name] + perfiles.get(usuario_id, []), email
+            ).items()
+        ])
+        ultimo_id = usuarios[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=64)),
+                ('peso', models.PositiveSmallIntegerField(default=1)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos_busqueda', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['termino', 'usuario', 'peso'], name='termino_busqueda_idx')],
+            },
+        ),
+        migrations.RunPython(indexar_usuarios, migrations.RunPython.noop),
+    ]
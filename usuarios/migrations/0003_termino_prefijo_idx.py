@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_terminobusqueda'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='terminobusqueda',
+            index=models.Index(fields=['termino'], name='termino_prefijo_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
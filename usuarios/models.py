@@ -43,7 +43,14 @@ class Profile(models.Model):
         first = self.first_name or self.user.first_name
         last = self.last_name or self.user.last_name
         return f"{first} {last}".strip()
-    
+
+    def sync_user_permissions(self):
+        """Deja los user_permissions del usuario iguales a los permisos de su rol (ninguno si no tiene)"""
+        from security.sync import sync_users
+
+        permission_ids = self.role.permissions.values_list('id', flat=True) if self.role_id else []
+        return sync_users([self.user_id], permission_ids)
+
     def __str__(self):
         return self.get_full_name() or self.user.username
 
@@ -75,4 +82,48 @@ def save_user_profile(sender, instance, **kwargs):
             instance.profile.save()
         if instance.profile.last_name.title() != instance.last_name:
             instance.profile.last_name = instance.last_name.upper()
-            instance.profile.save()
\ No newline at end of file
+            instance.profile.save()
+
+class TerminoBusqueda(models.Model):
+    """
+    Índice de búsqueda de usuarios: una fila por palabra normalizada (minúsculas y
+    sin tildes) de su username, nombres y correo. Se consulta por prefijo de
+    `termino`, que aprovecha el índice en lugar de recorrer la tabla de usuarios
+    con varios icontains. Lo mantienen las señales de abajo.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='terminos_busqueda')
+    termino = models.CharField(max_length=64)
+    peso = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Cubre la consulta completa: prefijo de termino y agregación por usuario/peso
+            models.Index(fields=['termino', 'usuario', 'peso'], name='termino_busqueda_idx'),
+            # En PostgreSQL, LIKE 'prefijo%' solo usa un índice con varchar_pattern_ops
+            # (las demás bases ignoran opclasses y crean un índice normal)
+            models.Index(fields=['termino'], name='termino_prefijo_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.termino} → {self.usuario_id}"
+
+
+# ========== ÍNDICE DE BÚSQUEDA ==========
+
+@receiver(post_save, sender=User)
+def indexar_usuario(sender, instance, update_fields=None, **kwargs):
+    """Reindexa al usuario cuando cambia alguno de los campos que se buscan."""
+    from .busqueda import CAMPOS_USUARIO, reindexar_usuario
+
+    # Los guardados parciales (p. ej. last_login al iniciar sesión) no tocan el índice
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_USUARIO):
+        return
+    reindexar_usuario(instance)
+
+
+@receiver(post_save, sender=Profile)
+def indexar_perfil(sender, instance, **kwargs):
+    """Los nombres del perfil también se indexan."""
+    from .busqueda import reindexar_usuario
+
+    reindexar_usuario(instance.user)
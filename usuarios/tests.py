@@ -1,3 +1,57 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from .busqueda import buscar_usuarios, ids_coincidentes, reconstruir_indice, terminos
+from .models import TerminoBusqueda
+
+
+class BusquedaUsuariosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.ana = User.objects.create_user('anunez', 'ana.nunez@unal.edu.co', 'clave', first_name='Ana', last_name='Núñez')
+        self.andres = User.objects.create_user('andres', 'andres@gmail.com', 'clave', first_name='Andrés', last_name='Gómez')
+        self.otro = User.objects.create_user('maria', 'maria@gmail.com', 'clave', first_name='María', last_name='Ruiz')
+
+    def test_terminos_normalizados_con_pesos(self):
+        resultado = terminos('anunez', ['Ana', 'Núñez'], 'ana.nunez@unal.edu.co')
+
+        self.assertEqual(resultado['nunez'], 3)
+        self.assertEqual(resultado['ana.nunez'], 2)
+        self.assertEqual(resultado['unal'], 1)
+
+    def test_busca_por_prefijo_sin_tildes(self):
+        self.assertEqual(buscar_usuarios('nuñ'), [self.ana.id])
+        self.assertEqual(set(buscar_usuarios('an')), {self.ana.id, self.andres.id})
+
+    def test_todas_las_palabras_deben_coincidir(self):
+        self.assertEqual(buscar_usuarios('an gom'), [self.andres.id])
+
+    def test_coincidencia_exacta_primero(self):
+        # 'ana' es un término exacto de Ana y solo un prefijo de 'anabel'
+        User.objects.create_user('anabel', 'anabel@gmail.com', 'clave', first_name='Anabel')
+        self.assertEqual(buscar_usuarios('ana')[0], self.ana.id)
+
+    def test_busqueda_es_por_prefijo_de_palabra(self):
+        """Una subcadena en medio de una palabra no coincide (antes icontains sí lo hacía)."""
+        self.assertEqual(buscar_usuarios('unez'), [])
+
+    def test_excluir(self):
+        self.assertEqual(buscar_usuarios('an', excluir=[self.ana.id]), [self.andres.id])
+
+    def test_cambio_de_nombre_invalida_la_cache(self):
+        self.assertEqual(buscar_usuarios('ruiz'), [self.otro.id])
+        self.otro.last_name = 'Salas'
+        self.otro.save()
+
+        self.assertEqual(buscar_usuarios('ruiz'), [])
+        self.assertEqual(buscar_usuarios('salas'), [self.otro.id])
+
+    def test_reconstruir_indice_cubre_usuarios_sin_senales(self):
+        TerminoBusqueda.objects.all().delete()
+        User.objects.bulk_create([User(username='lote1', email='lote1@gmail.com', first_name='Zoe')])
+
+        self.assertEqual(sum(reconstruir_indice(lote=2)), 4)
+        self.assertEqual(list(User.objects.filter(id__in=ids_coincidentes('zoe')).values_list('username', flat=True)),
+                         ['lote1'])
@@ -9,20 +9,27 @@ from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_protect
 from .forms import CustomUserCreationForm, CustomLoginForm
+from .busqueda import ids_coincidentes
 from .models import Profile, Role
 from django.contrib.auth.models import User
 import json
 from django.db import transaction
 
 
-def is_admin_or_superuser(user):
+def filtrar_por_busqueda(usuarios_query, search_query):
     """
-    Función auxiliar para verificar si un usuario es administrador o superusuario
+    Filtra por nombre, apellido, username o email usando el índice de búsqueda
+    (prefijos de palabra, sin distinguir tildes). Las consultas de un solo
+    carácter no se indexan y se resuelven con icontains.
     """
-    return user.is_superuser or (
-        hasattr(user, 'profile') and 
-        user.profile.role and 
-        user.profile.role.name == 'administrador'
+    ids = ids_coincidentes(search_query)
+    if ids is not None:
+        return usuarios_query.filter(id__in=ids)
+    return usuarios_query.filter(
+        Q(first_name__icontains=search_query) |
+        Q(last_name__icontains=search_query) |
+        Q(username__icontains=search_query) |
+        Q(email__icontains=search_query)
     )
 
 
@@ -104,7 +111,7 @@ def logout_view(request):
 @login_required 
 def usuarios_list_view(request):
     # Verificar que el usuario sea administrador o superusuario
-    if not is_admin_or_superuser(request.user):
+    if not request.permisos.es_admin:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('core:home')
     
@@ -119,15 +126,7 @@ def usuarios_list_view(request):
     
     # Aplicar filtros de búsqueda si existe término de búsqueda
     if search_query:
-        # Buscar por nombre, apellido, username, email
-        usuarios_query = usuarios_query.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(username__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(profile__first_name__icontains=search_query) |
-            Q(profile__last_name__icontains=search_query)
-        ).distinct()
+        usuarios_query = filtrar_por_busqueda(usuarios_query, search_query)
     
     # Aplicar filtro por rol si se especifica
     if role_filter:
@@ -197,7 +196,7 @@ def usuarios_list_view(request):
 @csrf_protect
 def delete_user_view(request, user_id):
     # Verificar permisos de administrador o superusuario
-    if not is_admin_or_superuser(request.user):
+    if not request.permisos.es_admin:
         return JsonResponse({
             'success': False, 
             'error': 'No tienes permisos para realizar esta acción.'
@@ -262,7 +261,7 @@ def delete_user_view(request, user_id):
 @csrf_protect
 def change_user_role_view(request, user_id):
     # Verificar permisos de administrador o superusuario
-    if not is_admin_or_superuser(request.user):
+    if not request.permisos.es_admin:
         return JsonResponse({
             'success': False, 
             'error': 'No tienes permisos para realizar esta acción.'
@@ -335,6 +334,9 @@ def change_user_role_view(request, user_id):
                 Profile.objects.create(user=user_to_change, role=new_role)
                 old_role = None
             
+            # Los permisos del usuario pasan a ser los del nuevo rol
+            user_to_change.profile.sync_user_permissions()
+            
             user_name = user_to_change.get_full_name() or user_to_change.username
             
             return JsonResponse({
@@ -367,7 +369,7 @@ def change_user_role_view(request, user_id):
 @login_required
 def search_users_ajax(request):
     """Vista AJAX optimizada para búsqueda de usuarios en tiempo real"""
-    if not is_admin_or_superuser(request.user):
+    if not request.permisos.es_admin:
         return JsonResponse({
             'success': False, 
             'error': 'No tienes permisos.'
@@ -383,14 +385,7 @@ def search_users_ajax(request):
     
     # Aplicar filtros de búsqueda
     if search_query:
-        usuarios_query = usuarios_query.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(username__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(profile__first_name__icontains=search_query) |
-            Q(profile__last_name__icontains=search_query)
-        ).distinct()
+        usuarios_query = filtrar_por_busqueda(usuarios_query, search_query)
     
     # Aplicar filtro por rol
     if role_filter:
@@ -463,7 +458,7 @@ def search_users_ajax(request):
 @login_required 
 def seguridad_accesos_view(request):
     # Verificar que el usuario sea administrador o superusuario
-    if not is_admin_or_superuser(request.user):
+    if not request.permisos.es_admin:
         messages.error(request, 'No tienes permisos para acceder a esta sección.')
         return redirect('core:home')
     
@@ -478,7 +473,7 @@ def seguridad_accesos_view(request):
 @login_required
 def dashboard(request):
     # Redirección directa para invitados a la página principal
-    if hasattr(request.user, 'profile') and request.user.profile.role and request.user.profile.role.name == 'invitado':
+    if request.permisos.roles.rol_global == 'invitado':
         return redirect('core:home')
     context = {
         'title': 'Dashboard',